@@ -0,0 +1,66 @@
+"""
+Times the FoodPopularityChart aggregation against a data set seeded with 10k, 100k and 1M orders.
+
+Run against a database that the app has already created (so the tables and at least one data set with foods exist):
+
+    $ python benchmarks/food_popularity.py sqlite:///events.db 1
+
+The seeded orders are only ever flushed, never committed, so the data set is left as it was.
+"""
+import datetime, sys, time
+from sqlalchemy import create_engine
+from tropofy.database import DBSession
+from event_tracking_demo import Order, FoodPopularityChart
+from event_tracking_demo.cache import widget_cache
+from event_tracking_demo.generate import OrderGenerator, insert_orders, menu_for
+
+SIZES = [10000, 100000, 1000000]
+RENDERS = 5
+
+
+class BenchDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class BenchAppSession(object):
+    def __init__(self, data_set):
+        self.data_set = data_set
+
+
+def uncached_render(app_session):
+    widget_cache.clear()
+    FoodPopularityChart().get_table_data(app_session)
+
+
+def best_time(fn, *args):
+    timings = []
+    for _ in xrange(RENDERS):
+        start = time.time()
+        fn(*args)
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    db_url, data_set_id = sys.argv[1], int(sys.argv[2])
+    DBSession.configure(bind=create_engine(db_url))
+    session = DBSession()
+    app_session = BenchAppSession(BenchDataSet(data_set_id))
+
+    menu = menu_for(app_session.data_set)
+    if not menu:
+        print("Data set %d has no foods, load the example data first." % data_set_id)
+        exit(1)
+    generator = OrderGenerator(menu, datetime.date(2017, 1, 2), seed=0)
+
+    seeded = 0
+    try:
+        for size in SIZES:
+            insert_orders(app_session.data_set, generator, size - seeded)
+            seeded = size
+            print("%8d orders: %.4fs grouped over Order, %.4fs per uncached chart render from the rollup" % (
+                size, best_time(Order.get_total_by_food, app_session.data_set),
+                best_time(uncached_render, app_session)))
+    finally:
+        session.rollback()
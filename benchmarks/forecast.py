@@ -0,0 +1,53 @@
+"""
+Times fitting the demand forecast to synthetic hourly history: 500 foods x 4 years, every hour of every day.
+
+    $ python benchmarks/forecast.py
+
+Rows are passed to fit_demand ungrouped, one per food per hour (17.5 million), which is the most it ever has to sum.
+OrderRollup.get_demand_history groups them by year, day of week and hour in the database first.
+"""
+import time
+import numpy as np
+from event_tracking_demo.forecast import DemandHistory, HOURS, fit_demand
+
+FOODS = 500
+FIRST_YEAR, YEARS = 2014, 4
+
+
+def synthetic_history(rng):
+    """
+    Poisson demand with a lunch and dinner peak, a busier weekend and 10% growth a year, scaled per food.
+    """
+    days = np.arange(np.datetime64('%d-01-01' % FIRST_YEAR), np.datetime64('%d-01-01' % (FIRST_YEAR + YEARS)))
+    day_year = days.astype('datetime64[Y]').astype(int) + 1970
+    day_weekday = (days.astype(int) + 4) % 7  # 1970-01-01 was a Thursday
+    hours = np.arange(HOURS)
+    curve = 0.2 + np.exp(-(hours - 12.5) ** 2 / 3.0) + 0.6 * np.exp(-(hours - 17.5) ** 2 / 2.0)
+    weekend = np.where((day_weekday == 0) | (day_weekday == 6), 1.5, 1.0)
+    growth = 1.1 ** (day_year - FIRST_YEAR)
+    food_scale = rng.gamma(2.0, 2.0, FOODS).astype(np.float32)
+    day_scale = (weekend * growth).astype(np.float32)
+    quantity = rng.poisson(food_scale[:, None, None] * day_scale[None, :, None] * curve[None, None, :]
+                           .astype(np.float32)).astype(np.float32)
+    shape = quantity.shape
+    food = np.broadcast_to(np.arange(FOODS, dtype=np.int16)[:, None, None], shape).ravel()
+    return DemandHistory(range(FOODS), food, np.broadcast_to(day_year[None, :, None], shape).ravel(),
+                         np.broadcast_to(day_weekday[None, :, None], shape).ravel(),
+                         np.broadcast_to(hours[None, None, :], shape).ravel(), quantity.ravel(), day_year, day_weekday)
+
+
+if __name__ == "__main__":
+    history = synthetic_history(np.random.RandomState(42))
+    start = time.time()
+    model = fit_demand(history)
+    elapsed = time.time() - start
+    print("Fitted %d foods to %d hourly rows in %.2fs" % (FOODS, len(history.quantity), elapsed))
+
+    start = time.time()
+    backtest = fit_demand(history.before(FIRST_YEAR + YEARS - 1))
+    elapsed = time.time() - start
+    last_year = FIRST_YEAR + YEARS - 1
+    actual = history.actual(last_year).sum()
+    forecast = backtest.predict(last_year, history.weekdays(last_year)).sum()
+    print("Backtest on %d (fitted in %.2fs): forecast %.0f vs actual %.0f per day, %.1f%% off" % (
+        last_year, elapsed, forecast, actual, 100.0 * abs(forecast - actual) / actual))
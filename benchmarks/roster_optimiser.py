@@ -0,0 +1,37 @@
+"""
+Times the greedy roster solver on synthetic demand: 50 stations x 200 staff x a week of 15 minute slots.
+
+    $ python benchmarks/roster_optimiser.py
+"""
+import time
+import numpy as np
+from event_tracking_demo.rostering import required_staff, solve_roster, understaffed_slots
+
+STATIONS = 50
+STAFF = 200
+DAYS = 7
+SLOTS = 96  # 15 minute slots
+MIN_SLOTS, MAX_SLOTS = 12, 32  # 3 to 8 hour shifts
+ORDERS_PER_STAFF_SLOT = 8
+
+
+def synthetic_orders_per_slot(rng):
+    """
+    Lunch and dinner peaks between 06:00 and 19:00, scaled per station and per day.
+    """
+    hours = np.arange(SLOTS) / 4.0
+    curve = np.exp(-(hours - 12.5) ** 2 / 4) + 0.7 * np.exp(-(hours - 17.5) ** 2 / 2)
+    curve[(hours < 6) | (hours >= 19)] = 0
+    station_scale = rng.gamma(2.0, 4.0, size=(STATIONS, 1, 1))
+    day_scale = rng.uniform(0.6, 1.4, size=(1, DAYS, 1))
+    return rng.poisson(station_scale * day_scale * curve[None, None, :])
+
+
+if __name__ == "__main__":
+    rng = np.random.RandomState(42)
+    required = required_staff(synthetic_orders_per_slot(rng), ORDERS_PER_STAFF_SLOT)
+    start = time.time()
+    shifts, shortage = solve_roster(required, STAFF, MIN_SLOTS, MAX_SLOTS)
+    elapsed = time.time() - start
+    print("%d shifts in %.2fs, understaffed staff-slots %d -> %d" % (
+        len(shifts), elapsed, understaffed_slots(required), understaffed_slots(shortage)))
@@ -0,0 +1,237 @@
+"""
+Benchmarks every widget and loader in events.py against seeded SQLite and PostgreSQL data sets.
+
+Each target is a database URL and the id of a data set in it that has the example foods loaded. For each size the
+data set is topped up with generated orders, then every case records its best wall time, the number of SQL statements
+it issued and its peak Python memory. Nothing is committed, so targets are left as they were.
+
+    $ python benchmarks/suite.py --target sqlite:///bench.db 1 --target postgresql://localhost/bench 1 --label v1.1
+    $ python benchmarks/suite.py --target sqlite:///bench.db 1 --compare --threshold 0.2
+
+Results are appended to a JSON history file (benchmarks/history.json by default). With --compare the new results are
+checked against the previous run in the history (or the run named by --baseline). Any case more than `threshold`
+slower, or issuing more queries, is flagged and the exit status is 1.
+"""
+import argparse, datetime, json, os, sys, time
+from sqlalchemy import create_engine, event
+from tropofy.database import DBSession
+from event_tracking_demo import Event, Food, Order, OrderDemographics, OrderRollup, Roster, Staff, Station, Stock, \
+    AgeBandChart, FoodByAgeBandTable, FoodPopularityChart, FoodPopByHourChart, load_example_data
+from event_tracking_demo.cache import widget_cache
+from event_tracking_demo.generate import OrderGenerator, insert_orders, menu_for
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2: peak memory is the growth of the process's maximum resident set instead
+    tracemalloc = None
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZES = [1000, 100000, 1000000]
+REPEATS = 3
+GRID_PAGE_SIZE = 50
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.json')
+
+
+class BenchDataSet(object):
+    """
+    Just enough of Tropofy's data set for the widgets and load_example_data.
+    """
+    def __init__(self, id):
+        self.id = id
+
+    def query(self, *entities):
+        return DBSession().query(*entities).filter_by(data_set_id=self.id)
+
+    def add(self, obj):
+        self.add_all([obj])
+
+    def add_all(self, objs):
+        for obj in objs:
+            obj.data_set_id = self.id
+        DBSession().add_all(objs)
+        DBSession().flush()
+
+
+class BenchAppSession(object):
+    def __init__(self, data_set):
+        self.data_set = data_set
+
+
+class QueryCounter(object):
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self.on_execute)
+
+    def on_execute(self, *args):
+        self.count += 1
+
+
+def measure(fn, counter, repeats=REPEATS, setup=None):
+    """
+    Returns {'seconds', 'queries', 'peak_kb'} for the best of `repeats` calls of fn(). Queries and memory are from
+    the first call. Without tracemalloc, memory is how far the call raised the process's peak resident set size, which
+    is 0 if it stayed under an earlier peak.
+    """
+    timings = []
+    queries = peak_kb = None
+    for attempt in range(repeats):
+        if setup is not None:
+            setup()
+        widget_cache.clear()
+        if attempt == 0 and tracemalloc is not None:
+            tracemalloc.start()
+        max_rss = _max_rss_kb()
+        before = counter.count
+        start = time.time()
+        fn()
+        timings.append(time.time() - start)
+        if attempt == 0:
+            queries = counter.count - before
+            if tracemalloc is not None:
+                peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+                tracemalloc.stop()
+            elif max_rss is not None:
+                peak_kb = _max_rss_kb() - max_rss
+    return {'seconds': min(timings), 'queries': queries, 'peak_kb': peak_kb}
+
+
+def _max_rss_kb():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss  # bytes on macOS, KiB elsewhere
+
+
+def grid_page(data_set, offset):
+    def fetch():
+        return DBSession().query(Order).filter(Order.data_set_id == data_set.id) \
+            .order_by(Order.id).offset(offset).limit(GRID_PAGE_SIZE).all()
+    return fetch
+
+
+def keyset_page(data_set, offset):
+    middle = DBSession().query(Order).filter(Order.data_set_id == data_set.id) \
+        .order_by(Order.timestamp, Order.id).offset(offset).first()
+    cursor = Order.cursor_for(middle) if middle is not None else None
+    return lambda: Order.get_page(data_set, cursor)
+
+
+def bench_example_loader(app_session, counter):
+    """
+    Times load_example_data into the (emptied) data set, rolling back after every attempt.
+    """
+    session = DBSession()
+
+    def empty_data_set():
+        session.rollback()
+        for model in (Stock, OrderDemographics, OrderRollup, Order, Event, Roster, Food, Staff, Station):
+            session.query(model).filter(model.data_set_id == app_session.data_set.id).delete(synchronize_session=False)
+
+    result = measure(lambda: load_example_data(app_session), counter, setup=empty_data_set)
+    session.rollback()
+    return result
+
+
+def report(key, result):
+    print("%-55s %8.4fs %5d queries %s" % (key, result['seconds'], result['queries'],
+                                           '' if result['peak_kb'] is None else '%d KiB peak' % result['peak_kb']))
+
+
+def bench_target(url, data_set_id):
+    engine = create_engine(url)
+    DBSession.remove()
+    DBSession.configure(bind=engine)
+    counter = QueryCounter(engine)
+    dialect = engine.dialect.name
+    app_session = BenchAppSession(BenchDataSet(data_set_id))
+    data_set = app_session.data_set
+    session = DBSession()
+    results = {}
+    key = '%s/example/load_example_data' % dialect
+    results[key] = bench_example_loader(app_session, counter)
+    report(key, results[key])
+
+    menu = menu_for(data_set)
+    if not menu:
+        raise ValueError("Data set %d in %s has no foods, load the example data first." % (data_set_id, url))
+    generator = OrderGenerator(menu, datetime.date(2017, 1, 2), seed=0)
+    cases = [
+        ('FoodPopularityChart', lambda: FoodPopularityChart().get_table_data(app_session)),
+        ('FoodPopByHourChart', lambda: FoodPopByHourChart().get_table_data(app_session)),
+        ('FoodPopByHourChart/15min', lambda: FoodPopByHourChart(15).get_table_data(app_session)),
+        ('AgeBandChart', lambda: AgeBandChart().get_table_data(app_session)),
+        ('FoodByAgeBandTable', lambda: FoodByAgeBandTable().get_table_data(app_session)),
+        ('Order.get_total_by_food', lambda: Order.get_total_by_food(data_set)),
+        ('SimpleGrid(Order)/first page', grid_page(data_set, 0)),
+        ('Order.get_page/first page', lambda: Order.get_page(data_set)),
+    ]
+    try:
+        for size in SIZES:
+            existing = session.query(Order).filter(Order.data_set_id == data_set_id).count()
+            if size > existing:
+                insert_orders(data_set, generator, size - existing)
+            for name, fn in cases + [('SimpleGrid(Order)/middle page', grid_page(data_set, size // 2)),
+                                     ('Order.get_page/middle page', keyset_page(data_set, size // 2))]:
+                key = '%s/%d/%s' % (dialect, size, name)
+                results[key] = measure(fn, counter)
+                report(key, results[key])
+    finally:
+        session.rollback()
+        DBSession.remove()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns descriptions of the cases in `results` that regressed against `baseline`.
+    """
+    regressions = []
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        new, old = results[key], baseline[key]
+        if old['seconds'] and new['seconds'] > old['seconds'] * (1 + threshold):
+            regressions.append("%s: %.4fs -> %.4fs (+%.0f%%)" % (key, old['seconds'], new['seconds'],
+                                                                100 * (new['seconds'] / old['seconds'] - 1)))
+        if old['queries'] is not None and new['queries'] > old['queries']:
+            regressions.append("%s: %d -> %d queries" % (key, old['queries'], new['queries']))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', nargs=2, action='append', required=True, metavar=('URL', 'DATA_SET_ID'))
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--label', default=None, help="name for this run, e.g. a release")
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--baseline', default=None, help="label of the run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown as a fraction")
+    args = parser.parse_args()
+
+    results = {}
+    for url, data_set_id in args.target:
+        results.update(bench_target(url, int(data_set_id)))
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history) as f:
+            history = json.load(f)
+    run = {'label': args.label, 'timestamp': datetime.datetime.now().isoformat(), 'results': results}
+
+    regressions = []
+    if args.compare:
+        baselines = [past for past in history if args.baseline is None or past['label'] == args.baseline]
+        if not baselines:
+            print("No baseline run to compare against.")
+        else:
+            regressions = compare(results, baselines[-1]['results'], args.threshold)
+            for regression in regressions:
+                print("REGRESSION " + regression)
+
+    history.append(run)
+    with open(args.history, 'w') as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+    sys.exit(1 if regressions else 0)
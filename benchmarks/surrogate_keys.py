@@ -0,0 +1,112 @@
+"""
+Compares the old text foreign keys (order.food holding the food title, food.station holding the station title) with
+the integer surrogate keys the models use now: on-disk size of the order table and its indexes, and the time of the
+food total and station revenue aggregations, on two SQLite files holding the same generated orders.
+
+    $ python benchmarks/surrogate_keys.py 1000000
+"""
+import datetime, os, shutil, sys, tempfile, time
+from sqlalchemy import create_engine
+from event_tracking_demo.generate import EXAMPLE_MENU, OrderGenerator
+
+RUNS = 5
+
+SCHEMAS = {
+    'text': [
+        'CREATE TABLE station (id INTEGER PRIMARY KEY, data_set_id INTEGER NOT NULL, title TEXT UNIQUE)',
+        'CREATE TABLE food (id INTEGER PRIMARY KEY, data_set_id INTEGER NOT NULL, '
+        'station TEXT NOT NULL REFERENCES station (title), title TEXT NOT NULL, price_cents INTEGER NOT NULL)',
+        'CREATE INDEX ix_food_data_set_title ON food (data_set_id, title)',
+        'CREATE TABLE "order" (id INTEGER PRIMARY KEY, data_set_id INTEGER NOT NULL, '
+        'food TEXT NOT NULL REFERENCES food (title), timestamp DATETIME NOT NULL, quantity INTEGER NOT NULL, '
+        'age INTEGER, postcode INTEGER)',
+        'CREATE INDEX ix_order_data_set_food_timestamp ON "order" (data_set_id, food, timestamp, id)',
+    ],
+    'integer': [
+        'CREATE TABLE station (id INTEGER PRIMARY KEY, data_set_id INTEGER NOT NULL, title TEXT UNIQUE)',
+        'CREATE TABLE food (id INTEGER PRIMARY KEY, data_set_id INTEGER NOT NULL, '
+        'station_id INTEGER NOT NULL REFERENCES station (id), title TEXT NOT NULL, price_cents INTEGER NOT NULL)',
+        'CREATE INDEX ix_food_data_set_title ON food (data_set_id, title)',
+        'CREATE TABLE "order" (id INTEGER PRIMARY KEY, data_set_id INTEGER NOT NULL, '
+        'food_id INTEGER NOT NULL REFERENCES food (id), timestamp DATETIME NOT NULL, quantity INTEGER NOT NULL, '
+        'age INTEGER, postcode INTEGER)',
+        'CREATE INDEX ix_order_data_set_food_timestamp ON "order" (data_set_id, food_id, timestamp, id)',
+    ],
+}
+
+# The statements behind Order.get_total_by_food and Order.get_revenue(by='station'), before and after
+QUERIES = {
+    'text': [
+        ('total by food', 'SELECT food.title, COALESCE(SUM("order".quantity), 0) FROM food '
+                          'LEFT OUTER JOIN "order" ON "order".food = food.title AND "order".data_set_id = 1 '
+                          'WHERE food.data_set_id = 1 GROUP BY food.title'),
+        ('revenue by station', 'SELECT food.station, SUM("order".quantity * food.price_cents) FROM "order" '
+                               'JOIN food ON food.title = "order".food WHERE "order".data_set_id = 1 '
+                               'GROUP BY food.station'),
+    ],
+    'integer': [
+        ('total by food', 'SELECT "order".food_id, SUM("order".quantity) FROM "order" WHERE "order".data_set_id = 1 '
+                          'GROUP BY "order".food_id'),
+        ('revenue by station', 'SELECT food.station_id, SUM("order".quantity * food.price_cents) FROM "order" '
+                               'JOIN food ON food.id = "order".food_id WHERE "order".data_set_id = 1 '
+                               'GROUP BY food.station_id'),
+    ],
+}
+
+
+def load(engine, keys, count):
+    stations = sorted(set(station for station, _ in EXAMPLE_MENU))
+    station_ids = dict((title, i) for i, title in enumerate(stations, 1))
+    food_keys = [title if keys == 'text' else i for i, (_, title) in enumerate(EXAMPLE_MENU, 1)]
+    food_column = 'food' if keys == 'text' else 'food_id'
+    with engine.begin() as connection:
+        for statement in SCHEMAS[keys]:
+            connection.execute(statement)
+        connection.execute('INSERT INTO station (id, data_set_id, title) VALUES (?, 1, ?)',
+                           [(station_id, title) for title, station_id in station_ids.items()])
+        connection.execute('INSERT INTO food (id, data_set_id, %s, title, price_cents) VALUES (?, 1, ?, ?, 1000)' % (
+            'station' if keys == 'text' else 'station_id'),
+            [(i, station if keys == 'text' else station_ids[station], title)
+             for i, (station, title) in enumerate(EXAMPLE_MENU, 1)])
+        generator = OrderGenerator(EXAMPLE_MENU, datetime.date(2017, 1, 2), seed=0)
+        for chunk in generator.chunks(count, 100000):
+            connection.execute(
+                'INSERT INTO "order" (data_set_id, %s, timestamp, quantity, age, postcode) VALUES (1, ?, ?, ?, ?, ?)'
+                % food_column,
+                list(zip([food_keys[i] for i in chunk.food.tolist()],
+                         [str(stamp) for stamp in chunk.timestamp.astype('datetime64[us]').tolist()],
+                         chunk.quantity.tolist(), chunk.age.tolist(), chunk.postcode.tolist())))
+    with engine.connect() as connection:
+        connection.execute('VACUUM')
+        connection.execute('ANALYZE')
+
+
+def best_time(engine, sql):
+    timings = []
+    with engine.connect() as connection:
+        for _ in xrange(RUNS):
+            start = time.time()
+            connection.execute(sql).fetchall()
+            timings.append(time.time() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    directory = tempfile.mkdtemp()
+    try:
+        results = {}
+        for keys in ('text', 'integer'):
+            path = os.path.join(directory, keys + '.db')
+            engine = create_engine('sqlite:///' + path)
+            load(engine, keys, count)
+            results[keys] = [('database size', os.path.getsize(path) / 1024.0 / 1024.0, 'MiB')] + \
+                [(name, best_time(engine, sql) * 1000, 'ms') for name, sql in QUERIES[keys]]
+            engine.dispose()
+        print("%d orders" % count)
+        print("%-20s %12s %12s %8s" % ('', 'text keys', 'integer keys', 'change'))
+        for (name, before, unit), (_, after, _) in zip(results['text'], results['integer']):
+            print("%-20s %9.1f %-2s %9.1f %-2s %+7.0f%%" % (name, before, unit, after, unit,
+                                                             (after - before) / before * 100))
+    finally:
+        shutil.rmtree(directory)
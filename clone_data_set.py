@@ -0,0 +1,23 @@
+"""
+Copies every station, staff member, food, shift and order of one data set into another, empty, data set.
+
+    $ python clone_data_set.py sqlite:///events.db <source data set id> <target data set id>
+"""
+import sys, time
+from sqlalchemy import create_engine
+from tropofy.database import DBSession
+from event_tracking_demo.clone import clone_data_set
+
+
+class CloneDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+if __name__ == "__main__":
+    DBSession.configure(bind=create_engine(sys.argv[1]))
+    started = time.time()
+    copied = clone_data_set(CloneDataSet(int(sys.argv[2])), CloneDataSet(int(sys.argv[3])))
+    DBSession().commit()
+    print("Copied %s in %.1fs" % (', '.join('%d %s rows' % (count, name) for name, count in sorted(copied.items())),
+                                  time.time() - started))
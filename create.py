@@ -1,22 +1,57 @@
-import random
-
-foods = ["Banh Mi",
-         "Rice Noodle Salad",
-         "Prawn Soup",
-         "Vietnamese Spring Rolls",
-         "Honey Chicken",
-         "Lemon Chicken",
-         "Wonton Soup",
-         "Chinese Spring Rolls",
-         "Sweet and Sour Pork",
-         "Spanish Meatballs",
-         "Seafood Paella"]
+"""
+Generates synthetic orders, either as a JSONL file or straight into an existing data set.
+
+    $ python create.py --orders 1000000 --days 3 --seed 1 --out orders.jsonl
+    $ python create.py --orders 1000000 --days 3 --seed 1 --db sqlite:///events.db --data-set-id 1
+"""
+import argparse, datetime, time
+from sqlalchemy import create_engine
+from tropofy.database import DBSession
+from event_tracking_demo.generate import EXAMPLE_MENU, OrderGenerator, insert_orders, menu_for, write_jsonl
+
+
+class GeneratorDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+def parse_weights(pairs):
+    weights = {}
+    for pair in pairs or []:
+        title, weight = pair.rsplit('=', 1)
+        weights[title] = float(weight)
+    return weights
+
 
 if __name__ == "__main__":
-    for _ in range(0, 1000):
-        f = foods[random.randint(0, len(foods) - 1)]
-        quantity = str(random.randint(0, 5))
-        age = str(random.randint(12, 70))
-        postcode = str(random.randint(1000, 5000)) # Yeah, I know
-        s = ("Order(\"" + f + "\", datetime.datetime(2017, 1, 2, random.randint(6, 18)), " + quantity + ", " + age + ", " + postcode + "),")
-        print(s)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--start', default='2017-01-02', help="first day, YYYY-MM-DD")
+    parser.add_argument('--days', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--food-weight', action='append', metavar='TITLE=WEIGHT')
+    parser.add_argument('--station-weight', action='append', metavar='TITLE=WEIGHT')
+    parser.add_argument('--out', help="JSONL file to write")
+    parser.add_argument('--db', help="database URL to insert into (with --data-set-id)")
+    parser.add_argument('--data-set-id', type=int)
+    args = parser.parse_args()
+    if bool(args.out) == bool(args.db):
+        parser.error("give exactly one of --out or --db")
+
+    menu = EXAMPLE_MENU
+    if args.db:
+        DBSession.configure(bind=create_engine(args.db))
+        data_set = GeneratorDataSet(args.data_set_id)
+        menu = menu_for(data_set)
+    generator = OrderGenerator(menu, datetime.datetime.strptime(args.start, '%Y-%m-%d').date(), args.days, args.seed,
+                               parse_weights(args.food_weight), parse_weights(args.station_weight))
+
+    started = time.time()
+    if args.out:
+        with open(args.out, 'w') as f:
+            write_jsonl(generator, args.orders, f)
+    else:
+        insert_orders(data_set, generator, args.orders)
+        DBSession().commit()
+    elapsed = time.time() - started
+    print("%d orders in %.1fs (%.0f rows/sec)" % (args.orders, elapsed, args.orders / elapsed if elapsed else 0))
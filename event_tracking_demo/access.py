@@ -0,0 +1,56 @@
+"""
+Access tokens for the HTTP endpoints served in front of the Tropofy app.
+
+A token lets its holder use one kind of endpoint (its scope: 'ingest' for posting orders, see live.py, 'api' for
+reading them, see api.py, or 'push' for following the charts, see push.py) for one data set, until it expires. It's "<expiry>.<signature>", where the signature is an
+HMAC-SHA256 of the scope, data set id and expiry under the server's `ACCESS_SECRET`, so nothing needs storing and a
+token for one data set is useless for any other. Tokens are only issued to whoever can open the data set in the app (see `events.AccessTokens`), which
+Tropofy only lets its owner do.
+
+`token_signer` is set by run.py when `ACCESS_SECRET` is configured. Without it the endpoints aren't served.
+"""
+import hashlib, hmac, time
+
+# scope -> seconds a token for it lasts
+LIFETIMES = {
+    'ingest': 90 * 86400,  # configured on a till for the season
+    'api': 30 * 86400,
+    'push': 15 * 60,  # sent in the URL, so it's logged: fetched with an api token just before it's used
+}
+APP_SCOPES = ['api', 'ingest']  # issued in the app, see `events.AccessTokens`
+
+token_signer = None
+
+
+class TokenSigner(object):
+    def __init__(self, secret):
+        if not secret:
+            raise ValueError("Access tokens need a secret to sign them with")
+        self.secret = secret.encode('utf-8')
+
+    def issue(self, scope, data_set_id, now=None):
+        """
+        Returns a token for `scope` on the data set, lasting LIFETIMES[scope] seconds.
+        """
+        expires = int((time.time() if now is None else now) + LIFETIMES[scope])
+        return '%d.%s' % (expires, self._sign(scope, data_set_id, expires))
+
+    def check(self, scope, data_set_id, token, now=None):
+        """
+        Whether `token` (as sent by the client, possibly None) grants `scope` on the data set.
+        """
+        try:
+            expires, signature = token.split('.', 1)
+            expires = int(expires)
+        except (AttributeError, ValueError):
+            return False
+        if expires < (time.time() if now is None else now):
+            return False
+        try:
+            return hmac.compare_digest(signature, self._sign(scope, data_set_id, expires))
+        except TypeError:  # not ASCII, so not one of ours
+            return False
+
+    def _sign(self, scope, data_set_id, expires):
+        message = ('%s:%d:%d' % (scope, data_set_id, expires)).encode('utf-8')
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
@@ -0,0 +1,114 @@
+"""
+Read-only JSON endpoints served in front of the Tropofy app.
+
+    GET /orders/<data set id>   one page of orders, see `Order.get_page`. Query parameters: after (the `next` cursor
+                                from the previous page), limit, sort, desc=1, event (a title), food, station,
+                                first_hour, last_hour, min_age, max_age, postcode.
+    GET /orders/<data set id>/export
+                                every order, streamed. Query parameters: format (csv, jsonl, arrow or parquet) and
+                                optionally start and end timestamps (YYYY-MM-DD HH:MM:SS).
+
+Requests must send an 'api' access token for the data set (see access.py) in an X-Api-Token header.
+"""
+import json, re
+from tropofy.database import DBSession
+from .events import Event, Order
+from .export import FORMATS, iter_export
+from .ingest import parse_timestamp
+
+try:
+    from urllib.parse import parse_qs
+except ImportError:
+    from urlparse import parse_qs
+
+MAX_PAGE_SIZE = 500
+INT_PARAMETERS = ('first_hour', 'last_hour', 'min_age', 'max_age', 'postcode')
+
+
+def order_page(environ, start_response, data_set_id):
+    params = dict((key, values[-1]) for key, values in parse_qs(environ.get('QUERY_STRING', '')).items())
+    filters = dict((key, int(params[key])) for key in INT_PARAMETERS if key in params)
+    sort = params.get('sort', 'timestamp')
+    if sort not in Order.PAGE_SORTS:
+        raise ValueError("sort must be one of %s" % ', '.join(sorted(Order.PAGE_SORTS)))
+    data_set = ApiDataSet(data_set_id)
+    if 'event' in params:
+        filters['start_date'], filters['end_date'] = Event.get_days(data_set, params['event'])
+    orders, next_cursor = Order.get_page(
+        data_set, after=params.get('after'), limit=min(int(params.get('limit', 50)), MAX_PAGE_SIZE),
+        sort=sort, descending=params.get('desc') == '1', food=params.get('food'), station=params.get('station'),
+        **filters)
+    return respond(start_response, '200 OK', {
+        'orders': [dict(order.serialise, id=order.id, timestamp=order.timestamp.isoformat()) for order in orders],
+        'next': next_cursor,
+    })
+
+
+def order_export(environ, start_response, data_set_id):
+    params = dict((key, values[-1]) for key, values in parse_qs(environ.get('QUERY_STRING', '')).items())
+    file_format = params.get('format', 'csv')
+    start = parse_timestamp(params['start']) if 'start' in params else None
+    end = parse_timestamp(params['end']) if 'end' in params else None
+    body = iter_export(data_set_id, file_format, start=start, end=end)
+    first = next(body, b'')  # surfaces a bad format before the response has started
+    start_response('200 OK', [
+        ('Content-Type', FORMATS[file_format]),
+        ('Content-Disposition', 'attachment; filename="orders-%d.%s"' % (data_set_id, file_format)),
+    ])
+    return _chain(first, body)
+
+
+def _chain(first, rest):
+    yield first
+    for data in rest:
+        yield data
+
+
+class ApiDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+def respond(start_response, status, body, headers=()):
+    payload = json.dumps(body).encode('utf-8')
+    start_response(status, [('Content-Type', 'application/json'),
+                            ('Content-Length', str(len(payload)))] + list(headers))
+    return [payload]
+
+
+class ApiMiddleware(object):
+    """
+    WSGI middleware serving the endpoints above in front of `app`, checking tokens with `signer` (an
+    access.TokenSigner).
+    """
+    # (method, path pattern whose first group is the data set id, handler called with environ, start_response and the
+    # pattern's groups as ints)
+    ROUTES = [
+        ('GET', re.compile(r'^/orders/(\d+)/?$'), order_page),
+        ('GET', re.compile(r'^/orders/(\d+)/export/?$'), order_export),
+    ]
+
+    def __init__(self, app, signer):
+        if signer is None:
+            raise ValueError("The API needs a TokenSigner to check access tokens with")
+        self.app = app
+        self.signer = signer
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        for method, pattern, handler in self.ROUTES:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if environ['REQUEST_METHOD'] != method:
+                return respond(start_response, '405 Method Not Allowed', {'error': 'use %s' % method})
+            groups = [int(group) for group in match.groups()]
+            if not self.signer.check('api', groups[0], environ.get('HTTP_X_API_TOKEN')):
+                return respond(start_response, '403 Forbidden', {'error': 'bad API token'})
+            try:
+                return handler(environ, start_response, *groups)
+            except (KeyError, TypeError, ValueError) as e:
+                return respond(start_response, '400 Bad Request', {'error': str(e)})
+            finally:
+                DBSession.remove()
+        return self.app(environ, start_response)
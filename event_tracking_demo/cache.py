@@ -0,0 +1,154 @@
+"""
+Caching of widget payloads per data set version.
+
+Every data set has an in-process version number that is bumped after a commit changes any tracked model in it (see
+`track_data_set_changes`). Widget methods decorated with `cached_widget_data` are keyed on (widget class, widget
+configuration, data set id, version), so a repeat render of unchanged data is a dictionary lookup. Code that writes
+with Core statements instead of the ORM must call `bump_on_commit` with the session, or `data_set_versions.bump`
+itself after committing. Writes made by other processes can't be seen, so entries also expire after `max_age`
+seconds.
+
+If `widget_renderer` is set (see render.StepRenderer), misses are computed through it, so a step's other widgets are
+computed alongside.
+"""
+import functools, pickle, threading, time
+from collections import OrderedDict
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class DataSetVersions(object):
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, data_set_id):
+        return self._versions.get(data_set_id, 0)
+
+    def bump(self, *data_set_ids):
+        with self._lock:
+            for data_set_id in data_set_ids:
+                self._versions[data_set_id] = self._versions.get(data_set_id, 0) + 1
+
+
+class ResultCache(object):
+    """
+    Thread safe LRU cache bounded by both entry count and (pickled) payload size.
+    """
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, max_age=30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size, stored at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry[2] > self.max_age:
+                self._bytes -= entry[1]
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size, time.time())
+            self._bytes += size
+            if len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop_expired()
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def _drop_expired(self):
+        """
+        Drops expired entries, e.g. of data set versions that will never be asked for again, so they don't take the
+        place of live ones.
+        """
+        stale_before = time.time() - self.max_age
+        for key in [key for key, (_, _, stored_at) in self._entries.items() if stored_at < stale_before]:
+            self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._entries), 'bytes': self._bytes}
+
+
+data_set_versions = DataSetVersions()
+widget_cache = ResultCache()
+widget_renderer = None
+
+
+def widget_cache_key(widget, method_name, data_set_id):
+    get_cache_key = getattr(widget, 'get_cache_key', None)
+    return (type(widget).__name__, method_name, get_cache_key() if get_cache_key else (), data_set_id,
+            data_set_versions.get(data_set_id))
+
+
+def cached_widget_data(method):
+    """
+    Decorates a widget's `get_table_data`/`get_data(self, app_session)`. Widgets whose output depends on constructor
+    arguments should define `get_cache_key()` returning them as a hashable tuple.
+    """
+    @functools.wraps(method)
+    def wrapper(self, app_session):
+        key = widget_cache_key(self, method.__name__, app_session.data_set.id)
+        value = widget_cache.get(key)
+        if value is None and widget_renderer is not None:
+            value = widget_renderer.render(self, method.__name__, app_session)
+        elif value is None:
+            value = method(self, app_session)
+            widget_cache.put(key, value)
+        return value
+    wrapper.uncached = method
+    return wrapper
+
+
+def bump_on_commit(session, *data_set_ids):
+    """
+    Has the versions of `data_set_ids` bumped when `session` commits, as if a tracked model in them had changed.
+    """
+    session.info.setdefault('changed_data_set_ids', set()).update(data_set_ids)
+
+
+def track_data_set_changes(*models):
+    """
+    Bumps the version of every data set with a row of one of `models` inserted, updated or deleted by a committed
+    session.
+    """
+    @event.listens_for(Session, 'after_flush')
+    def collect(session, flush_context):
+        changed = session.info.setdefault('changed_data_set_ids', set())
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if isinstance(obj, models):
+                changed.add(obj.data_set_id)
+
+    @event.listens_for(Session, 'after_commit')
+    def bump(session):
+        data_set_versions.bump(*session.info.pop('changed_data_set_ids', ()))
+
+    @event.listens_for(Session, 'after_rollback')
+    def discard(session):
+        session.info.pop('changed_data_set_ids', None)
@@ -0,0 +1,81 @@
+"""
+Copying a data set into another, e.g. to try a scenario on a copy of a real event.
+
+Stations, staff and foods are copied a row at a time so their new ids are known. Everything that refers to them
+(shifts, orders, the order aggregates and stock) is then copied inside the database with INSERT ... SELECT, swapping
+the old ids for the new ones with a CASE expression, so a million orders are never loaded into Python.
+"""
+from sqlalchemy.sql import case, literal_column, select
+from tropofy.database import DBSession
+from .cache import bump_on_commit
+from .events import ArchivedOrder, Event, Food, Order, OrderDemographics, OrderRollup, Roster, Staff, Station, \
+    Stock
+
+# (model, {foreign key column: referenced model}), each after the models it refers to
+COPIED_BY_ROW = [
+    (Station, {}),
+    (Staff, {}),
+    (Food, {'station_id': Station}),
+]
+COPIED_IN_DATABASE = [
+    (Event, {}),  # the partitions for its days are already there, for the source's events
+    (Roster, {'station_id': Station, 'staff_id': Staff}),
+    (Order, {'food_id': Food}),
+    (ArchivedOrder, {'food_id': Food}),
+    (OrderRollup, {'food_id': Food, 'station_id': Station}),
+    (OrderDemographics, {'food_id': Food}),
+    (Stock, {'food_id': Food}),
+]
+
+
+def clone_data_set(source, target):
+    """
+    Copies the source data set's rows into the target, which must be empty. Returns {table name: rows copied}.
+    Nothing is committed; the target's version is bumped when the session is.
+    """
+    session = DBSession()
+    for model, _ in COPIED_BY_ROW + COPIED_IN_DATABASE:
+        if session.query(model.id).filter(model.data_set_id == target.id).first() is not None:
+            raise ValueError("Data set %d already has %s rows" % (target.id, model.__tablename__))
+
+    new_ids = {}  # model -> {source id: target id}
+    copied = {}
+    for model, references in COPIED_BY_ROW:
+        table = model.__table__
+        new_ids[model] = {}
+        for row in session.execute(select([table]).where(table.c.data_set_id == source.id).order_by(table.c.id)):
+            values = dict(row)
+            values.pop('id')
+            values['data_set_id'] = target.id
+            for name, referenced in references.items():
+                values[name] = new_ids[referenced][values[name]]
+            new_ids[model][row['id']] = session.execute(table.insert().values(values)).inserted_primary_key[0]
+        copied[table.name] = len(new_ids[model])
+
+    for model, references in COPIED_IN_DATABASE:
+        table = model.__table__
+        columns = [column for column in table.columns if column.name != 'id']
+        values = []
+        for column in columns:
+            if column.name == 'data_set_id':
+                values.append(literal_column(str(int(target.id))))
+            elif column.name in references:
+                values.append(_swap_ids(column, new_ids[references[column.name]]))
+            else:
+                values.append(column)
+        copied[table.name] = session.execute(table.insert().from_select(
+            [column.name for column in columns],
+            select(values).where(table.c.data_set_id == source.id))).rowcount
+    session.flush()
+    bump_on_commit(session, target.id)
+    return copied
+
+
+def _swap_ids(column, new_ids):
+    """
+    `column` with each id replaced by its value in `new_ids`. Constants are rendered inline, as there can be more of
+    them than a statement allows parameters.
+    """
+    if not new_ids:
+        return column
+    return case([(column == literal_column(str(old)), literal_column(str(new))) for old, new in new_ids.items()])
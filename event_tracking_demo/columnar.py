@@ -0,0 +1,323 @@
+"""
+In-process columnar copy of each data set's orders, for aggregates that would otherwise be a database round trip.
+
+A data set's orders are held as parallel NumPy arrays: food dictionary-encoded to small codes, timestamps as int32
+minutes since the epoch, quantity and age as uint8 and postcode as uint16, so a million orders take about 19MB.
+Filters become boolean masks and group-bys become `np.bincount`, so aggregates over the whole data set take
+milliseconds.
+
+The copy is brought up to date whenever the data set's version has changed (or it's older than `max_age`, for writes
+from other processes). Orders with ids past the last one loaded are appended. Orders updated or deleted through the
+ORM are re-read by id (`OrderColumnStore.touched` is called from mapper events in events.py). If the row count still
+doesn't match the database, the data set is reloaded from scratch. Core UPDATEs aren't seen and need `invalidate`.
+Data sets with more than `max_rows` orders, or with values too large for their column type, aren't held at all and
+`get` returns None, so callers fall back to SQL.
+"""
+import threading, time
+import numpy as np
+from sqlalchemy import Text
+from sqlalchemy.sql import cast, func, select
+from tropofy.database import DBSession
+from .cache import data_set_versions
+
+NO_AGE = 255
+NO_POSTCODE = 0
+
+_LOAD_BATCH = 50000
+_TOUCHED_BATCH = 500
+_DENSE_GROUPS = 1 << 20
+
+
+class OrderColumns(object):
+    COLUMNS = [('ids', np.int64), ('food', np.int16), ('minute', np.int32), ('quantity', np.uint8), ('age', np.uint8),
+               ('postcode', np.uint16), ('alive', np.bool_)]
+
+    def __init__(self):
+        self.size = 0
+        self.deleted = 0
+        self.max_id = 0
+        self.food_ids = np.zeros(0, np.int64)  # food code -> food id
+        self._codes = {}  # food id -> food code
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(1024, dtype))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.size - self.deleted
+
+    def append(self, rows):
+        """
+        Appends (id, food id, timestamp, quantity, age, postcode) rows in id order, past `max_id`. Timestamps may be
+        datetimes or ISO format strings.
+        """
+        if not rows:
+            return
+        ids, food, minute, quantity, age, postcode = self._encode(rows)
+        with self._lock:
+            end = self.size + len(ids)
+            if end > len(self.ids):
+                capacity = max(end, 2 * len(self.ids))
+                for name, _ in self.COLUMNS:
+                    column = getattr(self, name)
+                    grown = np.zeros(capacity, column.dtype)
+                    grown[:self.size] = column[:self.size]
+                    setattr(self, name, grown)
+            for name, values in (('ids', ids), ('food', food), ('minute', minute), ('quantity', quantity),
+                                 ('age', age), ('postcode', postcode)):
+                getattr(self, name)[self.size:end] = values
+            self.alive[self.size:end] = True
+            self.size = end
+            self.max_id = int(ids[-1])
+
+    def replace(self, ids, rows):
+        """
+        Overwrites the orders with the given ids with `rows` (as for `append`), and drops those of them that aren't
+        in `rows` (they've been deleted).
+        """
+        ids = np.asarray(sorted(ids), np.int64)
+        with self._lock:
+            positions = np.searchsorted(self.ids[:self.size], ids)
+            found = positions < self.size
+            found[found] = self.ids[positions[found]] == ids[found]
+            positions = positions[found]
+            self.deleted += int(np.count_nonzero(self.alive[positions]))
+            self.alive[positions] = False
+        if not rows:
+            return
+        new_ids, food, minute, quantity, age, postcode = self._encode(rows)
+        with self._lock:
+            positions = np.searchsorted(self.ids[:self.size], new_ids)
+            for name, values in (('food', food), ('minute', minute), ('quantity', quantity), ('age', age),
+                                 ('postcode', postcode)):
+                getattr(self, name)[positions] = values
+            self.deleted -= len(positions)
+            self.alive[positions] = True
+            if self.deleted > self.size // 4:
+                self._compact()
+
+    def _compact(self):
+        keep = self.alive[:self.size]
+        for name, _ in self.COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column[:self.size][keep], np.zeros(1024, column.dtype)]))
+        self.size -= self.deleted
+        self.deleted = 0
+
+    def _encode(self, rows):
+        ids, food_ids, timestamps, quantity, age, postcode = zip(*rows)
+        for food_id in food_ids:
+            if food_id not in self._codes:
+                self._codes[food_id] = len(self.food_ids)
+                self.food_ids = np.append(self.food_ids, food_id)
+        if len(self.food_ids) > np.iinfo(np.int16).max:
+            raise ValueError("too many foods")
+        quantity = np.asarray(quantity, np.int64)
+        age = np.asarray([NO_AGE if value is None else value for value in age], np.int64)
+        postcode = np.asarray([NO_POSTCODE if value is None else value for value in postcode], np.int64)
+        if (quantity.min() < 0 or quantity.max() > 255 or age.min() < 0 or age.max() > NO_AGE or postcode.min() < 0 or
+                postcode.max() > 65535):
+            raise ValueError("order values don't fit their column types")
+        return (np.asarray(ids, np.int64),
+                np.asarray([self._codes[food_id] for food_id in food_ids], np.int16),
+                np.asarray(timestamps, 'datetime64[us]').astype('datetime64[m]').astype(np.int64).astype(np.int32),
+                quantity.astype(np.uint8), age.astype(np.uint8), postcode.astype(np.uint16))
+
+    def mask(self, food_ids=None, start_date=None, end_date=None, first_hour=None, last_hour=None, min_age=None,
+             max_age=None, postcode=None):
+        """
+        Boolean mask over the first `size` rows selecting live orders that pass every given filter. Filters mean the
+        same as Order.get_page's; dates are inclusive.
+        """
+        size = self.size
+        mask = self.alive[:size].copy()
+        if food_ids is not None:
+            mask &= np.isin(self.food[:size], [self._codes[food_id] for food_id in food_ids if food_id in self._codes])
+        if start_date is not None:
+            mask &= self.minute[:size] >= _epoch_minute(start_date)
+        if end_date is not None:
+            mask &= self.minute[:size] < _epoch_minute(end_date) + 24 * 60
+        if first_hour is not None or last_hour is not None:
+            hour = self.minute[:size] % (24 * 60) // 60
+            mask &= (hour >= (first_hour or 0)) & (hour <= (23 if last_hour is None else last_hour))
+        if min_age is not None or max_age is not None:
+            age = self.age[:size]
+            mask &= (age != NO_AGE) & (age >= (min_age or 0)) & (age <= (NO_AGE - 1 if max_age is None else max_age))
+        if postcode is not None:
+            mask &= self.postcode[:size] == postcode
+        return mask
+
+    def aggregate(self, by, measure='quantity', bucket_minutes=60, food_stations=None, food_prices=None, **filters):
+        """
+        Returns {group: total} for the groups with orders. `by` is one of, or a tuple of:
+
+        * 'food' (food id) or 'station' (station id, needs `food_stations` {food id: station id})
+        * 'minute' (minute of the day starting a `bucket_minutes` wide bucket) or 'hour' (hour of the day)
+        * 'age' or 'postcode' (orders without one are left out)
+
+        and tuple groups are tuples of those. `measure` is 'quantity', 'orders' or 'revenue' (cents, needs
+        `food_prices` {food id: cents}). `filters` are as for `mask`.
+        """
+        with self._lock:
+            mask = self.mask(**filters)
+            names = by if isinstance(by, tuple) else (by,)
+            keys, labels = [], []
+            for name in names:
+                key, label = self._group(name, mask, bucket_minutes, food_stations)
+                keys.append(key)
+                labels.append(label)
+                if name == 'age':
+                    mask &= self.age[:self.size] != NO_AGE
+                elif name == 'postcode':
+                    mask &= self.postcode[:self.size] != NO_POSTCODE
+            if measure == 'orders':
+                weights = None
+            elif measure == 'quantity':
+                weights = self.quantity[:self.size][mask]
+            elif measure == 'revenue':
+                prices = np.asarray([food_prices.get(food_id, 0) for food_id in self.food_ids.tolist()], np.int64)
+                weights = self.quantity[:self.size][mask] * prices[self.food[:self.size][mask]]
+            else:
+                raise ValueError("measure must be 'quantity', 'orders' or 'revenue'")
+            shape = tuple(len(label) for label in labels)
+            flat = np.ravel_multi_index([key[mask].astype(np.int64) for key in keys], shape)
+            if np.prod(shape, dtype=np.float64) > _DENSE_GROUPS:  # Too many combinations to count densely
+                groups, flat = np.unique(flat, return_inverse=True)
+            else:
+                groups = np.arange(int(np.prod(shape)))
+            totals = np.bincount(flat, weights, minlength=len(groups))
+            if weights is None or weights.dtype.kind in 'iu':
+                totals = totals.astype(np.int64)
+        result = {}
+        for i in np.flatnonzero(totals).tolist():
+            group = tuple(label[j] for label, j in zip(labels, np.unravel_index(groups[i], shape)))
+            result[group if isinstance(by, tuple) else group[0]] = totals.item(i)
+        return result
+
+    def _group(self, name, mask, bucket_minutes, food_stations):
+        """
+        Returns (a small non-negative key per row, the group label for each key).
+        """
+        size = self.size
+        if name == 'food':
+            return self.food[:size], self.food_ids.tolist()
+        if name == 'station':
+            stations, codes = np.unique([food_stations[food_id] for food_id in self.food_ids.tolist()] or [0],
+                                        return_inverse=True)
+            return codes[self.food[:size]], stations.tolist()
+        if name == 'minute':
+            minute = self.minute[:size] % (24 * 60)
+            return minute // bucket_minutes, list(range(0, 24 * 60, bucket_minutes))
+        if name == 'hour':
+            return self.minute[:size] % (24 * 60) // 60, list(range(24))
+        if name == 'age':
+            return self.age[:size], list(range(NO_AGE + 1))
+        if name == 'postcode':
+            return self.postcode[:size], list(range(65536))
+        raise ValueError("Can't group orders by %r" % (name,))
+
+
+class OrderColumnStore(object):
+    """
+    Holds an OrderColumns per data set, loaded from `table` (Order's) on first use. `max_rows` of 0 turns it off.
+    """
+    def __init__(self, table, max_rows=0, max_age=30):
+        self.table = table
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._columns = {}  # data set id -> (OrderColumns or None, version, synced at)
+        self._touched = {}  # data set id -> ids of orders updated or deleted since the last sync
+        self._sync_locks = {}  # data set id -> lock held while it's synced
+        self._lock = threading.Lock()
+
+    def get(self, data_set_id):
+        """
+        The data set's OrderColumns, brought up to date on a connection of its own (so only committed orders are
+        seen), or None if the store is off or the data set doesn't fit. Only one thread syncs a data set at a time,
+        and other data sets' columns can be read meanwhile.
+        """
+        if not self.max_rows:
+            return None
+        version = data_set_versions.get(data_set_id)
+        columns = self._current(data_set_id, version)
+        if columns is not False:
+            return columns
+        with self._lock:
+            sync_lock = self._sync_locks.setdefault(data_set_id, threading.Lock())
+        with sync_lock:
+            columns = self._current(data_set_id, version)  # synced by another thread while this one waited
+            if columns is not False:
+                return columns
+            with self._lock:
+                columns = self._columns.get(data_set_id, (None,))[0]
+                touched = self._touched.pop(data_set_id, set())
+            connection = DBSession().get_bind().connect()
+            try:
+                try:
+                    columns = self._sync(connection, data_set_id, columns, touched)
+                except ValueError:
+                    columns = None
+            finally:
+                connection.close()
+            with self._lock:
+                self._columns[data_set_id] = (columns, version, time.time())
+            return columns
+
+    def _current(self, data_set_id, version):
+        """
+        The data set's OrderColumns (or None) if they're up to date with `version`, otherwise False.
+        """
+        with self._lock:
+            columns, synced_version, synced_at = self._columns.get(data_set_id, (None, None, 0))
+            if synced_version == version and time.time() - synced_at <= self.max_age:
+                return columns
+            return False
+
+    def touched(self, data_set_id, order_id):
+        with self._lock:
+            self._touched.setdefault(data_set_id, set()).add(order_id)
+
+    def invalidate(self, data_set_id=None):
+        with self._lock:
+            if data_set_id is None:
+                self._columns.clear()
+            else:
+                self._columns.pop(data_set_id, None)
+
+    def _sync(self, connection, data_set_id, columns, touched):
+        table = self.table
+        count = connection.execute(select([func.count(table.c.id)]).where(table.c.data_set_id == data_set_id)).scalar()
+        if count > self.max_rows:
+            return None
+        if columns is not None:
+            self._append(connection, data_set_id, columns, columns.max_id)
+            touched = [order_id for order_id in touched if order_id <= columns.max_id]
+            for i in range(0, len(touched), _TOUCHED_BATCH):
+                ids = touched[i:i + _TOUCHED_BATCH]
+                columns.replace(ids, connection.execute(self._select(data_set_id).where(table.c.id.in_(ids))).fetchall())
+            if len(columns) == count:
+                return columns
+        columns = OrderColumns()
+        self._append(connection, data_set_id, columns, None)
+        return columns
+
+    def _select(self, data_set_id):
+        table = self.table
+        # Timestamps are read as text: NumPy parses ISO strings far faster than it converts datetime objects
+        return select([table.c.id, table.c.food_id, cast(table.c.timestamp, Text), table.c.quantity, table.c.age,
+                       table.c.postcode]).where(table.c.data_set_id == data_set_id)
+
+    def _append(self, connection, data_set_id, columns, after_id):
+        query = self._select(data_set_id)
+        if after_id is not None:
+            query = query.where(self.table.c.id > after_id)
+        # Rows are kept in id order, which `replace` relies on to find them
+        result = connection.execution_options(stream_results=True).execute(query.order_by(self.table.c.id))
+        while True:
+            rows = result.fetchmany(_LOAD_BATCH)
+            if not rows:
+                break
+            columns.append(rows)
+
+
+def _epoch_minute(date):
+    return int(np.datetime64(date, 'D').astype('datetime64[m]').astype(np.int64))
@@ -0,0 +1,85 @@
+"""
+Age bands and postcode regions that orders are bucketed into for the demographic breakdowns.
+
+Each order is bucketed once, when its OrderDemographics totals are updated, with `age_band` and `postcode_region`.
+`age_band_case` and `postcode_region_case` are the same buckets as SQL CASE expressions, for rebuilding the totals
+in the database.
+"""
+from sqlalchemy.sql import case, literal_column
+
+UNKNOWN_AGE_BAND = -1
+UNKNOWN_REGION = 'Unknown'
+
+# (youngest age in the band, label), oldest band last
+AGE_BANDS = [
+    (0, '0-17'),
+    (18, '18-24'),
+    (25, '25-34'),
+    (35, '35-44'),
+    (45, '45-54'),
+    (55, '55-64'),
+    (65, '65+'),
+]
+
+# (first postcode, last postcode, region) for Australian postcodes, checked in order
+POSTCODE_REGIONS = [
+    (200, 299, 'ACT'),
+    (800, 999, 'NT'),
+    (1000, 2599, 'NSW'),
+    (2600, 2618, 'ACT'),
+    (2619, 2899, 'NSW'),
+    (2900, 2920, 'ACT'),
+    (2921, 2999, 'NSW'),
+    (3000, 3999, 'VIC'),
+    (4000, 4999, 'QLD'),
+    (5000, 5999, 'SA'),
+    (6000, 6999, 'WA'),
+    (7000, 7999, 'TAS'),
+    (8000, 8999, 'VIC'),
+    (9000, 9999, 'QLD'),
+]
+
+REGIONS = ['ACT', 'NSW', 'NT', 'QLD', 'SA', 'TAS', 'VIC', 'WA', UNKNOWN_REGION]
+
+
+def age_band(age):
+    """
+    The youngest age of the band `age` falls in, or UNKNOWN_AGE_BAND.
+    """
+    if age is None or age < 0:
+        return UNKNOWN_AGE_BAND
+    band = UNKNOWN_AGE_BAND
+    for youngest, _ in AGE_BANDS:
+        if age >= youngest:
+            band = youngest
+    return band
+
+
+def age_band_label(band):
+    return dict(AGE_BANDS).get(band, 'Unknown')
+
+
+def postcode_region(postcode):
+    if postcode is not None:
+        for first, last, region in POSTCODE_REGIONS:
+            if first <= postcode <= last:
+                return region
+    return UNKNOWN_REGION
+
+
+def age_band_case(age):
+    """
+    `age_band` as a SQL expression over the `age` column. Constants are rendered inline so the expression can be
+    grouped by on PostgreSQL.
+    """
+    return case([(age >= literal_column(str(youngest)), literal_column(str(youngest)))
+                 for youngest, _ in reversed(AGE_BANDS)], else_=literal_column(str(UNKNOWN_AGE_BAND)))
+
+
+def postcode_region_case(postcode):
+    """
+    `postcode_region` as a SQL expression over the `postcode` column.
+    """
+    return case([(postcode.between(literal_column(str(first)), literal_column(str(last))),
+                  literal_column("'%s'" % region)) for first, last, region in POSTCODE_REGIONS],
+                else_=literal_column("'%s'" % UNKNOWN_REGION))
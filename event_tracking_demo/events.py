@@ -5,13 +5,33 @@ Author  : Henry Chladil <henry.ponco@gmail.com>
 Created : 2017-JUL-9
 Modified: 2017-JUL-9
 """
-import datetime, random
-from sqlalchemy.types import Text, Float, Integer, DateTime
-from sqlalchemy.schema import Column, ForeignKey
-from sqlalchemy.sql import func
+import base64, datetime, json, logging, threading
+from itertools import chain
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, aliased, joinedload, relationship
+from sqlalchemy.types import Boolean, Text, Float, Integer, Date, DateTime
+from sqlalchemy.schema import Column, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func, and_, bindparam, cast, extract, literal_column, select, tuple_, union_all
+from tropofy.database import DBSession
 from tropofy.database.tropofy_orm import DataSetMixin
 from tropofy.app import AppWithDataSets, Step, StepGroup
-from tropofy.widgets import SimpleGrid, TimelineWidget, Chart
+from tropofy.widgets import SimpleGrid, TimelineWidget, Chart, ExecuteFunction
+from . import access
+from .cache import ResultCache, cached_widget_data, data_set_versions, track_data_set_changes
+from .columnar import OrderColumnStore
+from .demographics import AGE_BANDS, UNKNOWN_AGE_BAND, age_band, age_band_case, age_band_label, postcode_region, \
+    postcode_region_case
+from .example_data import EXAMPLE_ORDERS
+from .forecast import DemandHistory, fit_demand
+from .intervals import IntervalIndex
+from .partitions import day_literal, move_event_days, partition_table, sync_event_days
+from .queueing import estimate_queue
+from .rates import RateWindows, minute_of, minute_start
+from .render import concurrent_step
+from .rostering import required_staff, solve_roster, understaffed_slots
+
+log = logging.getLogger(__name__)
 
 
 class Station(DataSetMixin):
@@ -19,7 +39,9 @@ class Station(DataSetMixin):
     Represents a stall at an event. Lat/long there to make heatmapping possible.
 
     """
-    title = Column(Text, unique=True)  # I avoid the name `name` whenever possible
+    __table_args__ = (UniqueConstraint('data_set_id', 'title'),)
+
+    title = Column(Text)  # I avoid the name `name` whenever possible
 
     def __init__(self, title):
         self.title = title
@@ -29,16 +51,127 @@ class Food(DataSetMixin):
     """
     Represents a food item, for use at a stall.
     """
-    station = Column(Text, ForeignKey('station.title'), nullable=False)
+    __table_args__ = (
+        Index('ix_food_data_set_title', 'data_set_id', 'title'),
+        Index('ix_food_data_set_station', 'data_set_id', 'station_id'),
+    )
+
+    station_id = Column(Integer, ForeignKey('station.id'), nullable=False)
     title = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
-    price = Column(Text, nullable=False)  # Can't use float (precision etc), its just a demo we assume input is correct
+    price_cents = Column(Integer, nullable=False)  # Whole cents, so revenue sums stay exact and in the database
+
+    station = relationship(Station)
 
-    def __init__(self, station, title, description, price):
+    def __init__(self, station, title, description, price_cents):
         self.station = station
         self.title = title
         self.description = description
-        self.price = price
+        self.price_cents = price_cents
+
+
+class Event(DataSetMixin):
+    """
+    One run of a recurring event, open from `first_hour` to the end of `last_hour` on each day from `first_day` to
+    `last_day`. Orders are partitioned by day (see partitions.py), and the charts show the current event (the latest
+    one that isn't archived) and its opening hours unless told otherwise. An archived event's orders have been moved
+    to ArchivedOrder.
+    """
+    __table_args__ = (UniqueConstraint('data_set_id', 'title'),)
+
+    title = Column(Text, nullable=False)
+    first_day = Column(Date, nullable=False)
+    last_day = Column(Date, nullable=False)
+    first_hour = Column(Integer, nullable=False, default=0)
+    last_hour = Column(Integer, nullable=False, default=23)
+    archived = Column(Boolean, nullable=False, default=False)
+
+    def __init__(self, title, first_day, last_day=None, first_hour=0, last_hour=23):
+        self.title = title
+        self.first_day = first_day
+        self.last_day = first_day if last_day is None else last_day
+        self.first_hour = first_hour
+        self.last_hour = last_hour
+
+    @property
+    def days(self):
+        return [self.first_day + datetime.timedelta(days=i) for i in xrange((self.last_day - self.first_day).days + 1)]
+
+    @classmethod
+    def get_days(cls, data_set, title=None):
+        """
+        Returns (first day, last day) of the event called `title`, by default the current event, or (None, None) if
+        the data set has no events to choose from.
+        """
+        query = DBSession().query(cls.first_day, cls.last_day).filter(cls.data_set_id == data_set.id)
+        if title is not None:
+            days = query.filter(cls.title == title).first()
+            if days is None:
+                raise ValueError("Data set %d has no event called %r" % (data_set.id, title))
+        else:
+            days = query.filter(cls.archived.is_(False)).order_by(cls.first_day.desc()).first()
+        return (None, None) if days is None else tuple(days)
+
+    @classmethod
+    def get_hours(cls, data_set, start_date=None, end_date=None):
+        """
+        Returns (first hour, last hour) spanning the opening hours of the events overlapping [start_date, end_date]
+        (all of the data set's events by default). Without any, the hours with orders in the rollup are used, or else
+        the whole day.
+        """
+        session = DBSession()
+        query = session.query(func.min(cls.first_hour), func.max(cls.last_hour)).filter(cls.data_set_id == data_set.id)
+        if start_date is not None:
+            query = query.filter(cls.last_day >= start_date)
+        if end_date is not None:
+            query = query.filter(cls.first_day <= end_date)
+        hours = query.one()
+        if hours[0] is None:
+            hour = cast(extract('hour', OrderRollup.hour), Integer)
+            hours = _in_date_range(session.query(func.min(hour), func.max(hour))
+                                   .filter(OrderRollup.data_set_id == data_set.id),
+                                   OrderRollup.hour, start_date, end_date).one()
+        return (0, 23) if hours[0] is None else tuple(hours)
+
+    @classmethod
+    def any_archived(cls, data_set, start_date=None, end_date=None):
+        """
+        Whether an archived event overlaps [start_date, end_date], i.e. whether some of its orders aren't in Order.
+        """
+        query = DBSession().query(cls.id).filter(cls.data_set_id == data_set.id, cls.archived.is_(True))
+        if start_date is not None:
+            query = query.filter(cls.last_day >= start_date)
+        if end_date is not None:
+            query = query.filter(cls.first_day <= end_date)
+        return query.first() is not None
+
+    def archive(self):
+        """
+        Moves the event's orders out of Order into ArchivedOrder, leaving the order aggregates as they are, so the
+        charts still count them but queries on Order no longer see them. Returns how many were moved. Nothing is
+        committed.
+        """
+        return self._move_orders(Order, ArchivedOrder, True)
+
+    def restore(self):
+        """
+        Moves an archived event's orders back into Order.
+        """
+        return self._move_orders(ArchivedOrder, Order, False)
+
+    def _move_orders(self, source, target, archived):
+        session = DBSession()
+        session.flush()
+        moved = move_event_days(session.connection(), source.__table__, target.__table__, self.data_set_id,
+                                self.first_day, self.last_day)
+        self.archived = archived
+        session.flush()
+        order_columns.invalidate(self.data_set_id)
+        return moved
+
+
+def _timestamp_day(context):
+    return context.get_current_parameters()['timestamp'].date()
 
 
 class Order(DataSetMixin):
@@ -46,12 +179,30 @@ class Order(DataSetMixin):
     Instead of properly normalising this (with perhaps an OrderItem type table), we assume each order buys only 1 type
     of food.
     """
+    __table_args__ = (
+        Index('ix_order_data_set_food_timestamp', 'data_set_id', 'food_id', 'timestamp', 'id'),
+        Index('ix_order_data_set_timestamp', 'data_set_id', 'timestamp', 'id'),
+        Index('ix_order_data_set_age', 'data_set_id', 'age', 'id'),
+        Index('ix_order_data_set_postcode', 'data_set_id', 'postcode', 'id'),
+        Index('ix_order_data_set_event_day', 'data_set_id', 'event_day', 'id'),
+    )
 
-    food = Column(Text, ForeignKey('food.title'), nullable=False)
+    # Sort name -> columns a page is ordered by, ahead of id which breaks ties. Each has a matching index.
+    PAGE_SORTS = {
+        'timestamp': ('timestamp',),
+        'food': ('food_id', 'timestamp'),
+        'age': ('age',),
+        'postcode': ('postcode',),
+    }
+
+    food_id = Column(Integer, ForeignKey('food.id'), nullable=False)
     timestamp = Column(DateTime, nullable=False)
     quantity = Column(Integer, nullable=False)
     age = Column(Integer, nullable=True)
     postcode = Column(Integer, nullable=True)
+    event_day = Column(Date, nullable=False, default=_timestamp_day)  # the partitioning key, see partitions.py
+
+    food = relationship(Food)
 
     def __init__(self, food, timestamp, quantity, age=None, postcode=None):
         self.food = food
@@ -61,14 +212,119 @@ class Order(DataSetMixin):
         self.postcode = postcode
 
     @classmethod
-    def get_total_by_food(cls):
-        popularity = {}
-        return cls.query(func.sum(Order.quantity)).group_by(cls.food).all()
+    def get_total_by_food(cls, data_set):
+        """
+        Returns (food title, total quantity) for every food in the data set, in a single query grouped on food id.
+        Foods that have never been ordered have a total of 0. Like the other totals, it counts archived orders too.
+        """
+        order = _orders_of(data_set)
+        totals = dict(DBSession().query(order.food_id, func.sum(order.quantity))
+                      .filter(order.data_set_id == data_set.id)
+                      .group_by(order.food_id))
+        return _totals_by_food_title(data_set, totals)
+
+    @classmethod
+    def get_count_by_time_of_day(cls, data_set, bucket_minutes=60, first_hour=0, last_hour=23, start_date=None,
+                                 end_date=None):
+        """
+        Returns (minute of day, order count) for each time of day bucket that has orders, counted in the database.
+        Buckets are `bucket_minutes` wide (a divisor of 60) and are summed across every day in the optional
+        [start_date, end_date] range, archived orders included. Only EXTRACT and % are used so the same query runs on
+        SQLite and PostgreSQL.
+        """
+        # Constants are rendered inline: PostgreSQL won't match a GROUP BY expression containing bind parameters.
+        order = _orders_of(data_set, start_date, end_date)
+        hour = cast(extract('hour', order.timestamp), Integer)
+        minute = cast(extract('minute', order.timestamp), Integer)
+        bucket = hour * literal_column('60')
+        if bucket_minutes != 60:
+            bucket = bucket + minute - minute % literal_column(str(int(bucket_minutes)))
+
+        query = DBSession().query(bucket, func.count(order.id)) \
+            .filter(order.data_set_id == data_set.id) \
+            .filter(hour.between(first_hour, last_hour))
+        return _in_date_range(query, order.timestamp, start_date, end_date, order.event_day).group_by(bucket).all()
+
+    @classmethod
+    def get_revenue(cls, data_set, by='food', start_date=None, end_date=None):
+        """
+        Returns (food title, station title or hour of day, revenue in cents) grouped `by` 'food', 'station' or 'hour',
+        as SUM(quantity * price_cents) over Order (and ArchivedOrder, for archived events) joined to Food on its primary
+        key.
+        """
+        order = _orders_of(data_set, start_date, end_date)
+        group = {
+            'food': order.food_id,
+            'station': Food.station_id,
+            'hour': cast(extract('hour', order.timestamp), Integer),
+        }[by]
+        query = DBSession().query(group, func.sum(order.quantity * Food.price_cents)) \
+            .join(Food, Food.id == order.food_id) \
+            .filter(order.data_set_id == data_set.id)
+        return _with_titles(data_set, by, _in_date_range(query, order.timestamp, start_date, end_date, order.event_day)
+                            .group_by(group))
+
+    @classmethod
+    def get_page(cls, data_set, after=None, limit=50, sort='timestamp', descending=False, food=None, station=None,
+                 first_hour=None, last_hour=None, min_age=None, max_age=None, postcode=None, start_date=None,
+                 end_date=None):
+        """
+        Returns (orders, next cursor) for one page of the data set's orders, filtered and sorted in the database.
+        Pages are fetched by seeking past the previous page's last row (`after` is the cursor returned with it), so
+        every page costs an index range scan of `limit` rows however deep it is. Sorting by food groups orders by food
+        id. Sorting by age or postcode leaves out orders without one. `start_date`/`end_date` limit it to those days'
+        partitions. The cursor is None on the last page.
+        """
+        names = cls.PAGE_SORTS[sort] + ('id',)
+        columns = [getattr(cls, name) for name in names]
+        query = DBSession().query(cls).options(joinedload(cls.food)).filter(cls.data_set_id == data_set.id)
+        if sort in ('age', 'postcode'):
+            query = query.filter(columns[0].isnot(None))
+        if food is not None or station is not None:
+            dimensions = DimensionMap.get(data_set.id)
+            food_ids = set(dimensions.food_titles)
+            if food is not None:
+                food_ids &= set([dimensions.food_ids.get(food)])
+            if station is not None:
+                food_ids &= set(dimensions.foods_at(station))
+            if not food_ids:
+                return [], None
+            query = query.filter(cls.food_id.in_(sorted(food_ids)))
+        if first_hour is not None or last_hour is not None:
+            hour = cast(extract('hour', cls.timestamp), Integer)
+            query = query.filter(hour.between(0 if first_hour is None else first_hour,
+                                              23 if last_hour is None else last_hour))
+        query = _in_date_range(query, cls.timestamp, start_date, end_date, cls.event_day)
+        if min_age is not None:
+            query = query.filter(cls.age >= min_age)
+        if max_age is not None:
+            query = query.filter(cls.age <= max_age)
+        if postcode is not None:
+            query = query.filter(cls.postcode == postcode)
+        if after is not None:
+            key = tuple_(*columns)
+            bound = tuple_(*[bindparam(None, value, type_=column.type)
+                             for column, value in zip(columns, _decode_cursor(after, names))])
+            query = query.filter(key < bound if descending else key > bound)
+
+        orders = query.order_by(*[column.desc() if descending else column for column in columns]) \
+            .limit(limit + 1) \
+            .all()
+        if len(orders) <= limit:
+            return orders, None
+        return orders[:limit], cls.cursor_for(orders[limit - 1], sort)
+
+    @classmethod
+    def cursor_for(cls, order, sort='timestamp'):
+        """
+        The `after` cursor that pages on from `order` in the given sort.
+        """
+        return _encode_cursor([getattr(order, name) for name in cls.PAGE_SORTS[sort] + ('id',)])
 
     @property
     def serialise(self):
         return {
-            'food': self.food,
+            'food': self.food.title,
             'timestamp': self.timestamp,
             'quantity': self.quantity,
             'age': self.age,
@@ -76,11 +332,57 @@ class Order(DataSetMixin):
         }
 
 
+class ArchivedOrder(DataSetMixin):
+    """
+    The orders of archived events, moved out of Order by `Event.archive` so that queries on live orders
+    don't wade through them. The order aggregates (OrderRollup, OrderDemographics and Stock) still count them.
+    """
+    __table_args__ = (Index('ix_archived_order_data_set_event_day', 'data_set_id', 'event_day', 'id'),)
+
+    food_id = Column(Integer, ForeignKey('food.id'), nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    age = Column(Integer, nullable=True)
+    postcode = Column(Integer, nullable=True)
+    event_day = Column(Date, nullable=False)
+
+
+@event.listens_for(Order.__table__, 'after_create')
+@event.listens_for(ArchivedOrder.__table__, 'after_create')
+def _partition_order_table(target, connection, **kw):
+    if connection.dialect.name == 'postgresql':
+        partition_table(connection, target)
+
+
+# What the aggregates are recomputed from. Each is grouped on its own and the totals added up in Python: grouping
+# their union instead stops the planner using Order's indexes, so it scans every data set's orders.
+_ORDER_TABLES = (Order, ArchivedOrder)
+
+
+def _all_orders():
+    """
+    Order's and ArchivedOrder's rows together, mapped as Order.
+    """
+    names = [column.name for column in Order.__table__.columns]
+    return aliased(Order, union_all(select([Order.__table__.c[name] for name in names]),
+                                    select([ArchivedOrder.__table__.c[name] for name in names])).alias('all_orders'))
+
+
+def _orders_of(data_set, start_date=None, end_date=None):
+    """
+    What to total a data set's orders on the days in [start_date, end_date] over: Order, or if an archived event
+    overlaps them, Order and ArchivedOrder together.
+    """
+    return _all_orders() if Event.any_archived(data_set, start_date, end_date) else Order
+
+
 class Staff(DataSetMixin):
     """
     Represents a staff member who will perform a Roster at a Station
     """
-    staff_name = Column(Text, unique=True)  # This is just because its a demo, obviously not a real PK candidate
+    __table_args__ = (UniqueConstraint('data_set_id', 'staff_name'),)
+
+    staff_name = Column(Text)  # This is just because its a demo, obviously not a real PK candidate
 
     def __init__(self, staff_name):
         self.staff_name = staff_name
@@ -90,12 +392,20 @@ class Roster(DataSetMixin):
     """
     Represents a period of time that a Staff will work at a Station
     """
-    station = Column(Text, ForeignKey('station.title'), nullable=False)
-    staff = Column(Text, ForeignKey('staff.staff_name'), nullable=False)
+    __table_args__ = (
+        Index('ix_roster_data_set_station_start_end', 'data_set_id', 'station_id', 'start', 'end'),
+        Index('ix_roster_data_set_staff', 'data_set_id', 'staff_id'),
+    )
+
+    station_id = Column(Integer, ForeignKey('station.id'), nullable=False)
+    staff_id = Column(Integer, ForeignKey('staff.id'), nullable=False)
     start = Column(DateTime, nullable=False)
     end = Column(DateTime, nullable=False)
     content = Column(Text, nullable=True)
 
+    station = relationship(Station)
+    staff = relationship(Staff)
+
     def __init__(self, station, staff, start, end, content=None):
         self.station = station
         self.staff = staff
@@ -103,6 +413,893 @@ class Roster(DataSetMixin):
         self.end = end
         self.content = content
 
+    @classmethod
+    def get_interval_index(cls, data_set):
+        """
+        Returns an IntervalIndex of the data set's shifts as (id, station id, staff id, start, end, content), built
+        once per data set version.
+        """
+        key = (data_set.id, data_set_versions.get(data_set.id))
+        index = _roster_index_cache.get(key)
+        if index is None:
+            index = IntervalIndex((row[3], row[4], tuple(row)) for row in DBSession().query(
+                cls.id, cls.station_id, cls.staff_id, cls.start, cls.end, cls.content)
+                .filter(cls.data_set_id == data_set.id))
+            _roster_index_cache.put(key, index)
+        return index
+
+
+_roster_index_cache = ResultCache(max_entries=32)
+
+
+class DimensionMap(object):
+    """
+    Id <-> title lookups for a data set's stations, foods and staff. Queries group and join on the integer keys and
+    only translate the few distinct ids they return, through a map loaded in three small queries and cached per data
+    set version.
+    """
+    def __init__(self, data_set_id):
+        session = DBSession()
+        self.station_titles = dict(session.query(Station.id, Station.title).filter(Station.data_set_id == data_set_id))
+        self.staff_names = dict(session.query(Staff.id, Staff.staff_name).filter(Staff.data_set_id == data_set_id))
+        foods = session.query(Food.id, Food.title, Food.station_id, Food.price_cents) \
+            .filter(Food.data_set_id == data_set_id).all()
+        self.food_titles = dict((food_id, title) for food_id, title, _, _ in foods)
+        self.food_stations = dict((food_id, station_id) for food_id, _, station_id, _ in foods)
+        self.food_prices = dict((food_id, price_cents) for food_id, _, _, price_cents in foods)
+        self.station_ids = dict((title, station_id) for station_id, title in self.station_titles.items())
+        self.staff_ids = dict((name, staff_id) for staff_id, name in self.staff_names.items())
+        self.food_ids = dict((title, food_id) for food_id, title in self.food_titles.items())
+
+    @classmethod
+    def get(cls, data_set_id, refresh=False):
+        key = (data_set_id, data_set_versions.get(data_set_id))
+        dimensions = None if refresh else _dimension_cache.get(key)
+        if dimensions is None:
+            dimensions = cls(data_set_id)
+            _dimension_cache.put(key, dimensions)
+        return dimensions
+
+    @classmethod
+    def covering(cls, data_set_id, food_ids=(), station_ids=(), staff_ids=()):
+        """
+        Like `get`, but reloads the map if it's missing any of the given ids (e.g. rows added earlier in the current
+        transaction, which don't bump the data set version until it commits).
+        """
+        dimensions = cls.get(data_set_id)
+        if (set(food_ids) - set(dimensions.food_titles) or set(station_ids) - set(dimensions.station_titles) or
+                set(staff_ids) - set(dimensions.staff_names)):
+            dimensions = cls.get(data_set_id, refresh=True)
+        return dimensions
+
+    def foods_at(self, station):
+        station_id = self.station_ids.get(station)
+        return [food_id for food_id, food_station_id in self.food_stations.items() if food_station_id == station_id]
+
+
+_dimension_cache = ResultCache(max_entries=64)
+
+
+class OrderRollup(DataSetMixin):
+    """
+    Order totals per food per hour, with the food's station alongside so station totals are a group by away. Rows are
+    kept up to date from Order inserts, updates and deletes made through the ORM (see the listeners below), so charts
+    read O(foods x hours) rows instead of the whole Order table, and from Food updates that change a food's station or
+    price. Anything that writes orders or foods with Core statements must call `rebuild` afterwards.
+    """
+    __table_args__ = (UniqueConstraint('data_set_id', 'food_id', 'hour'),)
+
+    food_id = Column(Integer, nullable=False)
+    station_id = Column(Integer, nullable=False)
+    hour = Column(DateTime, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    orders = Column(Integer, nullable=False)
+    revenue_cents = Column(Integer, nullable=False)
+
+    def __init__(self, food_id, station_id, hour, quantity, orders, revenue_cents):
+        self.food_id = food_id
+        self.station_id = station_id
+        self.hour = hour
+        self.quantity = quantity
+        self.orders = orders
+        self.revenue_cents = revenue_cents
+
+    @classmethod
+    def apply(cls, connection, data_set_id, food_id, timestamp, quantity, orders):
+        """
+        Adds `quantity` and `orders` (negative to remove) to the bucket `timestamp` falls in.
+        """
+        food_row = connection.execute(select([Food.station_id, Food.price_cents]).where(Food.id == food_id)).first()
+        if food_row is None:
+            return
+        station_id, price_cents = food_row
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        revenue_cents = quantity * price_cents
+
+        table = cls.__table__
+        updated = connection.execute(table.update().where(and_(
+            table.c.data_set_id == data_set_id, table.c.food_id == food_id, table.c.hour == hour
+        )).values(
+            quantity=table.c.quantity + quantity,
+            orders=table.c.orders + orders,
+            revenue_cents=table.c.revenue_cents + revenue_cents
+        ))
+        if updated.rowcount == 0:
+            connection.execute(table.insert().values(
+                data_set_id=data_set_id, food_id=food_id, station_id=station_id, hour=hour, quantity=quantity,
+                orders=orders, revenue_cents=revenue_cents
+            ))
+
+    @classmethod
+    def compute(cls, data_set):
+        """
+        Recomputes the rollup straight from Order and ArchivedOrder, as
+        {(food id, hour): (station id, quantity, orders, revenue_cents)}.
+        """
+        session = DBSession()
+        foods = dict((food_id, (station_id, price_cents)) for food_id, station_id, price_cents in
+                     session.query(Food.id, Food.station_id, Food.price_cents).filter(Food.data_set_id == data_set.id))
+        totals = {}
+        for order in _ORDER_TABLES:
+            day = func.date(order.timestamp)
+            hour = cast(extract('hour', order.timestamp), Integer)
+            for food_id, day_value, hour_value, quantity, orders in \
+                    session.query(order.food_id, day, hour, func.sum(order.quantity), func.count(order.id)) \
+                    .filter(order.data_set_id == data_set.id) \
+                    .group_by(order.food_id, day, hour):
+                station_id, cents = foods[food_id]
+                bucket = datetime.datetime.strptime(str(day_value)[:10], '%Y-%m-%d').replace(hour=hour_value)
+                _, quantity_so_far, orders_so_far, _ = totals.get((food_id, bucket), (None, 0, 0, 0))
+                quantity, orders = quantity_so_far + quantity, orders_so_far + orders
+                totals[(food_id, bucket)] = (station_id, quantity, orders, quantity * cents)
+        return totals
+
+    @classmethod
+    def rebuild(cls, data_set):
+        """
+        Throws away the stored rollup for a data set and writes it again from Order.
+        """
+        session = DBSession()
+        session.query(cls).filter(cls.data_set_id == data_set.id).delete(synchronize_session=False)
+        rows = [{'data_set_id': data_set.id, 'food_id': food_id, 'station_id': station_id, 'hour': hour,
+                 'quantity': quantity, 'orders': orders, 'revenue_cents': revenue_cents}
+                for (food_id, hour), (station_id, quantity, orders, revenue_cents) in cls.compute(data_set).items()]
+        if rows:
+            session.execute(cls.__table__.insert(), rows)
+
+    @classmethod
+    def verify(cls, data_set):
+        """
+        Returns the (food id, hour) keys whose stored totals don't match the totals recomputed from Order.
+        """
+        expected = cls.compute(data_set)
+        stored = dict(((food_id, hour), (station_id, quantity, orders, revenue_cents))
+                      for food_id, hour, station_id, quantity, orders, revenue_cents in
+                      DBSession().query(cls.food_id, cls.hour, cls.station_id, cls.quantity, cls.orders,
+                                        cls.revenue_cents)
+                      .filter(cls.data_set_id == data_set.id, cls.orders != 0))
+        return sorted(key for key in set(expected) | set(stored) if expected.get(key) != stored.get(key))
+
+    @classmethod
+    def get_total_by_food(cls, data_set, start_date=None, end_date=None):
+        """
+        Same result as Order.get_total_by_food, read from the rollup, optionally only counting the days in
+        [start_date, end_date].
+        """
+        query = DBSession().query(cls.food_id, func.sum(cls.quantity)).filter(cls.data_set_id == data_set.id)
+        totals = dict(_in_date_range(query, cls.hour, start_date, end_date).group_by(cls.food_id))
+        return _totals_by_food_title(data_set, totals)
+
+    @classmethod
+    def get_count_by_hour_of_day(cls, data_set, first_hour=0, last_hour=23, start_date=None, end_date=None):
+        """
+        Same result as Order.get_count_by_time_of_day with 60 minute buckets, read from the rollup.
+        """
+        hour = cast(extract('hour', cls.hour), Integer)
+        bucket = hour * literal_column('60')
+        query = DBSession().query(bucket, func.sum(cls.orders)) \
+            .filter(cls.data_set_id == data_set.id) \
+            .filter(hour.between(first_hour, last_hour))
+        return _in_date_range(query, cls.hour, start_date, end_date).group_by(bucket).all()
+
+    @classmethod
+    def get_revenue(cls, data_set, by='food', start_date=None, end_date=None):
+        """
+        Same result as Order.get_revenue, read from the rollup.
+        """
+        group = {
+            'food': cls.food_id,
+            'station': cls.station_id,
+            'hour': cast(extract('hour', cls.hour), Integer),
+        }[by]
+        query = DBSession().query(group, func.sum(cls.revenue_cents)).filter(cls.data_set_id == data_set.id)
+        return _with_titles(data_set, by, _in_date_range(query, cls.hour, start_date, end_date).group_by(group))
+
+    @classmethod
+    def get_daily_orders_by_station_hour(cls, data_set):
+        """
+        Returns {(station id, hour of day): average orders per day}, averaged over the days that have orders.
+        """
+        session = DBSession()
+        days = session.query(func.count(func.distinct(func.date(cls.hour)))) \
+            .filter(cls.data_set_id == data_set.id, cls.orders != 0) \
+            .scalar()
+        if not days:
+            return {}
+        hour = cast(extract('hour', cls.hour), Integer)
+        return dict(((station_id, hour_value), float(orders) / days) for station_id, hour_value, orders in
+                    session.query(cls.station_id, hour, func.sum(cls.orders))
+                    .filter(cls.data_set_id == data_set.id)
+                    .group_by(cls.station_id, hour))
+
+    @classmethod
+    def get_demand_history(cls, data_set):
+        """
+        Returns the data set's quantities per food, year, day of week and hour of day as a DemandHistory (or None if
+        it has no orders), built once per data set version.
+        """
+        key = ('history', data_set.id, data_set_versions.get(data_set.id))
+        history = _demand_cache.get(key)
+        if history is None:
+            session = DBSession()
+            food_ids = set(DimensionMap.get(data_set.id).food_titles)
+            year = cast(extract('year', cls.hour), Integer)
+            weekday = cast(extract('dow', cls.hour), Integer)
+            hour = cast(extract('hour', cls.hour), Integer)
+            rows = session.query(cls.food_id, year, weekday, hour, func.sum(cls.quantity)) \
+                .filter(cls.data_set_id == data_set.id, cls.orders != 0) \
+                .group_by(cls.food_id, year, weekday, hour) \
+                .all()
+            days = session.query(year, weekday, func.count(func.distinct(func.date(cls.hour)))) \
+                .filter(cls.data_set_id == data_set.id, cls.orders != 0) \
+                .group_by(year, weekday) \
+                .all()
+            if not days:
+                return None
+            food_ids = sorted(food_ids.union(row[0] for row in rows))
+            food_index = dict((food_id, i) for i, food_id in enumerate(food_ids))
+            history = DemandHistory(
+                food_ids, [food_index[row[0]] for row in rows], [row[1] for row in rows], [row[2] for row in rows],
+                [row[3] for row in rows], [row[4] for row in rows],
+                np.repeat([day[0] for day in days], [day[2] for day in days]),
+                np.repeat([day[1] for day in days], [day[2] for day in days]))
+            _demand_cache.put(key, history)
+        return history
+
+    @classmethod
+    def get_demand_model(cls, data_set, before_year=None):
+        """
+        Returns a DemandModel fitted to the data set's orders from before `before_year` (all of them by default), or
+        None if there are none, fitted once per data set version.
+        """
+        key = ('model', data_set.id, data_set_versions.get(data_set.id), before_year)
+        model = _demand_cache.get(key)
+        if model is None:
+            history = cls.get_demand_history(data_set)
+            if history is not None and before_year is not None:
+                history = history.before(before_year)
+            if history is None or not len(history.day_year):
+                return None
+            model = fit_demand(history)
+            _demand_cache.put(key, model)
+        return model
+
+
+_demand_cache = ResultCache(max_entries=32, max_bytes=256 * 1024 * 1024)
+
+
+class OrderDemographics(DataSetMixin):
+    """
+    Order totals per food per age band per postcode region (see demographics.py). Each order is bucketed once, when
+    it's written, and the totals are kept up to date the same way as OrderRollup's, so the demographic charts read
+    O(foods x bands x regions) rows however many orders there are. Anything that writes orders with Core statements
+    must call `rebuild` afterwards, or apply its changes with OrderAggregateDeltas.
+    """
+    __table_args__ = (UniqueConstraint('data_set_id', 'food_id', 'age_band', 'region'),)
+
+    food_id = Column(Integer, nullable=False)
+    age_band = Column(Integer, nullable=False)  # youngest age in the band, or UNKNOWN_AGE_BAND
+    region = Column(Text, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    orders = Column(Integer, nullable=False)
+
+    def __init__(self, food_id, age_band, region, quantity, orders):
+        self.food_id = food_id
+        self.age_band = age_band
+        self.region = region
+        self.quantity = quantity
+        self.orders = orders
+
+    @classmethod
+    def apply(cls, connection, data_set_id, food_id, band, region, quantity, orders):
+        """
+        Adds `quantity` and `orders` (negative to remove) to a bucket.
+        """
+        table = cls.__table__
+        updated = connection.execute(table.update().where(and_(
+            table.c.data_set_id == data_set_id, table.c.food_id == food_id, table.c.age_band == band,
+            table.c.region == region
+        )).values(quantity=table.c.quantity + quantity, orders=table.c.orders + orders))
+        if updated.rowcount == 0:
+            connection.execute(table.insert().values(
+                data_set_id=data_set_id, food_id=food_id, age_band=band, region=region, quantity=quantity,
+                orders=orders
+            ))
+
+    @classmethod
+    def compute(cls, data_set):
+        """
+        Recomputes the totals straight from Order and ArchivedOrder, as
+        {(food id, age band, region): (quantity, orders)}.
+        """
+        totals = {}
+        for order in _ORDER_TABLES:
+            band = age_band_case(order.age)
+            region = postcode_region_case(order.postcode)
+            for food_id, band_value, region_value, quantity, orders in \
+                    DBSession().query(order.food_id, band, region, func.sum(order.quantity), func.count(order.id)) \
+                    .filter(order.data_set_id == data_set.id) \
+                    .group_by(order.food_id, band, region):
+                quantity_so_far, orders_so_far = totals.get((food_id, band_value, region_value), (0, 0))
+                totals[(food_id, band_value, region_value)] = (quantity_so_far + quantity, orders_so_far + orders)
+        return totals
+
+    @classmethod
+    def rebuild(cls, data_set):
+        session = DBSession()
+        session.query(cls).filter(cls.data_set_id == data_set.id).delete(synchronize_session=False)
+        rows = [{'data_set_id': data_set.id, 'food_id': food_id, 'age_band': band, 'region': region,
+                 'quantity': quantity, 'orders': orders}
+                for (food_id, band, region), (quantity, orders) in cls.compute(data_set).items()]
+        if rows:
+            session.execute(cls.__table__.insert(), rows)
+
+    @classmethod
+    def verify(cls, data_set):
+        """
+        Returns the (food id, age band, region) keys whose stored totals don't match the totals recomputed from Order.
+        """
+        expected = cls.compute(data_set)
+        stored = dict(((food_id, band, region), (quantity, orders))
+                      for food_id, band, region, quantity, orders in
+                      DBSession().query(cls.food_id, cls.age_band, cls.region, cls.quantity, cls.orders)
+                      .filter(cls.data_set_id == data_set.id, cls.orders != 0))
+        return sorted(key for key in set(expected) | set(stored) if expected.get(key) != stored.get(key))
+
+    @classmethod
+    def get_totals(cls, data_set, by):
+        """
+        Returns (group..., quantity, orders) rows grouped `by` a tuple of 'food' (title), 'age_band' and 'region'.
+        """
+        columns = [{'food': cls.food_id, 'age_band': cls.age_band, 'region': cls.region}[name] for name in by]
+        rows = DBSession().query(*(columns + [func.sum(cls.quantity), func.sum(cls.orders)])) \
+            .filter(cls.data_set_id == data_set.id) \
+            .group_by(*columns) \
+            .having(func.sum(cls.orders) != 0) \
+            .all()
+        if 'food' not in by:
+            return rows
+        i = by.index('food')
+        dimensions = DimensionMap.covering(data_set.id, food_ids=[row[i] for row in rows])
+        return [row[:i] + (dimensions.food_titles[row[i]],) + row[i + 1:] for row in rows]
+
+
+class Stock(DataSetMixin):
+    """
+    A food's opening stock for a day, and how much of it has been ordered. `sold` is a running total kept up to date
+    from Order changes the same way as OrderRollup's (and worked out from the rollup when the row is added), so
+    remaining stock is read without summing orders. Anything that writes orders with Core statements must call
+    `rebuild` afterwards, or apply its changes with OrderAggregateDeltas. Remaining stock under `alert_below` raises a
+    StockMonitor alert.
+    """
+    __table_args__ = (UniqueConstraint('data_set_id', 'food_id', 'day'),)
+
+    food_id = Column(Integer, ForeignKey('food.id'), nullable=False)
+    day = Column(Date, nullable=False)
+    opening = Column(Integer, nullable=False)
+    alert_below = Column(Integer, nullable=True)
+    sold = Column(Integer, nullable=False, default=0)
+
+    food = relationship(Food)
+
+    def __init__(self, food, day, opening, alert_below=None):
+        self.food = food
+        self.day = day
+        self.opening = opening
+        self.alert_below = alert_below
+
+    @classmethod
+    def apply(cls, connection, data_set_id, food_id, day, quantity):
+        """
+        Adds `quantity` (negative to remove) to the food's sold total for `day`, if it has stock entered for it.
+        """
+        table = cls.__table__
+        connection.execute(table.update().where(and_(
+            table.c.data_set_id == data_set_id, table.c.food_id == food_id, table.c.day == day
+        )).values(sold=table.c.sold + quantity))
+
+    @classmethod
+    def compute(cls, data_set):
+        """
+        Recomputes the quantity sold straight from Order and ArchivedOrder, as {(food id, day): quantity} for every
+        day with orders.
+        """
+        sold = {}
+        for order in _ORDER_TABLES:
+            day = func.date(order.timestamp)
+            for food_id, day_value, quantity in \
+                    DBSession().query(order.food_id, day, func.sum(order.quantity)) \
+                    .filter(order.data_set_id == data_set.id) \
+                    .group_by(order.food_id, day):
+                key = (food_id, datetime.datetime.strptime(str(day_value)[:10], '%Y-%m-%d').date())
+                sold[key] = sold.get(key, 0) + quantity
+        return sold
+
+    @classmethod
+    def rebuild(cls, data_set):
+        """
+        Sets every stock row's sold total in a data set from Order.
+        """
+        session = DBSession()
+        sold = cls.compute(data_set)
+        table = cls.__table__
+        rows = session.query(cls.id, cls.food_id, cls.day).filter(cls.data_set_id == data_set.id).all()
+        for stock_id, food_id, day in rows:
+            session.execute(table.update().where(table.c.id == stock_id).values(sold=sold.get((food_id, day), 0)))
+
+    @classmethod
+    def verify(cls, data_set):
+        """
+        Returns the (food id, day) keys whose stored sold total doesn't match the total recomputed from Order.
+        """
+        sold = cls.compute(data_set)
+        return sorted((food_id, day) for food_id, day, stored in
+                      DBSession().query(cls.food_id, cls.day, cls.sold).filter(cls.data_set_id == data_set.id)
+                      if sold.get((food_id, day), 0) != stored)
+
+    @classmethod
+    def get_levels(cls, data_set, day=None):
+        """
+        Returns (station title, food id, food title, opening, sold, alert_below) for each food with stock entered on
+        `day` (by default the latest day with any), sorted by station and food.
+        """
+        session = DBSession()
+        if day is None:
+            day = session.query(func.max(cls.day)).filter(cls.data_set_id == data_set.id).scalar()
+        return session.query(Station.title, Food.id, Food.title, cls.opening, cls.sold, cls.alert_below) \
+            .join(Food, Food.id == cls.food_id) \
+            .join(Station, Station.id == Food.station_id) \
+            .filter(cls.data_set_id == data_set.id, cls.day == day) \
+            .order_by(Station.title, Food.title) \
+            .all()
+
+
+def _stock_sold_before_now(connection, target):
+    """
+    What the rollup says was ordered of the stock row's food on its day.
+    """
+    start = datetime.datetime.combine(target.day, datetime.time())
+    table = OrderRollup.__table__
+    return connection.execute(select([func.coalesce(func.sum(table.c.quantity), 0)]).where(and_(
+        table.c.data_set_id == target.data_set_id, table.c.food_id == target.food_id, table.c.hour >= start,
+        table.c.hour < start + datetime.timedelta(days=1)))).scalar()
+
+
+@event.listens_for(Stock, 'before_insert')
+def _stock_insert(mapper, connection, target):
+    target.sold = _stock_sold_before_now(connection, target)
+
+
+@event.listens_for(Stock, 'before_update')
+def _stock_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in ('data_set_id', 'food_id', 'day')):
+        target.sold = _stock_sold_before_now(connection, target)
+
+
+class OrderAggregateDeltas(object):
+    """
+    Collects the OrderRollup, OrderDemographics and Stock changes for order rows written with Core inserts (as dicts
+    for `Order.__table__`), so they can be applied in one go after the insert. Rows are bucketed as they're added.
+    """
+    def __init__(self):
+        self.rollup = {}
+        self.demographics = {}
+
+    def add(self, row):
+        for totals, key in (
+                (self.rollup, (row['data_set_id'], row['food_id'],
+                               row['timestamp'].replace(minute=0, second=0, microsecond=0))),
+                (self.demographics, (row['data_set_id'], row['food_id'], age_band(row.get('age')),
+                                     postcode_region(row.get('postcode'))))):
+            quantity, orders = totals.get(key, (0, 0))
+            totals[key] = (quantity + row['quantity'], orders + 1)
+
+    def data_set_ids(self):
+        return set(key[0] for key in self.rollup)
+
+    def apply(self, connection):
+        for (data_set_id, food_id, hour), (quantity, orders) in self.rollup.items():
+            OrderRollup.apply(connection, data_set_id, food_id, hour, quantity, orders)
+        for (data_set_id, food_id, band, region), (quantity, orders) in self.demographics.items():
+            OrderDemographics.apply(connection, data_set_id, food_id, band, region, quantity, orders)
+        sold = {}
+        for (data_set_id, food_id, hour), (quantity, _) in self.rollup.items():
+            key = (data_set_id, food_id, hour.date())
+            sold[key] = sold.get(key, 0) + quantity
+        for (data_set_id, food_id, day), quantity in sold.items():
+            Stock.apply(connection, data_set_id, food_id, day, quantity)
+
+
+def _totals_by_food_title(data_set, totals):
+    """
+    Turns {food id: total} into (title, total) for every food in the data set, sorted by title.
+    """
+    dimensions = DimensionMap.covering(data_set.id, food_ids=totals)
+    return sorted((title, totals.get(food_id, 0)) for food_id, title in dimensions.food_titles.items())
+
+
+def _with_titles(data_set, by, rows):
+    """
+    Replaces the food or station ids that `rows` are grouped `by` with their titles.
+    """
+    rows = list(rows)
+    if by == 'hour':
+        return rows
+    ids = [key for key, _ in rows]
+    dimensions = DimensionMap.covering(data_set.id, **{by + '_ids': ids})
+    titles = dimensions.food_titles if by == 'food' else dimensions.station_titles
+    return [(titles[key], value) for key, value in rows]
+
+
+def _selected_days(data_set, event=None, start_date=None, end_date=None):
+    """
+    The (start date, end date) a chart shows: the dates it was given, or else the days of `event` (by default the
+    current event), or else (None, None) for every day.
+    """
+    if start_date is not None or end_date is not None:
+        return start_date, end_date
+    return Event.get_days(data_set, event)
+
+
+def _live_columns(data_set, start_date=None, end_date=None):
+    """
+    The data set's order columns, unless they're off or the days include archived orders, which they don't hold.
+    """
+    columns = order_columns.get(data_set.id)
+    if columns is None or Event.any_archived(data_set, start_date, end_date):
+        return None
+    return columns
+
+
+def _in_date_range(query, column, start_date=None, end_date=None, day_column=None):
+    """
+    Filters `query` to rows with `column` on or between the given dates, in a form that can use an index on it. Given
+    Order's `event_day` as `day_column`, the dates are matched against it too, as constants, so that only the
+    partitions for those days are scanned (see partitions.py).
+    """
+    if start_date is not None:
+        query = query.filter(column >= datetime.datetime.combine(start_date, datetime.time()))
+    if end_date is not None:
+        query = query.filter(column < datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time()))
+    if day_column is not None and start_date is not None:
+        query = query.filter(day_column >= day_literal(start_date))
+    if day_column is not None and end_date is not None:
+        query = query.filter(day_column <= day_literal(end_date))
+    return query
+
+
+def _encode_cursor(values):
+    values = [value.strftime(_CURSOR_TIMESTAMP_FORMAT) if isinstance(value, datetime.datetime) else value
+              for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor, names):
+    values = json.loads(base64.urlsafe_b64decode(str(cursor)).decode('utf-8'))
+    if len(values) != len(names):
+        raise ValueError("Cursor doesn't match the sort order")
+    return [datetime.datetime.strptime(value, _CURSOR_TIMESTAMP_FORMAT) if name == 'timestamp' else value
+            for name, value in zip(names, values)]
+
+
+_CURSOR_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+@event.listens_for(Food, 'after_update')
+def _rollup_food_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in ('station_id', 'price_cents')):
+        return
+    table = OrderRollup.__table__
+    connection.execute(table.update().where(and_(
+        table.c.data_set_id == target.data_set_id, table.c.food_id == target.id
+    )).values(
+        station_id=target.station_id,
+        revenue_cents=table.c.quantity * target.price_cents
+    ))
+
+
+@event.listens_for(Order, 'after_insert')
+def _rollup_order_insert(mapper, connection, target):
+    OrderRollup.apply(connection, target.data_set_id, target.food_id, target.timestamp, target.quantity, 1)
+
+
+@event.listens_for(Order, 'after_update')
+def _rollup_order_update(mapper, connection, target):
+    old = _previous_values(target, ('data_set_id', 'food_id', 'timestamp', 'quantity'))
+    if old is None:
+        return
+    OrderRollup.apply(connection, old['data_set_id'], old['food_id'], old['timestamp'], -old['quantity'], -1)
+    OrderRollup.apply(connection, target.data_set_id, target.food_id, target.timestamp, target.quantity, 1)
+
+
+@event.listens_for(Order, 'after_delete')
+def _rollup_order_delete(mapper, connection, target):
+    OrderRollup.apply(connection, target.data_set_id, target.food_id, target.timestamp, -target.quantity, -1)
+
+
+@event.listens_for(Order, 'after_insert')
+def _demographics_order_insert(mapper, connection, target):
+    OrderDemographics.apply(connection, target.data_set_id, target.food_id, age_band(target.age),
+                            postcode_region(target.postcode), target.quantity, 1)
+
+
+@event.listens_for(Order, 'after_update')
+def _demographics_order_update(mapper, connection, target):
+    old = _previous_values(target, ('data_set_id', 'food_id', 'age', 'postcode', 'quantity'))
+    if old is None:
+        return
+    OrderDemographics.apply(connection, old['data_set_id'], old['food_id'], age_band(old['age']),
+                            postcode_region(old['postcode']), -old['quantity'], -1)
+    OrderDemographics.apply(connection, target.data_set_id, target.food_id, age_band(target.age),
+                            postcode_region(target.postcode), target.quantity, 1)
+
+
+@event.listens_for(Order, 'after_delete')
+def _demographics_order_delete(mapper, connection, target):
+    OrderDemographics.apply(connection, target.data_set_id, target.food_id, age_band(target.age),
+                            postcode_region(target.postcode), -target.quantity, -1)
+
+
+@event.listens_for(Order, 'before_update')
+def _order_event_day(mapper, connection, target):
+    target.event_day = target.timestamp.date()
+
+
+@event.listens_for(Order, 'after_insert')
+def _stock_order_insert(mapper, connection, target):
+    Stock.apply(connection, target.data_set_id, target.food_id, target.timestamp.date(), target.quantity)
+
+
+@event.listens_for(Order, 'after_update')
+def _stock_order_update(mapper, connection, target):
+    old = _previous_values(target, ('data_set_id', 'food_id', 'timestamp', 'quantity'))
+    if old is None:
+        return
+    Stock.apply(connection, old['data_set_id'], old['food_id'], old['timestamp'].date(), -old['quantity'])
+    Stock.apply(connection, target.data_set_id, target.food_id, target.timestamp.date(), target.quantity)
+
+
+@event.listens_for(Order, 'after_delete')
+def _stock_order_delete(mapper, connection, target):
+    Stock.apply(connection, target.data_set_id, target.food_id, target.timestamp.date(), -target.quantity)
+
+
+def _previous_values(target, attrs):
+    """
+    The values `attrs` had before the flush that's updating `target`, or None if none of them changed.
+    """
+    state = inspect(target)
+    old = {}
+    for attr in attrs:
+        history = state.attrs[attr].history
+        old[attr] = history.deleted[0] if history.deleted else getattr(target, attr)
+    if all(old[attr] == getattr(target, attr) for attr in old):
+        return None
+    return old
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Load the old value of an expired attribute before it's replaced, or its history has nothing for _previous_values
+# and the old order is never subtracted.
+for _attr in (Order.data_set_id, Order.food_id, Order.timestamp, Order.quantity, Order.age, Order.postcode):
+    event.listen(_attr, 'set', _load_old_value, active_history=True)
+
+
+# Columnar copies of data sets' orders for the charts to aggregate in memory. Off until `max_rows` is set (run.py
+# takes it from settings.json).
+order_columns = OrderColumnStore(Order.__table__)
+
+
+@event.listens_for(Order, 'after_update')
+@event.listens_for(Order, 'after_delete')
+def _columns_order_changed(mapper, connection, target):
+    order_columns.touched(target.data_set_id, target.id)
+
+
+class StockMonitor(object):
+    """
+    Sales rates of live orders and low stock alerts. Each food's sales are counted in per-minute buckets over the last
+    `window_minutes` minutes (see rates.py), which give its sell-out time at the current rate. After orders are
+    committed, the stock of the foods they were for is checked, and each alert listener is called with (data set id,
+    alert) when a food first drops under its `alert_below`. Orders reach it from OrderIngestor's `on_commit` (see
+    run.py) and from ORM sessions.
+    """
+    def __init__(self, window_minutes=30):
+        self.rates = RateWindows(window_minutes)
+        self.alert_listeners = []
+        self._alerted = set()  # (data set id, food id, day) under its alert level
+        self._lock = threading.Lock()
+
+    def record(self, rows):
+        """
+        Counts committed `Order.__table__` rows and checks the stock of their foods.
+        """
+        keys = set()
+        for row in rows:
+            self.rates.add((row['data_set_id'], row['food_id']), minute_of(row['timestamp']), row['quantity'])
+            keys.add((row['data_set_id'], row['food_id'], row['timestamp'].date()))
+        if keys:
+            self.check(keys)
+
+    def check(self, keys):
+        """
+        Raises alerts for the (data set id, food id, day) keys whose remaining stock has dropped under its alert level.
+        """
+        table, foods = Stock.__table__, Food.__table__
+        alerts = []
+        connection = DBSession().get_bind().connect()
+        try:
+            for data_set_id, food_id, day in keys:
+                row = connection.execute(
+                    select([foods.c.title, table.c.opening, table.c.sold, table.c.alert_below])
+                    .select_from(table.join(foods, foods.c.id == table.c.food_id))
+                    .where(and_(table.c.data_set_id == data_set_id, table.c.food_id == food_id, table.c.day == day))
+                ).first()
+                if row is None or row.alert_below is None:
+                    continue
+                key, remaining = (data_set_id, food_id, day), row.opening - row.sold
+                with self._lock:
+                    if remaining >= row.alert_below:
+                        self._alerted.discard(key)
+                        continue
+                    if key in self._alerted:
+                        continue
+                    self._alerted.add(key)
+                alerts.append((data_set_id, {'food': row.title, 'day': day.isoformat(), 'remaining': remaining,
+                                             'alert_below': row.alert_below}))
+        finally:
+            connection.close()
+        for data_set_id, alert in alerts:
+            log.warning("Data set %d is low on %s: %d left", data_set_id, alert['food'], alert['remaining'])
+            for listener in self.alert_listeners:
+                try:
+                    listener(data_set_id, alert)
+                except Exception:
+                    log.exception("Stock alert listener failed")
+
+    def sell_out(self, data_set_id, food_id, remaining):
+        """
+        Returns the food's sales per hour over the window and the time it'll sell out at that rate (None if it isn't
+        selling).
+        """
+        per_minute, latest = self.rates.rate((data_set_id, food_id))
+        if not per_minute:
+            return 0.0, None
+        return per_minute * 60, minute_start(latest + 1) + datetime.timedelta(minutes=max(remaining, 0) / per_minute)
+
+
+stock_monitor = StockMonitor()
+
+
+class QueueMonitor(object):
+    """
+    Expected queue length and wait at each station right now. Orders arriving at each station are counted in
+    per-minute buckets over the last `window_minutes` minutes (see rates.py), so recording an order and reading a
+    station's arrival rate are O(1) however many orders arrive. Capacity is the staff on shift in the Roster at the
+    latest order's minute, each serving `orders_per_staff_hour` orders an hour as in RosterOptimiser, and the queue is
+    estimated from both with queueing.py. Orders reach it the same ways as the stock monitor's.
+    """
+    def __init__(self, window_minutes=15, orders_per_staff_hour=30):
+        self.arrivals = RateWindows(window_minutes)
+        self.orders_per_staff_hour = orders_per_staff_hour
+
+    def record(self, rows):
+        """
+        Counts committed `Order.__table__` rows as arrivals at their foods' stations. Rows may carry their
+        `station_id` already, otherwise it's looked up.
+        """
+        food_ids = {}
+        for row in rows:
+            if 'station_id' not in row:
+                food_ids.setdefault(row['data_set_id'], set()).add(row['food_id'])
+        stations = dict((data_set_id, DimensionMap.covering(data_set_id, food_ids=ids).food_stations)
+                        for data_set_id, ids in food_ids.items())
+        for row in rows:
+            station_id = row['station_id'] if 'station_id' in row else stations[row['data_set_id']][row['food_id']]
+            self.arrivals.add((row['data_set_id'], station_id), minute_of(row['timestamp']))
+
+    def estimates(self, data_set):
+        """
+        Returns (minute the estimates are for, [(station id, QueueEstimate)] in station title order). The minute is
+        the latest one with a recorded order in the data set, and None (with nothing queueing) if there isn't one.
+        """
+        dimensions = DimensionMap.get(data_set.id)
+        station_ids = sorted(dimensions.station_titles, key=dimensions.station_titles.get)
+        latest = [self.arrivals.rate((data_set.id, station_id))[1] for station_id in station_ids]
+        latest = max([minute for minute in latest if minute is not None] or [None])
+        if latest is None:
+            return None, [(station_id, estimate_queue(0.0, 0.0, 0)) for station_id in station_ids]
+        now = minute_start(latest)
+        staff = {}
+        for _, station_id, _, _, _, _ in Roster.get_interval_index(data_set).overlapping(
+                now, now + datetime.timedelta(minutes=1)):
+            staff[station_id] = staff.get(station_id, 0) + 1
+        service_rate = self.orders_per_staff_hour / 60.0
+        return now, [(station_id, estimate_queue(self.arrivals.rate((data_set.id, station_id), latest)[0],
+                                                 service_rate, staff.get(station_id, 0)))
+                     for station_id in station_ids]
+
+
+queue_monitor = QueueMonitor()
+
+
+# Registered first so that data set versions are bumped before the monitors publish anything
+track_data_set_changes(Station, Food, Event, Order, Staff, Roster, Stock)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_committed_orders(session, flush_context):
+    orders = session.info.setdefault('new_orders', [])
+    for obj in session.new:
+        if isinstance(obj, Order):
+            # the station is looked up now, as no SQL can be run once the session has committed
+            stations = DimensionMap.covering(obj.data_set_id, food_ids=[obj.food_id]).food_stations
+            orders.append({'data_set_id': obj.data_set_id, 'food_id': obj.food_id, 'timestamp': obj.timestamp,
+                           'quantity': obj.quantity, 'station_id': stations[obj.food_id]})
+
+
+@event.listens_for(Session, 'after_commit')
+def _record_committed_orders(session):
+    orders = session.info.pop('new_orders', None)
+    if orders:
+        stock_monitor.record(orders)
+        queue_monitor.record(orders)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_committed_orders(session):
+    session.info.pop('new_orders', None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_events(session, flush_context):
+    if any(isinstance(obj, Event) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info['events_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _sync_event_days(session):
+    if not session.info.pop('events_changed', False):
+        return
+    try:
+        # On a connection of its own, after the commit: the partitions and indexes are DDL, which pysqlite would
+        # commit the session's transaction for
+        with session.get_bind().begin() as connection:
+            events = connection.execute(select([Event.first_day, Event.last_day, Event.archived])).fetchall()
+            sync_event_days(connection, [Order.__table__, ArchivedOrder.__table__], events)
+    except Exception:  # The events are committed, and the next commit that changes one tries again
+        log.exception("Updating the order partitions for events failed")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_events(session):
+    session.info.pop('events_changed', None)
+
 
 class EventTrackingDemoApp(AppWithDataSets):
     def get_name(self):
@@ -122,11 +1319,38 @@ class EventTrackingDemoApp(AppWithDataSets):
                         name='Overview',
                         widgets=[SimpleGrid(Station)]
                     ),
+                    Step(
+                        name='Events',
+                        widgets=[SimpleGrid(Event),
+                                 EventArchiver()]
+                    ),
+                    Step(
+                        name='Revenue',
+                        widgets=concurrent_step([RevenueChart('station'),
+                                                 RevenueChart('food'),
+                                                 RevenueChart('hour')])
+                    ),
+                    Step(
+                        name='Roster',
+                        widgets=[SimpleGrid(Staff),
+                                 SimpleGrid(Roster),
+                                 RosterOptimiser(),
+                                 RosterTimelineWidget()]
+                    ),
                     Step(
                         name='Foods',
                         widgets=[SimpleGrid(Food),
                                  FoodPopularityChart()]
                     ),
+                    Step(
+                        name='Stock',
+                        widgets=[SimpleGrid(Stock),
+                                 StockTable()]
+                    ),
+                    Step(
+                        name='Access',
+                        widgets=[AccessTokens()]
+                    ),
                 ]
             ),
             StepGroup(
@@ -134,9 +1358,28 @@ class EventTrackingDemoApp(AppWithDataSets):
                 steps=[
                     Step(
                         name='Overview',
-                        widgets=[SimpleGrid(Order),
-                                # ExampleTimelineWidget(), TODO: Perhaps process the best time to roster staff based on popular times?
-                                 FoodPopByHourChart()]
+                        widgets=concurrent_step([LatestOrdersTable(),
+                                                 RosterTimelineWidget(),
+                                                 FoodPopByHourChart()])
+                    ),
+                    Step(
+                        name='Orders',
+                        widgets=[SimpleGrid(Order)]  # For editing; on its own step as it loads every order
+                    ),
+                    Step(
+                        name='Demographics',
+                        widgets=concurrent_step([AgeBandChart(),
+                                                 PostcodeRegionChart(),
+                                                 FoodByAgeBandTable()])
+                    ),
+                    Step(
+                        name='Queues',
+                        widgets=[QueueTable()]
+                    ),
+                    Step(
+                        name='Forecast',
+                        widgets=[ForecastChart(),
+                                 FoodForecastTable()]  # Computed in turn, so the table reuses the chart's model
                     )
                 ]
             )
@@ -144,6 +1387,13 @@ class EventTrackingDemoApp(AppWithDataSets):
 
 
 class FoodPopularityChart(Chart):
+    """
+    Quantity ordered per food at `event` (by default the current event).
+    """
+    def __init__(self, event=None):
+        super(FoodPopularityChart, self).__init__()
+        self.event = event
+
     def get_chart_type(self, app_session):
         return Chart.PIECHART
 
@@ -159,17 +1409,20 @@ class FoodPopularityChart(Chart):
     def get_order_by_column(self, app_session):
         return "food_name"
 
-    def get_table_data(self, app_session):
-        food_popularity = []
-        foods = app_session.data_set.query(Food.title).distinct()
-        for food in foods:
-            food_popularity.append({'food_name': food[0], 'quantity': 0})
+    def get_cache_key(self):
+        return self.event,
 
-        for oitem in app_session.data_set.query(Order).all():
-            for food in food_popularity:
-                if food['food_name'] == oitem.food:
-                    food['quantity'] += oitem.quantity
-        return food_popularity
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        data_set = app_session.data_set
+        start_date, end_date = _selected_days(data_set, self.event)
+        columns = _live_columns(data_set, start_date, end_date)
+        if columns is not None:
+            totals = _totals_by_food_title(data_set, columns.aggregate('food', start_date=start_date,
+                                                                       end_date=end_date))
+        else:
+            totals = OrderRollup.get_total_by_food(data_set, start_date, end_date)
+        return [{'food_name': title, 'quantity': quantity} for title, quantity in totals]
 
     def get_chart_options(self, app_session):
         return {'title': 'Most Popular Meals',
@@ -184,6 +1437,27 @@ class FoodPopularityChart(Chart):
 
 
 class FoodPopByHourChart(Chart):
+    """
+    Orders per time of day over the opening hours of the events shown. `bucket_minutes` may be 15, 30 or 60, and
+    `start_date`/`end_date` restrict the days that are counted, by default to the days of `event` (or of the current
+    event).
+    """
+    def __init__(self, bucket_minutes=60, start_date=None, end_date=None, event=None):
+        super(FoodPopByHourChart, self).__init__()
+        if bucket_minutes not in (15, 30, 60):
+            raise ValueError("bucket_minutes must be 15, 30 or 60")
+        self.bucket_minutes = bucket_minutes
+        self.start_date = start_date
+        self.end_date = end_date
+        self.event = event
+
+    def get_range(self, data_set):
+        """
+        Returns (start date, end date, first hour, last hour) of the orders shown.
+        """
+        start_date, end_date = _selected_days(data_set, self.event, self.start_date, self.end_date)
+        return (start_date, end_date) + Event.get_hours(data_set, start_date, end_date)
+
     def get_chart_type(self, app_session):
         return Chart.BARCHART
 
@@ -193,19 +1467,30 @@ class FoodPopByHourChart(Chart):
             "orders": ("number", "Orders"),
         }
 
+    def get_cache_key(self):
+        return self.bucket_minutes, self.start_date, self.end_date, self.event
+
+    @cached_widget_data
     def get_table_data(self, app_session):
-        pop_by_time = [{'hour': x, 'orders': 0} for x in xrange(6, 19)]
-        for oitem in app_session.data_set.query(Order).all():
-            for t in pop_by_time:
-                if t['hour'] == int(oitem.timestamp.strftime('%H')):
-                    t['orders'] += 1
-        return pop_by_time
+        data_set = app_session.data_set
+        start_date, end_date, first_hour, last_hour = self.get_range(data_set)
+        columns = _live_columns(data_set, start_date, end_date)
+        if columns is not None:
+            counts = columns.aggregate('minute', 'orders', self.bucket_minutes, first_hour=first_hour,
+                                       last_hour=last_hour, start_date=start_date, end_date=end_date)
+        elif self.bucket_minutes == 60:
+            counts = dict(OrderRollup.get_count_by_hour_of_day(data_set, first_hour, last_hour, start_date, end_date))
+        else:
+            counts = dict(Order.get_count_by_time_of_day(data_set, self.bucket_minutes, first_hour, last_hour,
+                                                         start_date, end_date))
+        return [{'hour': '%02d:%02d' % divmod(minute, 60), 'orders': counts.get(minute, 0)}
+                for minute in xrange(first_hour * 60, (last_hour + 1) * 60, self.bucket_minutes)]
 
     def get_column_ordering(self, app_session):
         return ["hour", "orders"]
 
     def get_order_by_column(self, app_session):
-        return "year"
+        return "hour"
 
     def get_chart_options(self, app_session):
         return {
@@ -217,634 +1502,587 @@ class FoodPopByHourChart(Chart):
         }
 
 
-class ExampleTimelineWidget(TimelineWidget):
+class RevenueChart(Chart):
+    """
+    Revenue at `event` (by default the current event) grouped `by` 'food', 'station' or 'hour' (of day), read from the
+    order columns or else the rollup.
+    """
+    def __init__(self, by='station', event=None):
+        super(RevenueChart, self).__init__()
+        if by not in ('food', 'station', 'hour'):
+            raise ValueError("by must be 'food', 'station' or 'hour'")
+        self.by = by
+        self.event = event
+
+    def get_chart_type(self, app_session):
+        return Chart.COLUMNCHART
+
+    def get_table_schema(self, app_session):
+        return {
+            "group": ("string", self.by.capitalize()),
+            "revenue": ("number", "Revenue ($)"),
+        }
+
+    def get_column_ordering(self, app_session):
+        return ["group", "revenue"]
+
+    def get_order_by_column(self, app_session):
+        return "group"
+
+    def get_cache_key(self):
+        return self.by, self.event
+
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        data_set = app_session.data_set
+        start_date, end_date = _selected_days(data_set, self.event)
+        columns = _live_columns(data_set, start_date, end_date)
+        if columns is not None:
+            dimensions = DimensionMap.covering(data_set.id, food_ids=columns.food_ids.tolist())
+            revenue = _with_titles(data_set, self.by, columns.aggregate(
+                self.by, 'revenue', food_stations=dimensions.food_stations, food_prices=dimensions.food_prices,
+                start_date=start_date, end_date=end_date).items())
+        else:
+            revenue = OrderRollup.get_revenue(data_set, self.by, start_date, end_date)
+        return [{'group': '%02d:00' % group if self.by == 'hour' else group, 'revenue': revenue_cents / 100.0}
+                for group, revenue_cents in revenue]
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Revenue by %s' % self.by.capitalize(), 'legend': {'position': 'none'}}
+
+
+class AgeBandChart(Chart):
+    """
+    Quantity ordered per age band, read from OrderDemographics.
+    """
+    def get_chart_type(self, app_session):
+        return Chart.COLUMNCHART
+
+    def get_table_schema(self, app_session):
+        return {
+            "age_band": ("string", "Age"),
+            "quantity": ("number", "Quantity"),
+        }
+
+    def get_column_ordering(self, app_session):
+        return ["age_band", "quantity"]
+
+    def get_order_by_column(self, app_session):
+        return "age_band"
+
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        return [{'age_band': age_band_label(band), 'quantity': quantity}
+                for band, quantity, _ in OrderDemographics.get_totals(app_session.data_set, ('age_band',))]
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Popularity by Age', 'legend': {'position': 'none'}}
+
+
+class PostcodeRegionChart(Chart):
+    """
+    Orders per postcode region, read from OrderDemographics.
+    """
+    def get_chart_type(self, app_session):
+        return Chart.PIECHART
+
+    def get_table_schema(self, app_session):
+        return {
+            "region": ("string", "Region"),
+            "orders": ("number", "Orders"),
+        }
+
+    def get_column_ordering(self, app_session):
+        return ["region", "orders"]
+
+    def get_order_by_column(self, app_session):
+        return "region"
+
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        return [{'region': region, 'orders': orders}
+                for region, _, orders in OrderDemographics.get_totals(app_session.data_set, ('region',))]
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Orders by Region', 'pieHole': '0.3'}
+
+
+class FoodByAgeBandTable(Chart):
+    """
+    Food x age band grid of quantities ordered, read from OrderDemographics.
+    """
+    BANDS = [band for band, _ in AGE_BANDS] + [UNKNOWN_AGE_BAND]
+
+    def get_chart_type(self, app_session):
+        return Chart.TABLE
+
+    def get_table_schema(self, app_session):
+        schema = {"food": ("string", "Food")}
+        for band in self.BANDS:
+            schema[self.column(band)] = ("number", age_band_label(band))
+        return schema
+
+    def get_column_ordering(self, app_session):
+        return ["food"] + [self.column(band) for band in self.BANDS]
+
+    def get_order_by_column(self, app_session):
+        return "food"
+
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        rows = {}
+        for title, band, quantity, _ in OrderDemographics.get_totals(app_session.data_set, ('food', 'age_band')):
+            row = rows.setdefault(title, dict([("food", title)] + [(self.column(b), 0) for b in self.BANDS]))
+            row[self.column(band)] = quantity
+        return [rows[title] for title in sorted(rows)]
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Food Popularity by Age'}
+
+    @staticmethod
+    def column(band):
+        return 'age_unknown' if band == UNKNOWN_AGE_BAND else 'age_%d' % band
+
+
+class ForecastChart(Chart):
+    """
+    Quantity ordered per hour on an average event day of the latest year with orders, against the forecast for that
+    year from the years before it (or from every year, when there's only one) and the forecast for the next year.
+    """
+    def get_chart_type(self, app_session):
+        return Chart.LINECHART
+
+    def get_table_schema(self, app_session):
+        return {
+            "hour": ("string", "Hour"),
+            "actual": ("number", "Actual"),
+            "forecast": ("number", "Forecast"),
+            "next_year": ("number", "Next year"),
+        }
+
+    def get_column_ordering(self, app_session):
+        return ["hour", "actual", "forecast", "next_year"]
+
+    def get_order_by_column(self, app_session):
+        return "hour"
+
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        data_set = app_session.data_set
+        history = OrderRollup.get_demand_history(data_set)
+        if history is None:
+            return []
+        year = int(history.years()[-1])
+        weekdays = history.weekdays(year)
+        backtest = OrderRollup.get_demand_model(data_set, before_year=year) or OrderRollup.get_demand_model(data_set)
+        actual = history.actual(year).sum(axis=0)
+        forecast = backtest.predict(year, weekdays).sum(axis=0)
+        next_year = OrderRollup.get_demand_model(data_set).predict(year + 1, weekdays).sum(axis=0)
+        first_hour, last_hour = Event.get_hours(data_set)
+        return [{'hour': '%02d:00' % hour, 'actual': round(float(actual[hour]), 1),
+                 'forecast': round(float(forecast[hour]), 1), 'next_year': round(float(next_year[hour]), 1)}
+                for hour in xrange(first_hour, last_hour + 1)]
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Demand per Event Day, Forecast vs Actual', 'vAxis': {'title': 'Quantity'}}
+
+
+class FoodForecastTable(Chart):
+    """
+    Next year's forecast quantity per food per hour of an event day, for prepping stock. Event days are assumed to
+    fall on the same days of the week as in the latest year with orders. There's a column per hour that any event is
+    open.
+    """
+    @staticmethod
+    def hours(data_set):
+        first_hour, last_hour = Event.get_hours(data_set)
+        return range(first_hour, last_hour + 1)
+
+    def get_chart_type(self, app_session):
+        return Chart.TABLE
+
+    def get_table_schema(self, app_session):
+        schema = {"food": ("string", "Food"), "total": ("number", "Day")}
+        for hour in self.hours(app_session.data_set):
+            schema[self.column(hour)] = ("number", "%02d:00" % hour)
+        return schema
+
+    def get_column_ordering(self, app_session):
+        return ["food", "total"] + [self.column(hour) for hour in self.hours(app_session.data_set)]
+
+    def get_order_by_column(self, app_session):
+        return "food"
+
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        data_set = app_session.data_set
+        history = OrderRollup.get_demand_history(data_set)
+        if history is None:
+            return []
+        year = int(history.years()[-1])
+        model = OrderRollup.get_demand_model(data_set)
+        forecast = model.predict(year + 1, history.weekdays(year))
+        titles = DimensionMap.covering(data_set.id, food_ids=model.food_ids).food_titles
+        rows = []
+        for i, food_id in enumerate(model.food_ids):
+            row = {"food": titles.get(food_id, str(food_id)), "total": round(float(forecast[i].sum()), 1)}
+            for hour in self.hours(data_set):
+                row[self.column(hour)] = round(float(forecast[i, hour]), 1)
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["food"])
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Next Year\'s Forecast per Event Day'}
+
+    @staticmethod
+    def column(hour):
+        return 'h%02d' % hour
+
+
+class StockTable(Chart):
+    """
+    Remaining stock of each food on the latest day with stock entered, with its sales rate and sell-out time from the
+    stock monitor's recent orders. Pass `station` (a title) to only show that station's foods. Not cached, as the
+    rates move without the data set changing, and the Stock rows already hold the running totals.
+    """
+    def __init__(self, station=None):
+        super(StockTable, self).__init__()
+        self.station = station
+
+    def get_chart_type(self, app_session):
+        return Chart.TABLE
+
+    def get_table_schema(self, app_session):
+        return {
+            "station": ("string", "Station"),
+            "food": ("string", "Food"),
+            "opening": ("number", "Opening"),
+            "sold": ("number", "Sold"),
+            "remaining": ("number", "Remaining"),
+            "per_hour": ("number", "Sold per Hour"),
+            "sell_out": ("datetime", "Sells Out"),
+            "status": ("string", "Status"),
+        }
+
+    def get_column_ordering(self, app_session):
+        return ["station", "food", "opening", "sold", "remaining", "per_hour", "sell_out", "status"]
+
+    def get_order_by_column(self, app_session):
+        return "remaining"
+
+    def get_table_data(self, app_session):
+        data_set_id = app_session.data_set.id
+        rows = []
+        for station, food_id, food, opening, sold, alert_below in Stock.get_levels(app_session.data_set):
+            if self.station is not None and station != self.station:
+                continue
+            remaining = opening - sold
+            per_hour, sell_out = stock_monitor.sell_out(data_set_id, food_id, remaining)
+            if remaining <= 0:
+                status = 'Sold out'
+            elif alert_below is not None and remaining < alert_below:
+                status = 'Low'
+            else:
+                status = 'OK'
+            rows.append({"station": station, "food": food, "opening": opening, "sold": sold, "remaining": remaining,
+                         "per_hour": round(per_hour, 1), "sell_out": sell_out if remaining > 0 else None,
+                         "status": status})
+        return rows
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Remaining Stock' if self.station is None else 'Remaining Stock at %s' % self.station,
+                'sortColumn': 4, 'sortAscending': True}
+
+
+class QueueTable(Chart):
+    """
+    Each station's expected queue and wait at the time of the latest live order, from the queue monitor's recent
+    arrivals and the staff rostered on then. Not cached, as the arrival rates move without the data set changing.
+    """
+    def get_chart_type(self, app_session):
+        return Chart.TABLE
+
+    def get_table_schema(self, app_session):
+        return {
+            "station": ("string", "Station"),
+            "staff": ("number", "Staff on Shift"),
+            "per_hour": ("number", "Orders per Hour"),
+            "utilisation": ("number", "Utilisation (%)"),
+            "queue": ("number", "Queue"),
+            "wait": ("number", "Wait (min)"),
+            "status": ("string", "Status"),
+        }
+
+    def get_column_ordering(self, app_session):
+        return ["station", "staff", "per_hour", "utilisation", "queue", "wait", "status"]
+
+    def get_order_by_column(self, app_session):
+        return "station"
+
+    @staticmethod
+    def rows(data_set):
+        now, estimates = queue_monitor.estimates(data_set)
+        titles = DimensionMap.get(data_set.id).station_titles
+        rows = []
+        for station_id, estimate in estimates:
+            if now is None:
+                status = 'No recent orders'
+            elif estimate.overloaded:
+                status = 'No staff' if not estimate.staff else 'Overloaded'
+            else:
+                status = 'OK'
+            rows.append({
+                "station": titles[station_id],
+                "staff": estimate.staff,
+                "per_hour": round(estimate.arrivals * 60, 1),
+                "utilisation": None if estimate.utilisation is None else round(estimate.utilisation * 100),
+                "queue": None if estimate.overloaded else round(estimate.queue_length, 1),
+                "wait": None if estimate.overloaded else round(estimate.wait_minutes, 1),
+                "status": status,
+            })
+        return rows
+
+    def get_table_data(self, app_session):
+        return self.rows(app_session.data_set)
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Queues Now'}
+
+
+class LatestOrdersTable(Chart):
+    """
+    The newest orders of `event` (by default the current event), fetched a page at a time with Order.get_page rather
+    than loading the whole table, for the Usage overview. Older pages are served by the /orders/<data set id> endpoint
+    in api.py. Orders are edited in SimpleGrid(Order), on a step of its own as it sends every order to the browser.
+    """
+    PAGE_SIZE = 50
+
+    def __init__(self, event=None):
+        super(LatestOrdersTable, self).__init__()
+        self.event = event
+
+    def get_chart_type(self, app_session):
+        return Chart.TABLE
+
+    def get_table_schema(self, app_session):
+        return {
+            "timestamp": ("datetime", "Time"),
+            "food": ("string", "Food"),
+            "quantity": ("number", "Quantity"),
+            "age": ("number", "Age"),
+            "postcode": ("number", "Postcode"),
+        }
+
+    def get_column_ordering(self, app_session):
+        return ["timestamp", "food", "quantity", "age", "postcode"]
+
+    def get_order_by_column(self, app_session):
+        return "timestamp"
+
+    def get_cache_key(self):
+        return self.event,
+
+    @cached_widget_data
+    def get_table_data(self, app_session):
+        start_date, end_date = _selected_days(app_session.data_set, self.event)
+        orders, _ = Order.get_page(app_session.data_set, limit=self.PAGE_SIZE, descending=True, start_date=start_date,
+                                   end_date=end_date)
+        return [order.serialise for order in orders]
+
+    def get_chart_options(self, app_session):
+        return {'title': 'Latest Orders', 'sortColumn': 0, 'sortAscending': False}
+
+
+class RosterTimelineWidget(TimelineWidget):
+    """
+    Shifts from the data set's Roster, grouped by staff member. Pass `start`/`end` to only send the shifts overlapping
+    that window.
+    """
+    def __init__(self, start=None, end=None):
+        super(RosterTimelineWidget, self).__init__()
+        self.start = start
+        self.end = end
+
     def get_title(self, app_session):
         return 'Work shifts'
 
     def get_options(self, app_session):
+        first_hour, last_hour = Event.get_hours(app_session.data_set)
+        if (first_hour, last_hour) == (0, 23):
+            return {}
+        closed = datetime.datetime(2017, 1, 2)  # any day will do, the hidden hours repeat daily
         return {
             'hiddenDates': [
                 {
-                    'start': datetime.datetime(2017, 1, 2, 18),
-                    'end': datetime.datetime(2017, 1, 3, 6)
+                    'start': closed + datetime.timedelta(hours=last_hour + 1),
+                    'end': closed + datetime.timedelta(days=1, hours=first_hour),
+                    'repeat': 'daily'
                 }
             ]
         }
 
+    def get_cache_key(self):
+        return self.start, self.end
+
+    @cached_widget_data
     def get_data(self, app_session):
-        return [
-            {'id': 1, 'group': 'John', 'content': 'Monday Shift 1', 'start': datetime.datetime(2017, 1, 2, 7),
-             'end': datetime.datetime(2017, 1, 2, 12)},
-            {'id': 2, 'group': 'John', 'content': 'Tuesday Shift 2', 'start': datetime.datetime(2017, 1, 3, 12),
-             'end': datetime.datetime(2017, 1, 3, 17)},
-            {'id': 3, 'group': 'Sarah', 'content': 'Monday Shift 2', 'start': datetime.datetime(2017, 1, 2, 11),
-             'end': datetime.datetime(2017, 1, 2, 17)},
-            {'id': 4, 'group': 'Sarah', 'content': 'Tuesday Shift 1', 'start': datetime.datetime(2017, 1, 3, 7),
-             'end': datetime.datetime(2017, 1, 3, 12)},
-        ]
+        shifts = Roster.get_interval_index(app_session.data_set).overlapping(self.start, self.end)
+        dimensions = DimensionMap.covering(app_session.data_set.id, station_ids=[shift[1] for shift in shifts],
+                                           staff_ids=[shift[2] for shift in shifts])
+        return [{'id': shift_id, 'group': dimensions.staff_names[staff_id],
+                 'content': content or dimensions.station_titles[station_id], 'start': start, 'end': end}
+                for shift_id, station_id, staff_id, start, end, content in shifts]
+
+
+class RosterOptimiser(ExecuteFunction):
+    """
+    Replaces the roster for `days` days from `start_date` (by default the day after the last order) with shifts that
+    cover each station's average hourly demand, where a staff member serves `orders_per_staff_hour` orders an hour.
+    Every staff member works at most one shift a day, between `min_shift_hours` and `max_shift_hours` long.
+    """
+    SLOT_MINUTES = 15
+
+    def __init__(self, start_date=None, days=1, min_shift_hours=3, max_shift_hours=8, orders_per_staff_hour=30):
+        super(RosterOptimiser, self).__init__()
+        self.start_date = start_date
+        self.days = days
+        self.min_shift_hours = min_shift_hours
+        self.max_shift_hours = max_shift_hours
+        self.orders_per_staff_hour = orders_per_staff_hour
+
+    def get_button_text(self, app_session):
+        return "Generate roster from order demand"
+
+    def execute_function(self, app_session):
+        data_set = app_session.data_set
+        session = DBSession()
+        stations = session.query(Station).filter(Station.data_set_id == data_set.id).order_by(Station.title).all()
+        staff = session.query(Staff).filter(Staff.data_set_id == data_set.id).order_by(Staff.staff_name).all()
+        demand = OrderRollup.get_daily_orders_by_station_hour(data_set)
+        if not demand:
+            app_session.task_manager.send_progress_message("There are no orders to work out demand from.")
+            return
+
+        slots_per_hour = 60 // self.SLOT_MINUTES
+        orders_per_slot = np.zeros((len(stations), self.days, 24 * slots_per_hour))
+        for i, station in enumerate(stations):
+            for hour in xrange(24):
+                orders_per_slot[i, :, hour * slots_per_hour:(hour + 1) * slots_per_hour] = \
+                    demand.get((station.id, hour), 0.0) / slots_per_hour
+        required = required_staff(orders_per_slot, float(self.orders_per_staff_hour) / slots_per_hour)
+        shifts, shortage = solve_roster(required, len(staff), self.min_shift_hours * slots_per_hour,
+                                        self.max_shift_hours * slots_per_hour)
+
+        start_date = self.start_date
+        if start_date is None:
+            last_hour = session.query(func.max(OrderRollup.hour)).filter(OrderRollup.data_set_id == data_set.id).scalar()
+            start_date = last_hour.date() + datetime.timedelta(days=1)
+        horizon_start = datetime.datetime.combine(start_date, datetime.time())
+        horizon_end = horizon_start + datetime.timedelta(days=self.days)
+        for shift in data_set.query(Roster).filter(Roster.start < horizon_end, Roster.end > horizon_start):
+            session.delete(shift)
+
+        slot = datetime.timedelta(minutes=self.SLOT_MINUTES)
+        roster = []
+        for staff_index, station_index, day, start_slot, length in shifts:
+            start = horizon_start + datetime.timedelta(days=day) + start_slot * slot
+            roster.append(Roster(stations[station_index], staff[staff_index], start, start + length * slot,
+                                 "Generated shift"))
+        data_set.add_all(roster)
+        app_session.task_manager.send_progress_message(
+            "Generated %d shifts from %s. Understaffed hours: %.2f before, %.2f after." % (
+                len(roster), start_date, understaffed_slots(required) / float(slots_per_hour),
+                understaffed_slots(shortage) / float(slots_per_hour)))
+
+
+class EventArchiver(ExecuteFunction):
+    """
+    Archives every event but the `keep` latest: their orders are moved out of Order (see Event.archive), while the
+    charts and forecasts still count them.
+    """
+    def __init__(self, keep=1):
+        super(EventArchiver, self).__init__()
+        self.keep = keep
+
+    def get_button_text(self, app_session):
+        return "Archive old events"
+
+    def execute_function(self, app_session):
+        events = app_session.data_set.query(Event).order_by(Event.first_day.desc()).all()[self.keep:]
+        archived = [(event.title, event.archive()) for event in events if not event.archived]
+        if not archived:
+            app_session.task_manager.send_progress_message("There are no old events to archive.")
+            return
+        app_session.task_manager.send_progress_message("Archived %s." % ', '.join(
+            "%s (%d orders)" % (title, moved) for title, moved in archived))
+
+
+class AccessTokens(ExecuteFunction):
+    """
+    Issues access tokens for the current data set's HTTP endpoints (see access.py), one for each of
+    access.APP_SCOPES. Only the owner of a data set can open it, so only they can get its tokens.
+    """
+    def get_button_text(self, app_session):
+        return "Issue access tokens"
+
+    def execute_function(self, app_session):
+        if access.token_signer is None:
+            app_session.task_manager.send_progress_message(
+                "Set ACCESS_SECRET in settings.json to serve the HTTP endpoints and issue tokens for them.")
+            return
+        for scope in access.APP_SCOPES:
+            app_session.task_manager.send_progress_message("%s token, valid for %d days: %s" % (
+                scope, access.LIFETIMES[scope] // 86400, access.token_signer.issue(scope, app_session.data_set.id)))
 
 
 def load_example_data(app_session):
-    stations = [
-        ["Vietnamese Stall"],
-        ["Chinese Stall"],
-        ["Spanish Stall"]
-    ]
-    # app_session.data_set.add(s)
-    app_session.data_set.add_all([Station(row[0]) for row in stations])
+    stations = dict((title, Station(title)) for title in ["Vietnamese Stall", "Chinese Stall", "Spanish Stall"])
+    app_session.data_set.add_all(list(stations.values()))
     foods = [
-        Food("Vietnamese Stall", "Banh Mi", "A pork roll with salad and chili.", "8"),
-        Food("Vietnamese Stall", "Rice Noodle Salad", "Rice noodles with pork.", "13"),
-        Food("Vietnamese Stall", "Prawn Soup", "A spicy soup with seafood.", "15"),
-        Food("Vietnamese Stall", "Vietnamese Spring Rolls", "Vegetarian spring rolls.", "15"),
-        Food("Chinese Stall", "Honey Chicken", "Honey chicken served with rice.", "18"),
-        Food("Chinese Stall", "Lemon Chicken", "Lemon chicken served with rice.", "18"),
-        Food("Chinese Stall", "Wonton Soup", "Soup with dumplings.", "20"),
-        Food("Chinese Stall", "Chinese Spring Rolls", "Pork spring rolls", "7.5"),
-        Food("Chinese Stall", "Sweet and Sour Pork", "Pork with special sauce.", "22"),
-        Food("Spanish Stall", "Spanish Meatballs", "Pork meatball with capsicum.", "5"),
-        Food("Spanish Stall", "Seafood Paella", "A rice dish with seafood.", "14.5"),
+        Food(stations["Vietnamese Stall"], "Banh Mi", "A pork roll with salad and chili.", 800),
+        Food(stations["Vietnamese Stall"], "Rice Noodle Salad", "Rice noodles with pork.", 1300),
+        Food(stations["Vietnamese Stall"], "Prawn Soup", "A spicy soup with seafood.", 1500),
+        Food(stations["Vietnamese Stall"], "Vietnamese Spring Rolls", "Vegetarian spring rolls.", 1500),
+        Food(stations["Chinese Stall"], "Honey Chicken", "Honey chicken served with rice.", 1800),
+        Food(stations["Chinese Stall"], "Lemon Chicken", "Lemon chicken served with rice.", 1800),
+        Food(stations["Chinese Stall"], "Wonton Soup", "Soup with dumplings.", 2000),
+        Food(stations["Chinese Stall"], "Chinese Spring Rolls", "Pork spring rolls", 750),
+        Food(stations["Chinese Stall"], "Sweet and Sour Pork", "Pork with special sauce.", 2200),
+        Food(stations["Spanish Stall"], "Spanish Meatballs", "Pork meatball with capsicum.", 500),
+        Food(stations["Spanish Stall"], "Seafood Paella", "A rice dish with seafood.", 1450),
     ]
     app_session.data_set.add_all(foods)
-    staff = [
-        Staff("Henry"),
-        Staff("Cestmere"),
-        Staff("Jerrard"),
-    ]
+    foods = dict((food.title, food) for food in foods)
+    staff = dict((name, Staff(name)) for name in ["Henry", "Cestmere", "Jerrard"])
     roster = [
-        Roster("Vietnamese Stall", "Henry",
+        Roster(stations["Vietnamese Stall"], staff["Henry"],
                datetime.datetime(2017, 1, 2, 6),
                datetime.datetime(2017, 1, 2, 18),
                "Viet shift day 1"),
-        Roster("Chinese Stall", "Cestmere",
+        Roster(stations["Chinese Stall"], staff["Cestmere"],
                datetime.datetime(2017, 1, 2, 6),
                datetime.datetime(2017, 1, 2, 18),
                "Chinese shift day 1"),
-        Roster("Spanish Stall", "Jerrard",
+        Roster(stations["Spanish Stall"], staff["Jerrard"],
                datetime.datetime(2017, 1, 2, 6),
                datetime.datetime(2017, 1, 2, 18),
                "Spanish shift day 1")
     ]
-    app_session.data_set.add_all(staff)
+    app_session.data_set.add_all(list(staff.values()))
     app_session.data_set.add_all(roster)
-    orders = [Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 18, 2060),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 22, 4238),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 21, 2876),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 46, 1153),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 18, 2556),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 18, 2439),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 45, 4464),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 48, 3448),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 24, 4117),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 64, 1964),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 41, 3234),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 44, 3416),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 30, 4469),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 66, 1269),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 48, 3531),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 34, 2925),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 51, 4626),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 26, 2700),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 19, 2589),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 46, 2206),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 18, 3298),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 25, 4797),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 61, 1006),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 58, 2815),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 32, 4894),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 53, 4457),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 56, 2614),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 33, 2494),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 61, 4585),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 63, 4713),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 21, 2116),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 12, 4713),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 62, 4530),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 45, 3616),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 34, 4459),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 35, 4976),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 15, 3527),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 28, 4115),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 43, 4137),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 29, 2787),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 49, 1791),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 41, 3317),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 12, 1007),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 28, 1083),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 14, 1715),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 25, 1235),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 21, 2399),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 62, 3704),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 59, 1241),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 32, 2186),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 48, 3108),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 16, 1236),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 67, 4614),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 18, 4749),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 57, 4539),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 15, 3341),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 53, 4313),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 44, 4687),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 22, 4800),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 63, 4237),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 31, 2157),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 55, 2823),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 60, 4075),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 57, 2238),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 16, 2460),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 12, 3184),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 13, 2987),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 16, 2861),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 36, 4683),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 16, 1469),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 61, 1966),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 30, 1418),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 67, 4023),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 37, 2588),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 46, 4911),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 15, 4593),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 65, 4964),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 20, 4302),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 26, 4367),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 58, 3420),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 46, 1248),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 39, 4967),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 37, 4095),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 55, 1418),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 29, 2965),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 70, 3320),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 14, 3262),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 49, 1762),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 67, 2512),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 66, 2213),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 64, 1818),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 49, 3110),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 30, 3007),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 61, 1031),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 23, 4256),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 69, 1395),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 46, 3404),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 17, 2388),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 35, 2272),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 13, 1292),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 43, 3420),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 50, 2709),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 66, 4415),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 52, 3654),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 35, 4909),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 56, 3004),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 70, 2173),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 24, 3561),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 40, 3437),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 12, 4653),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 43, 1342),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 14, 3637),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 50, 1182),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 18, 4937),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 36, 3802),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 64, 3363),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 56, 3560),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 65, 2145),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 60, 1228),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 19, 1707),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 12, 4404),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 34, 2727),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 59, 4862),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 60, 2121),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 13, 1299),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 30, 4719),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 53, 4918),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 41, 3520),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 18, 1007),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 30, 2665),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 64, 4763),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 40, 3805),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 23, 3751),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 54, 4864),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 68, 1132),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 17, 1031),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 43, 3999),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 30, 3435),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 67, 1886),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 47, 2558),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 37, 1899),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 27, 2438),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 46, 2896),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 18, 3413),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 42, 2262),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 32, 3853),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 44, 3752),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 60, 3852),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 68, 3384),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 27, 4110),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 52, 1650),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 32, 4502),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 47, 3189),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 67, 1118),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 69, 2954),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 31, 4051),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 14, 1581),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 43, 3947),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 32, 4909),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 49, 3007),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 27, 2282),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 39, 4379),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 54, 4231),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 55, 3857),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 39, 1680),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 23, 4126),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 13, 2812),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 65, 4513),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 20, 1715),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 51, 2453),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 56, 2662),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 56, 4066),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 61, 1906),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 30, 2574),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 32, 2473),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 63, 1262),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 32, 1993),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 15, 2772),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 27, 3911),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 70, 2711),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 47, 2773),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 20, 1315),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 63, 1111),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 63, 3924),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 23, 3459),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 15, 3072),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 15, 3165),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 49, 2152),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 13, 2702),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 62, 2039),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 66, 1769),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 45, 3525),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 59, 2189),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 54, 3276),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 34, 4584),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 52, 4089),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 44, 2627),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 16, 4128),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 42, 3958),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 47, 1823),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 46, 3809),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 62, 3186),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 26, 4403),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 14, 2992),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 58, 4483),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 18, 3930),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 12, 4775),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 22, 3247),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 29, 2865),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 38, 1703),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 23, 4721),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 68, 2271),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 68, 3698),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 64, 3086),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 52, 4100),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 25, 3797),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 45, 2641),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 46, 3517),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 67, 3021),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 41, 3055),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 13, 4652),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 12, 4487),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 45, 3475),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 20, 4149),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 13, 4609),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 65, 4668),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 33, 1373),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 12, 1545),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 30, 3138),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 40, 4034),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 36, 1283),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 59, 1001),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 25, 1377),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 40, 4023),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 50, 1896),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 32, 3823),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 45, 2169),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 48, 2409),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 30, 4675),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 46, 3532),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 64, 3003),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 27, 3773),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 63, 3903),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 13, 2920),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 65, 4949),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 29, 1935),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 38, 2168),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 44, 1534),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 67, 2618),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 34, 3997),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 17, 2608),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 62, 4894),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 42, 3052),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 27, 2526),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 33, 4400),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 51, 4454),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 36, 1239),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 33, 3892),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 51, 4471),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 21, 4590),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 61, 1700),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 70, 3207),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 25, 1050),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 31, 1481),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 35, 3434),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 44, 3490),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 49, 2443),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 42, 4562),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 40, 3705),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 57, 3714),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 52, 2718),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 45, 4094),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 19, 1012),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 22, 3144),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 56, 4304),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 27, 1665),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 70, 1054),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 63, 2413),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 31, 1395),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 56, 4575),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 62, 2198),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 70, 4742),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 67, 2688),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 22, 3027),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 19, 4248),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 12, 1099),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 36, 1444),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 49, 4760),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 14, 4614),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 59, 1737),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 38, 3488),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 60, 1081),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 27, 1873),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 24, 1983),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 16, 2116),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 38, 4987),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 42, 1767),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 41, 1147),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 45, 1219),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 33, 3043),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 52, 2589),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 22, 3538),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 29, 3272),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 22, 3581),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 55, 4044),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 47, 4468),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 49, 4440),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 27, 4678),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 36, 2924),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 50, 1078),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 44, 3941),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 69, 3290),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 65, 1655),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 51, 1133),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 69, 1864),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 39, 3970),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 42, 3530),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 66, 3336),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 33, 2649),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 70, 4882),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 69, 3997),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 47, 3152),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 13, 2661),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 21, 2855),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 55, 2188),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 58, 4423),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 65, 2617),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 13, 4565),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 54, 3168),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 14, 1207),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 15, 4356),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 33, 3415),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 47, 2025),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 45, 1141),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 27, 2087),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 70, 1200),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 48, 2212),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 44, 3415),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 56, 2280),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 44, 2445),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 29, 2290),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 39, 3497),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 20, 1434),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 70, 3311),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 51, 4723),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 60, 3540),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 59, 3911),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 46, 2589),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 31, 4308),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 64, 1163),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 68, 2499),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 36, 4973),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 37, 4446),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 30, 3584),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 51, 2054),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 18, 4031),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 34, 1727),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 53, 2358),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 24, 3048),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 69, 4720),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 40, 1852),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 39, 1257),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 68, 2649),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 36, 3363),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 28, 2271),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 38, 3196),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 61, 1043),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 46, 2248),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 15, 1017),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 51, 2480),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 32, 4886),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 64, 2499),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 34, 4633),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 61, 1892),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 27, 1503),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 59, 4606),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 45, 4603),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 69, 3688),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 25, 4843),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 44, 1268),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 25, 2208),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 50, 3470),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 56, 2526),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 47, 4139),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 33, 1025),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 22, 3947),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 64, 3643),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 33, 3870),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 33, 2326),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 42, 3916),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 13, 3624),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 53, 4576),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 30, 2708),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 27, 4481),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 41, 3670),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 17, 2079),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 63, 4127),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 43, 3777),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 45, 2596),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 13, 4215),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 34, 3492),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 20, 4168),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 31, 3222),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 24, 2362),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 28, 2166),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 40, 4620),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 46, 3465),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 12, 3155),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 21, 4722),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 12, 4329),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 30, 1635),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 25, 1353),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 30, 3985),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 32, 4006),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 23, 1980),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 63, 3231),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 65, 3218),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 47, 3298),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 33, 4057),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 36, 3895),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 33, 4047),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 65, 1928),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 53, 3435),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 38, 3512),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 19, 3598),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 47, 1556),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 49, 4111),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 50, 4967),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 32, 2028),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 65, 2041),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 28, 1193),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 35, 4726),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 69, 2300),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 43, 3629),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 49, 2208),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 42, 3190),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 41, 3783),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 18, 3333),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 30, 3457),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 62, 4883),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 34, 4515),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 21, 2588),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 69, 2646),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 63, 1928),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 59, 4256),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 58, 1738),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 25, 3404),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 70, 1567),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 60, 2330),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 33, 1517),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 60, 2521),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 20, 2289),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 33, 2652),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 49, 1917),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 27, 2374),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 61, 1126),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 13, 3178),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 20, 2177),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 44, 3912),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 37, 2247),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 15, 4808),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 20, 3148),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 25, 4676),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 23, 1715),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 54, 1133),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 38, 4490),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 39, 3276),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 33, 3441),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 23, 2888),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 13, 4603),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 29, 4453),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 59, 1417),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 31, 3798),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 48, 2090),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 14, 1609),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 22, 2130),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 52, 2019),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 13, 3551),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 45, 3118),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 21, 4956),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 61, 4257),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 54, 3631),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 58, 1676),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 22, 3938),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 55, 4289),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 25, 1890),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 19, 1984),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 36, 2730),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 16, 4306),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 42, 3726),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 61, 2527),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 41, 2961),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 46, 2506),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 39, 4131),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 38, 3209),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 45, 4202),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 35, 3908),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 53, 2931),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 35, 2273),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 13, 4357),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 29, 1500),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 54, 1346),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 48, 2891),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 29, 3670),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 48, 1454),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 19, 1177),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 40, 1195),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 48, 2711),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 56, 3782),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 62, 2125),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 20, 2573),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 13, 4804),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 15, 3731),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 65, 1636),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 57, 3677),
-              Order("Seafood Paella", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 51, 3729),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 41, 4475),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 56, 4843),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 26, 1017),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 55, 3224),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 66, 3181),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 61, 1517),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 26, 4494),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 31, 4940),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 70, 3532),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 31, 4111),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 62, 2676),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 34, 2690),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 23, 2057),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 54, 1475),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 41, 1001),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 62, 3034),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 28, 1584),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 33, 1833),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 44, 3637),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 51, 2059),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 50, 4031),
-              Order("Sweet and Sour Pork", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 47, 3696),
-              Order("Chinese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 40, 3622),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 14, 3769),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 68, 2215),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 38, 3013),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 29, 1669),
-              Order("Prawn Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 67, 4900),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 65, 2658),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 21, 1053),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 58, 1267),
-              Order("Wonton Soup", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 15, 2602),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 36, 3550),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 4, 24, 3122),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 42, 4270),
-              Order("Vietnamese Spring Rolls", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 60, 3017),
-              Order("Banh Mi", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 23, 1759),
-              Order("Lemon Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 13, 2844),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 3, 56, 2173),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 2, 50, 3896),
-              Order("Spanish Meatballs", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 0, 14, 4263),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 51, 4696),
-              Order("Honey Chicken", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 5, 12, 1055),
-              Order("Rice Noodle Salad", datetime.datetime(2017, 1, 2, random.randint(6, 18)), 1, 53, 4217)]
-    app_session.data_set.add_all(orders)
+    app_session.data_set.add(Event("Demo Day", datetime.date(2017, 1, 2), first_hour=6, last_hour=18))
+    app_session.data_set.add_all([Stock(food, datetime.date(2017, 1, 2), 160, alert_below=30)
+                                  for food in foods.values()])
+    session = DBSession()
+    session.flush()  # assigns the food ids
+
+    # Orders go in with one executemany rather than as ORM objects, so their aggregates are updated here
+    hours = np.random.randint(6, 19, len(EXAMPLE_ORDERS)).tolist()
+    rows = [{'data_set_id': app_session.data_set.id, 'food_id': foods[title].id,
+             'timestamp': datetime.datetime(2017, 1, 2, hour), 'quantity': quantity, 'age': age, 'postcode': postcode}
+            for (title, quantity, age, postcode), hour in zip(EXAMPLE_ORDERS, hours)]
+    session.execute(Order.__table__.insert(), rows)
+    deltas = OrderAggregateDeltas()
+    for row in rows:
+        deltas.add(row)
+    deltas.apply(session.connection())
@@ -0,0 +1,567 @@
+"""
+The orders of the "Demo Dummy Data (D^3)" example as (food title, quantity, age, postcode). `load_example_data` gives
+each a random hour from 06:00 to 18:00 on 2 January 2017.
+"""
+
+EXAMPLE_ORDERS = [
+    ("Vietnamese Spring Rolls", 5, 18, 2060),
+    ("Vietnamese Spring Rolls", 3, 22, 4238),
+    ("Vietnamese Spring Rolls", 3, 21, 2876),
+    ("Sweet and Sour Pork", 5, 46, 1153),
+    ("Prawn Soup", 5, 18, 2556),
+    ("Wonton Soup", 3, 18, 2439),
+    ("Lemon Chicken", 5, 45, 4464),
+    ("Seafood Paella", 0, 48, 3448),
+    ("Spanish Meatballs", 2, 24, 4117),
+    ("Seafood Paella", 1, 64, 1964),
+    ("Sweet and Sour Pork", 3, 41, 3234),
+    ("Lemon Chicken", 2, 44, 3416),
+    ("Sweet and Sour Pork", 2, 30, 4469),
+    ("Prawn Soup", 0, 66, 1269),
+    ("Seafood Paella", 3, 48, 3531),
+    ("Prawn Soup", 5, 34, 2925),
+    ("Honey Chicken", 0, 51, 4626),
+    ("Vietnamese Spring Rolls", 0, 26, 2700),
+    ("Seafood Paella", 2, 19, 2589),
+    ("Lemon Chicken", 3, 46, 2206),
+    ("Lemon Chicken", 5, 18, 3298),
+    ("Lemon Chicken", 4, 25, 4797),
+    ("Banh Mi", 2, 61, 1006),
+    ("Chinese Spring Rolls", 0, 58, 2815),
+    ("Seafood Paella", 5, 32, 4894),
+    ("Rice Noodle Salad", 0, 53, 4457),
+    ("Spanish Meatballs", 5, 56, 2614),
+    ("Banh Mi", 5, 33, 2494),
+    ("Sweet and Sour Pork", 5, 61, 4585),
+    ("Seafood Paella", 2, 63, 4713),
+    ("Honey Chicken", 1, 21, 2116),
+    ("Chinese Spring Rolls", 2, 12, 4713),
+    ("Rice Noodle Salad", 0, 62, 4530),
+    ("Seafood Paella", 4, 45, 3616),
+    ("Wonton Soup", 4, 34, 4459),
+    ("Wonton Soup", 0, 35, 4976),
+    ("Rice Noodle Salad", 4, 15, 3527),
+    ("Chinese Spring Rolls", 1, 28, 4115),
+    ("Spanish Meatballs", 0, 43, 4137),
+    ("Vietnamese Spring Rolls", 2, 29, 2787),
+    ("Vietnamese Spring Rolls", 5, 49, 1791),
+    ("Spanish Meatballs", 1, 41, 3317),
+    ("Chinese Spring Rolls", 1, 12, 1007),
+    ("Wonton Soup", 2, 28, 1083),
+    ("Spanish Meatballs", 4, 14, 1715),
+    ("Wonton Soup", 5, 25, 1235),
+    ("Honey Chicken", 2, 21, 2399),
+    ("Prawn Soup", 1, 62, 3704),
+    ("Wonton Soup", 4, 59, 1241),
+    ("Prawn Soup", 5, 32, 2186),
+    ("Vietnamese Spring Rolls", 2, 48, 3108),
+    ("Honey Chicken", 0, 16, 1236),
+    ("Spanish Meatballs", 0, 67, 4614),
+    ("Sweet and Sour Pork", 3, 18, 4749),
+    ("Rice Noodle Salad", 3, 57, 4539),
+    ("Prawn Soup", 4, 15, 3341),
+    ("Sweet and Sour Pork", 5, 53, 4313),
+    ("Rice Noodle Salad", 4, 44, 4687),
+    ("Banh Mi", 3, 22, 4800),
+    ("Prawn Soup", 1, 63, 4237),
+    ("Chinese Spring Rolls", 1, 31, 2157),
+    ("Lemon Chicken", 3, 55, 2823),
+    ("Wonton Soup", 3, 60, 4075),
+    ("Chinese Spring Rolls", 5, 57, 2238),
+    ("Banh Mi", 0, 16, 2460),
+    ("Banh Mi", 2, 12, 3184),
+    ("Rice Noodle Salad", 1, 13, 2987),
+    ("Seafood Paella", 4, 16, 2861),
+    ("Wonton Soup", 1, 36, 4683),
+    ("Rice Noodle Salad", 2, 16, 1469),
+    ("Seafood Paella", 5, 61, 1966),
+    ("Prawn Soup", 1, 30, 1418),
+    ("Rice Noodle Salad", 4, 67, 4023),
+    ("Vietnamese Spring Rolls", 4, 37, 2588),
+    ("Honey Chicken", 5, 46, 4911),
+    ("Sweet and Sour Pork", 5, 15, 4593),
+    ("Rice Noodle Salad", 0, 65, 4964),
+    ("Spanish Meatballs", 4, 20, 4302),
+    ("Seafood Paella", 0, 26, 4367),
+    ("Seafood Paella", 2, 58, 3420),
+    ("Chinese Spring Rolls", 0, 46, 1248),
+    ("Wonton Soup", 0, 39, 4967),
+    ("Prawn Soup", 4, 37, 4095),
+    ("Honey Chicken", 0, 55, 1418),
+    ("Sweet and Sour Pork", 1, 29, 2965),
+    ("Seafood Paella", 1, 70, 3320),
+    ("Chinese Spring Rolls", 4, 14, 3262),
+    ("Banh Mi", 4, 49, 1762),
+    ("Spanish Meatballs", 1, 67, 2512),
+    ("Prawn Soup", 3, 66, 2213),
+    ("Chinese Spring Rolls", 0, 64, 1818),
+    ("Honey Chicken", 3, 49, 3110),
+    ("Vietnamese Spring Rolls", 3, 30, 3007),
+    ("Seafood Paella", 1, 61, 1031),
+    ("Wonton Soup", 4, 23, 4256),
+    ("Sweet and Sour Pork", 3, 69, 1395),
+    ("Rice Noodle Salad", 2, 46, 3404),
+    ("Spanish Meatballs", 2, 17, 2388),
+    ("Lemon Chicken", 2, 35, 2272),
+    ("Banh Mi", 0, 13, 1292),
+    ("Banh Mi", 1, 43, 3420),
+    ("Rice Noodle Salad", 3, 50, 2709),
+    ("Prawn Soup", 1, 66, 4415),
+    ("Prawn Soup", 3, 52, 3654),
+    ("Spanish Meatballs", 4, 35, 4909),
+    ("Rice Noodle Salad", 3, 56, 3004),
+    ("Vietnamese Spring Rolls", 3, 70, 2173),
+    ("Chinese Spring Rolls", 4, 24, 3561),
+    ("Vietnamese Spring Rolls", 2, 40, 3437),
+    ("Wonton Soup", 3, 12, 4653),
+    ("Seafood Paella", 4, 43, 1342),
+    ("Banh Mi", 5, 14, 3637),
+    ("Rice Noodle Salad", 5, 50, 1182),
+    ("Wonton Soup", 4, 18, 4937),
+    ("Seafood Paella", 1, 36, 3802),
+    ("Chinese Spring Rolls", 2, 64, 3363),
+    ("Rice Noodle Salad", 3, 56, 3560),
+    ("Sweet and Sour Pork", 3, 65, 2145),
+    ("Vietnamese Spring Rolls", 0, 60, 1228),
+    ("Banh Mi", 1, 19, 1707),
+    ("Spanish Meatballs", 4, 12, 4404),
+    ("Sweet and Sour Pork", 5, 34, 2727),
+    ("Prawn Soup", 3, 59, 4862),
+    ("Seafood Paella", 1, 60, 2121),
+    ("Chinese Spring Rolls", 2, 13, 1299),
+    ("Prawn Soup", 2, 30, 4719),
+    ("Wonton Soup", 2, 53, 4918),
+    ("Lemon Chicken", 2, 41, 3520),
+    ("Banh Mi", 0, 18, 1007),
+    ("Banh Mi", 5, 30, 2665),
+    ("Honey Chicken", 0, 64, 4763),
+    ("Vietnamese Spring Rolls", 4, 40, 3805),
+    ("Chinese Spring Rolls", 0, 23, 3751),
+    ("Rice Noodle Salad", 5, 54, 4864),
+    ("Lemon Chicken", 4, 68, 1132),
+    ("Lemon Chicken", 1, 17, 1031),
+    ("Chinese Spring Rolls", 0, 43, 3999),
+    ("Chinese Spring Rolls", 1, 30, 3435),
+    ("Lemon Chicken", 0, 67, 1886),
+    ("Lemon Chicken", 0, 47, 2558),
+    ("Rice Noodle Salad", 4, 37, 1899),
+    ("Wonton Soup", 5, 27, 2438),
+    ("Prawn Soup", 3, 46, 2896),
+    ("Spanish Meatballs", 1, 18, 3413),
+    ("Honey Chicken", 2, 42, 2262),
+    ("Spanish Meatballs", 5, 32, 3853),
+    ("Banh Mi", 3, 44, 3752),
+    ("Wonton Soup", 0, 60, 3852),
+    ("Spanish Meatballs", 3, 68, 3384),
+    ("Wonton Soup", 4, 27, 4110),
+    ("Lemon Chicken", 1, 52, 1650),
+    ("Prawn Soup", 2, 32, 4502),
+    ("Prawn Soup", 0, 47, 3189),
+    ("Lemon Chicken", 0, 67, 1118),
+    ("Sweet and Sour Pork", 4, 69, 2954),
+    ("Banh Mi", 5, 31, 4051),
+    ("Wonton Soup", 5, 14, 1581),
+    ("Honey Chicken", 3, 43, 3947),
+    ("Spanish Meatballs", 0, 32, 4909),
+    ("Spanish Meatballs", 0, 49, 3007),
+    ("Chinese Spring Rolls", 1, 27, 2282),
+    ("Prawn Soup", 0, 39, 4379),
+    ("Banh Mi", 3, 54, 4231),
+    ("Lemon Chicken", 0, 55, 3857),
+    ("Rice Noodle Salad", 0, 39, 1680),
+    ("Spanish Meatballs", 2, 23, 4126),
+    ("Rice Noodle Salad", 4, 13, 2812),
+    ("Spanish Meatballs", 0, 65, 4513),
+    ("Honey Chicken", 3, 20, 1715),
+    ("Wonton Soup", 0, 51, 2453),
+    ("Honey Chicken", 3, 56, 2662),
+    ("Sweet and Sour Pork", 5, 56, 4066),
+    ("Rice Noodle Salad", 4, 61, 1906),
+    ("Banh Mi", 1, 30, 2574),
+    ("Seafood Paella", 3, 32, 2473),
+    ("Wonton Soup", 0, 63, 1262),
+    ("Wonton Soup", 4, 32, 1993),
+    ("Vietnamese Spring Rolls", 4, 15, 2772),
+    ("Seafood Paella", 3, 27, 3911),
+    ("Honey Chicken", 1, 70, 2711),
+    ("Spanish Meatballs", 3, 47, 2773),
+    ("Prawn Soup", 3, 20, 1315),
+    ("Prawn Soup", 1, 63, 1111),
+    ("Honey Chicken", 2, 63, 3924),
+    ("Rice Noodle Salad", 3, 23, 3459),
+    ("Honey Chicken", 2, 15, 3072),
+    ("Seafood Paella", 4, 15, 3165),
+    ("Banh Mi", 0, 49, 2152),
+    ("Rice Noodle Salad", 5, 13, 2702),
+    ("Spanish Meatballs", 2, 62, 2039),
+    ("Honey Chicken", 2, 66, 1769),
+    ("Lemon Chicken", 4, 45, 3525),
+    ("Chinese Spring Rolls", 4, 59, 2189),
+    ("Banh Mi", 4, 54, 3276),
+    ("Banh Mi", 3, 34, 4584),
+    ("Vietnamese Spring Rolls", 2, 52, 4089),
+    ("Chinese Spring Rolls", 5, 44, 2627),
+    ("Prawn Soup", 5, 16, 4128),
+    ("Vietnamese Spring Rolls", 5, 42, 3958),
+    ("Vietnamese Spring Rolls", 3, 47, 1823),
+    ("Seafood Paella", 5, 46, 3809),
+    ("Banh Mi", 0, 62, 3186),
+    ("Lemon Chicken", 3, 26, 4403),
+    ("Spanish Meatballs", 3, 14, 2992),
+    ("Seafood Paella", 4, 58, 4483),
+    ("Rice Noodle Salad", 5, 18, 3930),
+    ("Wonton Soup", 0, 12, 4775),
+    ("Banh Mi", 5, 22, 3247),
+    ("Sweet and Sour Pork", 0, 29, 2865),
+    ("Seafood Paella", 1, 38, 1703),
+    ("Banh Mi", 1, 23, 4721),
+    ("Wonton Soup", 3, 68, 2271),
+    ("Vietnamese Spring Rolls", 1, 68, 3698),
+    ("Spanish Meatballs", 5, 64, 3086),
+    ("Seafood Paella", 4, 52, 4100),
+    ("Sweet and Sour Pork", 4, 25, 3797),
+    ("Wonton Soup", 5, 45, 2641),
+    ("Rice Noodle Salad", 1, 46, 3517),
+    ("Banh Mi", 1, 67, 3021),
+    ("Chinese Spring Rolls", 5, 41, 3055),
+    ("Wonton Soup", 5, 13, 4652),
+    ("Honey Chicken", 5, 12, 4487),
+    ("Seafood Paella", 3, 45, 3475),
+    ("Wonton Soup", 4, 20, 4149),
+    ("Lemon Chicken", 3, 13, 4609),
+    ("Spanish Meatballs", 0, 65, 4668),
+    ("Wonton Soup", 3, 33, 1373),
+    ("Wonton Soup", 0, 12, 1545),
+    ("Seafood Paella", 3, 30, 3138),
+    ("Seafood Paella", 4, 40, 4034),
+    ("Sweet and Sour Pork", 3, 36, 1283),
+    ("Seafood Paella", 2, 59, 1001),
+    ("Vietnamese Spring Rolls", 5, 25, 1377),
+    ("Chinese Spring Rolls", 3, 40, 4023),
+    ("Seafood Paella", 0, 50, 1896),
+    ("Rice Noodle Salad", 1, 32, 3823),
+    ("Honey Chicken", 4, 45, 2169),
+    ("Spanish Meatballs", 1, 48, 2409),
+    ("Chinese Spring Rolls", 4, 30, 4675),
+    ("Sweet and Sour Pork", 2, 46, 3532),
+    ("Wonton Soup", 4, 64, 3003),
+    ("Sweet and Sour Pork", 3, 27, 3773),
+    ("Seafood Paella", 3, 63, 3903),
+    ("Vietnamese Spring Rolls", 2, 13, 2920),
+    ("Wonton Soup", 4, 65, 4949),
+    ("Banh Mi", 3, 29, 1935),
+    ("Wonton Soup", 1, 38, 2168),
+    ("Prawn Soup", 0, 44, 1534),
+    ("Seafood Paella", 5, 67, 2618),
+    ("Spanish Meatballs", 3, 34, 3997),
+    ("Wonton Soup", 5, 17, 2608),
+    ("Spanish Meatballs", 2, 62, 4894),
+    ("Sweet and Sour Pork", 0, 42, 3052),
+    ("Wonton Soup", 0, 27, 2526),
+    ("Spanish Meatballs", 1, 33, 4400),
+    ("Vietnamese Spring Rolls", 0, 51, 4454),
+    ("Lemon Chicken", 2, 36, 1239),
+    ("Chinese Spring Rolls", 3, 33, 3892),
+    ("Honey Chicken", 5, 51, 4471),
+    ("Wonton Soup", 3, 21, 4590),
+    ("Vietnamese Spring Rolls", 1, 61, 1700),
+    ("Sweet and Sour Pork", 5, 70, 3207),
+    ("Lemon Chicken", 0, 25, 1050),
+    ("Honey Chicken", 1, 31, 1481),
+    ("Wonton Soup", 4, 35, 3434),
+    ("Banh Mi", 1, 44, 3490),
+    ("Lemon Chicken", 0, 49, 2443),
+    ("Wonton Soup", 2, 42, 4562),
+    ("Lemon Chicken", 5, 40, 3705),
+    ("Rice Noodle Salad", 0, 57, 3714),
+    ("Wonton Soup", 0, 52, 2718),
+    ("Wonton Soup", 0, 45, 4094),
+    ("Banh Mi", 5, 19, 1012),
+    ("Lemon Chicken", 2, 22, 3144),
+    ("Vietnamese Spring Rolls", 2, 56, 4304),
+    ("Rice Noodle Salad", 1, 27, 1665),
+    ("Wonton Soup", 3, 70, 1054),
+    ("Vietnamese Spring Rolls", 1, 63, 2413),
+    ("Wonton Soup", 0, 31, 1395),
+    ("Wonton Soup", 4, 56, 4575),
+    ("Sweet and Sour Pork", 4, 62, 2198),
+    ("Spanish Meatballs", 1, 70, 4742),
+    ("Banh Mi", 5, 67, 2688),
+    ("Seafood Paella", 0, 22, 3027),
+    ("Vietnamese Spring Rolls", 4, 19, 4248),
+    ("Vietnamese Spring Rolls", 4, 12, 1099),
+    ("Banh Mi", 1, 36, 1444),
+    ("Prawn Soup", 4, 49, 4760),
+    ("Sweet and Sour Pork", 4, 14, 4614),
+    ("Sweet and Sour Pork", 4, 59, 1737),
+    ("Honey Chicken", 0, 38, 3488),
+    ("Spanish Meatballs", 3, 60, 1081),
+    ("Seafood Paella", 3, 27, 1873),
+    ("Honey Chicken", 1, 24, 1983),
+    ("Prawn Soup", 4, 16, 2116),
+    ("Spanish Meatballs", 5, 38, 4987),
+    ("Spanish Meatballs", 3, 42, 1767),
+    ("Honey Chicken", 0, 41, 1147),
+    ("Sweet and Sour Pork", 1, 45, 1219),
+    ("Honey Chicken", 1, 33, 3043),
+    ("Sweet and Sour Pork", 4, 52, 2589),
+    ("Wonton Soup", 0, 22, 3538),
+    ("Seafood Paella", 3, 29, 3272),
+    ("Prawn Soup", 5, 22, 3581),
+    ("Vietnamese Spring Rolls", 1, 55, 4044),
+    ("Chinese Spring Rolls", 0, 47, 4468),
+    ("Seafood Paella", 2, 49, 4440),
+    ("Banh Mi", 5, 27, 4678),
+    ("Chinese Spring Rolls", 3, 36, 2924),
+    ("Prawn Soup", 2, 50, 1078),
+    ("Prawn Soup", 1, 44, 3941),
+    ("Seafood Paella", 0, 69, 3290),
+    ("Sweet and Sour Pork", 5, 65, 1655),
+    ("Rice Noodle Salad", 3, 51, 1133),
+    ("Sweet and Sour Pork", 3, 69, 1864),
+    ("Honey Chicken", 5, 39, 3970),
+    ("Lemon Chicken", 0, 42, 3530),
+    ("Chinese Spring Rolls", 3, 66, 3336),
+    ("Prawn Soup", 0, 33, 2649),
+    ("Seafood Paella", 2, 70, 4882),
+    ("Chinese Spring Rolls", 5, 69, 3997),
+    ("Sweet and Sour Pork", 5, 47, 3152),
+    ("Banh Mi", 3, 13, 2661),
+    ("Sweet and Sour Pork", 0, 21, 2855),
+    ("Sweet and Sour Pork", 5, 55, 2188),
+    ("Chinese Spring Rolls", 0, 58, 4423),
+    ("Rice Noodle Salad", 0, 65, 2617),
+    ("Vietnamese Spring Rolls", 0, 13, 4565),
+    ("Honey Chicken", 5, 54, 3168),
+    ("Rice Noodle Salad", 1, 14, 1207),
+    ("Vietnamese Spring Rolls", 1, 15, 4356),
+    ("Sweet and Sour Pork", 2, 33, 3415),
+    ("Spanish Meatballs", 5, 47, 2025),
+    ("Spanish Meatballs", 1, 45, 1141),
+    ("Sweet and Sour Pork", 1, 27, 2087),
+    ("Vietnamese Spring Rolls", 2, 70, 1200),
+    ("Honey Chicken", 1, 48, 2212),
+    ("Rice Noodle Salad", 4, 44, 3415),
+    ("Honey Chicken", 5, 56, 2280),
+    ("Rice Noodle Salad", 0, 44, 2445),
+    ("Banh Mi", 5, 29, 2290),
+    ("Vietnamese Spring Rolls", 4, 39, 3497),
+    ("Chinese Spring Rolls", 3, 20, 1434),
+    ("Chinese Spring Rolls", 4, 70, 3311),
+    ("Vietnamese Spring Rolls", 5, 51, 4723),
+    ("Honey Chicken", 3, 60, 3540),
+    ("Sweet and Sour Pork", 5, 59, 3911),
+    ("Honey Chicken", 0, 46, 2589),
+    ("Prawn Soup", 5, 31, 4308),
+    ("Prawn Soup", 3, 64, 1163),
+    ("Vietnamese Spring Rolls", 2, 68, 2499),
+    ("Seafood Paella", 4, 36, 4973),
+    ("Sweet and Sour Pork", 5, 37, 4446),
+    ("Spanish Meatballs", 5, 30, 3584),
+    ("Prawn Soup", 5, 51, 2054),
+    ("Spanish Meatballs", 5, 18, 4031),
+    ("Vietnamese Spring Rolls", 3, 34, 1727),
+    ("Lemon Chicken", 2, 53, 2358),
+    ("Seafood Paella", 2, 24, 3048),
+    ("Lemon Chicken", 5, 69, 4720),
+    ("Sweet and Sour Pork", 1, 40, 1852),
+    ("Seafood Paella", 4, 39, 1257),
+    ("Vietnamese Spring Rolls", 2, 68, 2649),
+    ("Chinese Spring Rolls", 5, 36, 3363),
+    ("Prawn Soup", 5, 28, 2271),
+    ("Wonton Soup", 4, 38, 3196),
+    ("Prawn Soup", 2, 61, 1043),
+    ("Spanish Meatballs", 3, 46, 2248),
+    ("Spanish Meatballs", 3, 15, 1017),
+    ("Chinese Spring Rolls", 3, 51, 2480),
+    ("Spanish Meatballs", 3, 32, 4886),
+    ("Spanish Meatballs", 0, 64, 2499),
+    ("Prawn Soup", 3, 34, 4633),
+    ("Sweet and Sour Pork", 3, 61, 1892),
+    ("Vietnamese Spring Rolls", 1, 27, 1503),
+    ("Chinese Spring Rolls", 0, 59, 4606),
+    ("Spanish Meatballs", 1, 45, 4603),
+    ("Chinese Spring Rolls", 3, 69, 3688),
+    ("Spanish Meatballs", 4, 25, 4843),
+    ("Vietnamese Spring Rolls", 4, 44, 1268),
+    ("Banh Mi", 4, 25, 2208),
+    ("Wonton Soup", 4, 50, 3470),
+    ("Spanish Meatballs", 2, 56, 2526),
+    ("Chinese Spring Rolls", 5, 47, 4139),
+    ("Seafood Paella", 2, 33, 1025),
+    ("Chinese Spring Rolls", 1, 22, 3947),
+    ("Spanish Meatballs", 3, 64, 3643),
+    ("Honey Chicken", 1, 33, 3870),
+    ("Lemon Chicken", 3, 33, 2326),
+    ("Honey Chicken", 4, 42, 3916),
+    ("Sweet and Sour Pork", 0, 13, 3624),
+    ("Rice Noodle Salad", 5, 53, 4576),
+    ("Lemon Chicken", 3, 30, 2708),
+    ("Rice Noodle Salad", 0, 27, 4481),
+    ("Rice Noodle Salad", 1, 41, 3670),
+    ("Spanish Meatballs", 4, 17, 2079),
+    ("Vietnamese Spring Rolls", 0, 63, 4127),
+    ("Spanish Meatballs", 0, 43, 3777),
+    ("Prawn Soup", 3, 45, 2596),
+    ("Seafood Paella", 5, 13, 4215),
+    ("Spanish Meatballs", 2, 34, 3492),
+    ("Vietnamese Spring Rolls", 3, 20, 4168),
+    ("Sweet and Sour Pork", 2, 31, 3222),
+    ("Wonton Soup", 3, 24, 2362),
+    ("Spanish Meatballs", 1, 28, 2166),
+    ("Honey Chicken", 4, 40, 4620),
+    ("Seafood Paella", 5, 46, 3465),
+    ("Vietnamese Spring Rolls", 3, 12, 3155),
+    ("Vietnamese Spring Rolls", 2, 21, 4722),
+    ("Banh Mi", 5, 12, 4329),
+    ("Spanish Meatballs", 0, 30, 1635),
+    ("Lemon Chicken", 5, 25, 1353),
+    ("Vietnamese Spring Rolls", 5, 30, 3985),
+    ("Lemon Chicken", 0, 32, 4006),
+    ("Sweet and Sour Pork", 2, 23, 1980),
+    ("Sweet and Sour Pork", 4, 63, 3231),
+    ("Vietnamese Spring Rolls", 4, 65, 3218),
+    ("Rice Noodle Salad", 5, 47, 3298),
+    ("Wonton Soup", 4, 33, 4057),
+    ("Rice Noodle Salad", 2, 36, 3895),
+    ("Lemon Chicken", 2, 33, 4047),
+    ("Spanish Meatballs", 2, 65, 1928),
+    ("Prawn Soup", 3, 53, 3435),
+    ("Sweet and Sour Pork", 3, 38, 3512),
+    ("Chinese Spring Rolls", 4, 19, 3598),
+    ("Banh Mi", 1, 47, 1556),
+    ("Sweet and Sour Pork", 0, 49, 4111),
+    ("Rice Noodle Salad", 4, 50, 4967),
+    ("Sweet and Sour Pork", 3, 32, 2028),
+    ("Prawn Soup", 3, 65, 2041),
+    ("Spanish Meatballs", 1, 28, 1193),
+    ("Vietnamese Spring Rolls", 0, 35, 4726),
+    ("Wonton Soup", 1, 69, 2300),
+    ("Banh Mi", 3, 43, 3629),
+    ("Banh Mi", 0, 49, 2208),
+    ("Wonton Soup", 5, 42, 3190),
+    ("Wonton Soup", 5, 41, 3783),
+    ("Rice Noodle Salad", 1, 18, 3333),
+    ("Rice Noodle Salad", 3, 30, 3457),
+    ("Prawn Soup", 2, 62, 4883),
+    ("Seafood Paella", 4, 34, 4515),
+    ("Wonton Soup", 5, 21, 2588),
+    ("Sweet and Sour Pork", 5, 69, 2646),
+    ("Sweet and Sour Pork", 5, 63, 1928),
+    ("Banh Mi", 5, 59, 4256),
+    ("Lemon Chicken", 2, 58, 1738),
+    ("Honey Chicken", 5, 25, 3404),
+    ("Honey Chicken", 5, 70, 1567),
+    ("Seafood Paella", 0, 60, 2330),
+    ("Banh Mi", 2, 33, 1517),
+    ("Sweet and Sour Pork", 3, 60, 2521),
+    ("Spanish Meatballs", 4, 20, 2289),
+    ("Spanish Meatballs", 2, 33, 2652),
+    ("Banh Mi", 0, 49, 1917),
+    ("Vietnamese Spring Rolls", 1, 27, 2374),
+    ("Sweet and Sour Pork", 2, 61, 1126),
+    ("Honey Chicken", 0, 13, 3178),
+    ("Wonton Soup", 4, 20, 2177),
+    ("Banh Mi", 5, 44, 3912),
+    ("Banh Mi", 2, 37, 2247),
+    ("Spanish Meatballs", 1, 15, 4808),
+    ("Banh Mi", 0, 20, 3148),
+    ("Wonton Soup", 1, 25, 4676),
+    ("Seafood Paella", 4, 23, 1715),
+    ("Rice Noodle Salad", 3, 54, 1133),
+    ("Wonton Soup", 3, 38, 4490),
+    ("Prawn Soup", 2, 39, 3276),
+    ("Rice Noodle Salad", 4, 33, 3441),
+    ("Sweet and Sour Pork", 1, 23, 2888),
+    ("Honey Chicken", 2, 13, 4603),
+    ("Honey Chicken", 3, 29, 4453),
+    ("Spanish Meatballs", 5, 59, 1417),
+    ("Wonton Soup", 2, 31, 3798),
+    ("Honey Chicken", 5, 48, 2090),
+    ("Banh Mi", 2, 14, 1609),
+    ("Lemon Chicken", 1, 22, 2130),
+    ("Sweet and Sour Pork", 4, 52, 2019),
+    ("Rice Noodle Salad", 4, 13, 3551),
+    ("Honey Chicken", 4, 45, 3118),
+    ("Banh Mi", 1, 21, 4956),
+    ("Prawn Soup", 3, 61, 4257),
+    ("Spanish Meatballs", 4, 54, 3631),
+    ("Vietnamese Spring Rolls", 2, 58, 1676),
+    ("Seafood Paella", 5, 22, 3938),
+    ("Honey Chicken", 2, 55, 4289),
+    ("Banh Mi", 4, 25, 1890),
+    ("Prawn Soup", 5, 19, 1984),
+    ("Sweet and Sour Pork", 1, 36, 2730),
+    ("Vietnamese Spring Rolls", 0, 16, 4306),
+    ("Lemon Chicken", 1, 42, 3726),
+    ("Spanish Meatballs", 1, 61, 2527),
+    ("Banh Mi", 5, 41, 2961),
+    ("Prawn Soup", 4, 46, 2506),
+    ("Seafood Paella", 3, 39, 4131),
+    ("Vietnamese Spring Rolls", 4, 38, 3209),
+    ("Sweet and Sour Pork", 2, 45, 4202),
+    ("Vietnamese Spring Rolls", 4, 35, 3908),
+    ("Seafood Paella", 0, 53, 2931),
+    ("Lemon Chicken", 2, 35, 2273),
+    ("Spanish Meatballs", 5, 13, 4357),
+    ("Sweet and Sour Pork", 1, 29, 1500),
+    ("Vietnamese Spring Rolls", 2, 54, 1346),
+    ("Chinese Spring Rolls", 5, 48, 2891),
+    ("Wonton Soup", 5, 29, 3670),
+    ("Wonton Soup", 4, 48, 1454),
+    ("Prawn Soup", 1, 19, 1177),
+    ("Honey Chicken", 0, 40, 1195),
+    ("Honey Chicken", 3, 48, 2711),
+    ("Lemon Chicken", 0, 56, 3782),
+    ("Wonton Soup", 5, 62, 2125),
+    ("Chinese Spring Rolls", 4, 20, 2573),
+    ("Vietnamese Spring Rolls", 3, 13, 4804),
+    ("Chinese Spring Rolls", 0, 15, 3731),
+    ("Honey Chicken", 1, 65, 1636),
+    ("Rice Noodle Salad", 0, 57, 3677),
+    ("Seafood Paella", 5, 51, 3729),
+    ("Prawn Soup", 4, 41, 4475),
+    ("Honey Chicken", 2, 56, 4843),
+    ("Vietnamese Spring Rolls", 2, 26, 1017),
+    ("Rice Noodle Salad", 5, 55, 3224),
+    ("Lemon Chicken", 2, 66, 3181),
+    ("Honey Chicken", 1, 61, 1517),
+    ("Honey Chicken", 5, 26, 4494),
+    ("Rice Noodle Salad", 0, 31, 4940),
+    ("Wonton Soup", 3, 70, 3532),
+    ("Spanish Meatballs", 1, 31, 4111),
+    ("Sweet and Sour Pork", 1, 62, 2676),
+    ("Lemon Chicken", 1, 34, 2690),
+    ("Vietnamese Spring Rolls", 0, 23, 2057),
+    ("Honey Chicken", 4, 54, 1475),
+    ("Lemon Chicken", 4, 41, 1001),
+    ("Chinese Spring Rolls", 1, 62, 3034),
+    ("Prawn Soup", 3, 28, 1584),
+    ("Vietnamese Spring Rolls", 0, 33, 1833),
+    ("Spanish Meatballs", 4, 44, 3637),
+    ("Spanish Meatballs", 5, 51, 2059),
+    ("Sweet and Sour Pork", 1, 50, 4031),
+    ("Sweet and Sour Pork", 1, 47, 3696),
+    ("Chinese Spring Rolls", 0, 40, 3622),
+    ("Wonton Soup", 3, 14, 3769),
+    ("Vietnamese Spring Rolls", 5, 68, 2215),
+    ("Banh Mi", 2, 38, 3013),
+    ("Lemon Chicken", 2, 29, 1669),
+    ("Prawn Soup", 1, 67, 4900),
+    ("Honey Chicken", 1, 65, 2658),
+    ("Honey Chicken", 3, 21, 1053),
+    ("Vietnamese Spring Rolls", 0, 58, 1267),
+    ("Wonton Soup", 2, 15, 2602),
+    ("Vietnamese Spring Rolls", 3, 36, 3550),
+    ("Honey Chicken", 4, 24, 3122),
+    ("Spanish Meatballs", 1, 42, 4270),
+    ("Vietnamese Spring Rolls", 3, 60, 3017),
+    ("Banh Mi", 1, 23, 1759),
+    ("Lemon Chicken", 5, 13, 2844),
+    ("Rice Noodle Salad", 3, 56, 2173),
+    ("Honey Chicken", 2, 50, 3896),
+    ("Spanish Meatballs", 0, 14, 4263),
+    ("Rice Noodle Salad", 5, 51, 4696),
+    ("Honey Chicken", 5, 12, 1055),
+    ("Rice Noodle Salad", 1, 53, 4217),
+]
@@ -0,0 +1,173 @@
+"""
+Streaming export of a data set's orders as CSV, JSONL, Arrow (IPC stream) or Parquet.
+
+Rows are read through a server-side cursor in fixed-size batches and written straight from the result tuples (a batch
+at a time, column-wise for Arrow and Parquet), so no ORM objects or per-row dicts are built and memory depends only
+on the batch size. `iter_export` yields the encoded bytes batch by batch, which makes it usable directly as a WSGI
+response body. Arrow and Parquet need the optional pyarrow package.
+"""
+import csv, json
+from sqlalchemy.sql import and_, select, union_all
+from tropofy.database import DBSession
+from .events import ArchivedOrder, Food, Order
+from .partitions import day_literal
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/octet-stream',
+}
+COLUMNS = ['id', 'food', 'timestamp', 'quantity', 'age', 'postcode']
+
+
+class _Sink(object):
+    """
+    File-like object that collects writes until they're drained.
+    """
+    def __init__(self):
+        self._parts = []
+        self.closed = False
+
+    def write(self, data):
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8') if hasattr(data, 'encode') else bytes(memoryview(data))
+        self._parts.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _conditions(table, data_set_id, start, end):
+    conditions = [table.c.data_set_id == data_set_id]
+    if start is not None:
+        conditions.append(table.c.timestamp >= start)
+        conditions.append(table.c.event_day >= day_literal(start.date()))  # only scans those days' partitions
+    if end is not None:
+        conditions.append(table.c.timestamp < end)
+        conditions.append(table.c.event_day <= day_literal(end.date()))
+    return and_(*conditions)
+
+
+def _batches(data_set_id, batch_size, start, end):
+    """
+    The orders in [start, end), archived ones included, in timestamp order. Without archived orders in the range, the
+    rows come straight off Order's timestamp index, otherwise the two tables' rows are merged by a sort.
+    """
+    food = Food.__table__
+    selects = [select([food.c.title.label('food') if name == 'food' else table.c[name] for name in COLUMNS])
+               .select_from(table.join(food, food.c.id == table.c.food_id))
+               .where(_conditions(table, data_set_id, start, end))
+               for table in (Order.__table__, ArchivedOrder.__table__)]
+    archived = ArchivedOrder.__table__
+    connection = DBSession().get_bind().connect()
+    try:
+        if connection.execute(select([archived.c.id]).where(_conditions(archived, data_set_id, start, end))
+                              .limit(1)).first() is None:
+            query = selects[0].order_by(Order.__table__.c.timestamp, Order.__table__.c.id)
+        else:
+            orders = union_all(*selects).alias('orders')
+            query = select(list(orders.c)).order_by(orders.c.timestamp, orders.c.id)
+        result = connection.execution_options(stream_results=True).execute(query)
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        connection.close()
+
+
+def _write_csv(sink, batches):
+    writer = csv.writer(sink)
+    writer.writerow(COLUMNS)
+    yield sink.drain()
+    for rows in batches:
+        writer.writerows(rows)
+        yield sink.drain()
+
+
+def _write_jsonl(sink, batches):
+    for rows in batches:
+        sink.write(''.join(
+            '{"id": %d, "food": %s, "timestamp": "%s", "quantity": %d, "age": %s, "postcode": %s}\n' % (
+                order_id, json.dumps(food), timestamp.isoformat(), quantity, json.dumps(age), json.dumps(postcode))
+            for order_id, food, timestamp, quantity, age, postcode in rows))
+        yield sink.drain()
+
+
+def _arrow_schema():
+    return pyarrow.schema([
+        ('id', pyarrow.int64()),
+        ('food', pyarrow.string()),
+        ('timestamp', pyarrow.timestamp('us')),
+        ('quantity', pyarrow.int32()),
+        ('age', pyarrow.int32()),
+        ('postcode', pyarrow.int32()),
+    ])
+
+
+def _record_batch(schema, rows):
+    columns = zip(*rows)
+    return pyarrow.RecordBatch.from_arrays(
+        [pyarrow.array(list(column), type=field.type) for column, field in zip(columns, schema)], schema=schema)
+
+
+def _write_arrow(sink, batches):
+    schema = _arrow_schema()
+    writer = pyarrow.ipc.new_stream(pyarrow.PythonFile(sink, mode='w'), schema)
+    for rows in batches:
+        writer.write_batch(_record_batch(schema, rows))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _write_parquet(sink, batches):
+    schema = _arrow_schema()
+    writer = pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode='w'), schema)
+    for rows in batches:
+        writer.write_table(pyarrow.Table.from_batches([_record_batch(schema, rows)]))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+_WRITERS = {'csv': _write_csv, 'jsonl': _write_jsonl, 'arrow': _write_arrow, 'parquet': _write_parquet}
+
+
+def iter_export(data_set_id, file_format, batch_size=50000, start=None, end=None):
+    """
+    Yields the data set's orders (optionally only those with start <= timestamp < end), in timestamp order, encoded
+    as `file_format` bytes one batch at a time.
+    """
+    if file_format not in _WRITERS:
+        raise ValueError("Unknown export format %r, expected one of %s" % (file_format, ', '.join(sorted(FORMATS))))
+    if file_format in ('arrow', 'parquet') and pyarrow is None:
+        raise ValueError("Exporting %s needs the pyarrow package" % file_format)
+    for data in _WRITERS[file_format](_Sink(), _batches(data_set_id, batch_size, start, end)):
+        if data:
+            yield data
+
+
+def export_orders(data_set_id, path, file_format=None, batch_size=50000, start=None, end=None):
+    """
+    Writes the export to `path`, taking the format from its extension unless given.
+    """
+    if file_format is None:
+        file_format = path.rsplit('.', 1)[-1].lower()
+    with open(path, 'wb') as f:
+        for data in iter_export(data_set_id, file_format, batch_size, start, end):
+            f.write(data)
@@ -0,0 +1,107 @@
+"""
+Per-food hourly demand forecasts, fitted for every food at once.
+
+A food's demand in an hour of an event day is modelled as its average demand per event day in that year, which follows
+a linear trend across years, times the share of a day's demand it sees in that hour on that day of the week. Every
+food is fitted together: totals are `np.bincount`s over flat (food, year) and (food, weekday, hour) keys and the trends
+are one least squares solve with a column per food, so fitting is linear in the number of history rows.
+
+Weekdays are numbered as SQL's day of week, with 0 for Sunday.
+"""
+import numpy as np
+
+WEEKDAYS = 7
+HOURS = 24
+
+
+class DemandModel(object):
+    """
+    `intercept` and `slope` (per food) give the average demand per event day in a year, as a line over years centred
+    on `center`. `shape` is a (foods, weekdays, hours) array of each hour's demand as a multiple of that.
+    """
+    def __init__(self, food_ids, center, intercept, slope, shape):
+        self.food_ids = food_ids
+        self.center = center
+        self.intercept = intercept
+        self.slope = slope
+        self.shape = shape
+
+    def daily_demand(self, year):
+        return np.maximum(self.intercept + self.slope * (year - self.center), 0.0)
+
+    def predict(self, year, weekdays):
+        """
+        Expected quantity per food per hour of an event day in `year`, as a (foods, hours) array, averaged over days
+        falling on `weekdays` (list a weekday more than once to weight it).
+        """
+        return self.daily_demand(year)[:, None] * self.shape[:, list(weekdays), :].mean(axis=1)
+
+
+class DemandHistory(object):
+    """
+    Demand to fit to, as parallel arrays: the index into `food_ids`, year, weekday, hour of day and quantity of each
+    row (rows with the same key are summed, so they can be hourly or already grouped), and the year and weekday of
+    every event day.
+    """
+    def __init__(self, food_ids, food, year, weekday, hour, quantity, day_year, day_weekday):
+        self.food_ids = list(food_ids)
+        self.food = np.asarray(food, dtype=np.int64)
+        self.year = np.asarray(year, dtype=np.int64)
+        self.weekday = np.asarray(weekday, dtype=np.int64)
+        self.hour = np.asarray(hour, dtype=np.int64)
+        self.quantity = np.asarray(quantity, dtype=float)
+        self.day_year = np.asarray(day_year, dtype=np.int64)
+        self.day_weekday = np.asarray(day_weekday, dtype=np.int64)
+
+    def years(self):
+        return np.unique(self.day_year)
+
+    def before(self, year):
+        rows, days = self.year < year, self.day_year < year
+        return DemandHistory(self.food_ids, self.food[rows], self.year[rows], self.weekday[rows], self.hour[rows],
+                             self.quantity[rows], self.day_year[days], self.day_weekday[days])
+
+    def weekdays(self, year):
+        return self.day_weekday[self.day_year == year]
+
+    def actual(self, year):
+        """
+        The average quantity per food per hour of an event day in `year`, as a (foods, hours) array.
+        """
+        rows = self.year == year
+        days = np.count_nonzero(self.day_year == year)
+        totals = np.bincount(self.food[rows] * HOURS + self.hour[rows], self.quantity[rows],
+                             len(self.food_ids) * HOURS).reshape(len(self.food_ids), HOURS)
+        return totals / days if days else totals
+
+
+def fit_demand(history):
+    """
+    Fits a DemandModel to a DemandHistory. Raises ValueError if it has no event days.
+    """
+    if not len(history.day_year):
+        raise ValueError("There are no event days to fit demand to")
+    years = history.years()
+    foods = len(history.food_ids)
+
+    days_per_year = np.bincount(np.searchsorted(years, history.day_year), minlength=len(years))
+    by_year = np.bincount(history.food * len(years) + np.searchsorted(years, history.year), history.quantity,
+                          foods * len(years)).reshape(foods, len(years))
+    daily = by_year / days_per_year
+    center = float(years.mean())
+    if len(years) > 1:
+        slope, intercept = np.polyfit(years - center, daily.T, 1)
+    else:
+        slope, intercept = np.zeros(foods), daily[:, 0]
+
+    days_per_weekday = np.bincount(history.day_weekday, minlength=WEEKDAYS).astype(float)
+    slots = (history.food * WEEKDAYS + history.weekday) * HOURS + history.hour
+    by_slot = np.bincount(slots, history.quantity, foods * WEEKDAYS * HOURS).reshape(foods, WEEKDAYS, HOURS)
+    seen = days_per_weekday > 0
+    per_day = np.empty_like(by_slot)
+    per_day[:, seen] = by_slot[:, seen] / days_per_weekday[seen][None, :, None]
+    per_day[:, ~seen] = (by_slot.sum(axis=1) / days_per_weekday.sum())[:, None, :]  # unseen weekdays get the average
+    overall = by_year.sum(axis=1) / float(len(history.day_year))
+    shape = np.zeros_like(per_day)
+    np.divide(per_day, overall[:, None, None], out=shape, where=overall[:, None, None] > 0)
+    return DemandModel(history.food_ids, center, intercept, slope, shape)
@@ -0,0 +1,132 @@
+"""
+Synthetic order streams for demos, load tests and benchmarks.
+
+Orders are sampled with vectorised NumPy draws in fixed-size chunks, so tens of millions of rows can be produced
+without holding them all in memory. Timestamps follow a diurnal demand curve across a span of days, foods follow a
+food/station mix, and the same seed always yields the same stream.
+"""
+import collections, datetime, json
+import numpy as np
+from tropofy.database import DBSession
+from .cache import bump_on_commit
+from .events import DimensionMap, Food, Order, OrderDemographics, OrderRollup, Station, Stock
+
+EXAMPLE_MENU = [
+    ("Vietnamese Stall", "Banh Mi"),
+    ("Vietnamese Stall", "Rice Noodle Salad"),
+    ("Vietnamese Stall", "Prawn Soup"),
+    ("Vietnamese Stall", "Vietnamese Spring Rolls"),
+    ("Chinese Stall", "Honey Chicken"),
+    ("Chinese Stall", "Lemon Chicken"),
+    ("Chinese Stall", "Wonton Soup"),
+    ("Chinese Stall", "Chinese Spring Rolls"),
+    ("Chinese Stall", "Sweet and Sour Pork"),
+    ("Spanish Stall", "Spanish Meatballs"),
+    ("Spanish Stall", "Seafood Paella"),
+]
+
+# Relative demand for each hour of the day: open 06:00-19:00 with a lunch peak and a smaller dinner peak.
+_hours = np.arange(24)
+DIURNAL_CURVE = np.where((_hours >= 6) & (_hours < 19),
+                         0.2 + np.exp(-(_hours - 12.5) ** 2 / 3.0) + 0.6 * np.exp(-(_hours - 17.5) ** 2 / 2.0), 0.0)
+
+QUANTITY_WEIGHTS = [0.45, 0.25, 0.15, 0.1, 0.05]  # for quantities 1 to 5
+
+OrderChunk = collections.namedtuple('OrderChunk', ['food', 'timestamp', 'quantity', 'age', 'postcode'])
+
+
+class OrderGenerator(object):
+    """
+    `menu` is a list of (station, food title). `food_weights` and `station_weights` map titles to relative demand (1
+    by default), and a food's share of a station's weight is split evenly with the station's other foods.
+    `hourly_weights` (24 values) and `daily_weights` (`days` values) shape when orders happen.
+    """
+    def __init__(self, menu, start_date, days=1, seed=None, food_weights=None, station_weights=None,
+                 hourly_weights=None, daily_weights=None):
+        self.titles = [title for _, title in menu]
+        stations = [station for station, _ in menu]
+        station_sizes = collections.Counter(stations)
+        food_weights = food_weights or {}
+        station_weights = station_weights or {}
+        self.food_p = _normalise([food_weights.get(title, 1.0) * station_weights.get(station, 1.0) /
+                                  station_sizes[station] for station, title in menu])
+        self.hour_p = _normalise(DIURNAL_CURVE if hourly_weights is None else hourly_weights)
+        self.day_p = _normalise(np.ones(days) if daily_weights is None else daily_weights)
+        self.start = np.datetime64(datetime.datetime.combine(start_date, datetime.time()), 's')
+        self.rng = np.random.RandomState(seed)
+
+    def chunks(self, count, chunk_size=1000000):
+        """
+        Yields OrderChunks of parallel arrays (food is an index into `titles`) totalling `count` orders.
+        """
+        while count > 0:
+            size = min(chunk_size, count)
+            count -= size
+            rng = self.rng
+            seconds = (rng.choice(len(self.day_p), size, p=self.day_p) * 86400 +
+                       rng.choice(24, size, p=self.hour_p) * 3600 +
+                       rng.randint(0, 3600, size))
+            local = rng.random_sample(size) < 0.7
+            yield OrderChunk(
+                food=rng.choice(len(self.food_p), size, p=self.food_p),
+                timestamp=self.start + seconds.astype('timedelta64[s]'),
+                quantity=rng.choice(len(QUANTITY_WEIGHTS), size, p=QUANTITY_WEIGHTS) + 1,
+                age=np.clip(rng.normal(35, 14, size), 12, 80).astype(np.int32),
+                postcode=np.where(local, np.clip(rng.normal(2000, 40, size), 1000, 9999).astype(np.int32),
+                                  rng.randint(1000, 5000, size)),
+            )
+
+
+def _normalise(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def write_jsonl(generator, count, f, chunk_size=1000000):
+    """
+    Writes `count` orders as JSONL in the `Order.serialise` shape, readable by `ingest.import_orders`.
+    """
+    titles = np.array([json.dumps(title) for title in generator.titles], dtype=object)
+    for chunk in generator.chunks(count, chunk_size):
+        stamps = np.datetime_as_string(chunk.timestamp, unit='s')
+        f.writelines('{"food": %s, "timestamp": "%s", "quantity": %d, "age": %d, "postcode": %d}\n' % row
+                     for row in zip(titles[chunk.food], stamps, chunk.quantity.tolist(), chunk.age.tolist(),
+                                    chunk.postcode.tolist()))
+
+
+def insert_orders(data_set, generator, count, chunk_size=100000):
+    """
+    Inserts `count` orders straight into the data set with Core executemany inserts and rebuilds its OrderRollup,
+    OrderDemographics and Stock sold totals.
+    The generator's menu must match the data set's foods. Nothing is committed.
+    """
+    food_ids = DimensionMap.get(data_set.id, refresh=True).food_ids
+    missing = set(generator.titles) - set(food_ids)
+    if missing:
+        raise ValueError("Foods not in data set %d: %s" % (data_set.id, ', '.join(sorted(missing))))
+    session = DBSession()
+    insert = Order.__table__.insert()
+    for chunk in generator.chunks(count, chunk_size):
+        ids = np.array([food_ids[title] for title in generator.titles])[chunk.food].tolist()
+        session.execute(insert, [
+            {'data_set_id': data_set.id, 'food_id': food_id, 'timestamp': timestamp, 'quantity': quantity,
+             'age': age, 'postcode': postcode}
+            for food_id, timestamp, quantity, age, postcode in
+            zip(ids, chunk.timestamp.astype('datetime64[us]').tolist(), chunk.quantity.tolist(),
+                chunk.age.tolist(), chunk.postcode.tolist())])
+    OrderRollup.rebuild(data_set)
+    OrderDemographics.rebuild(data_set)
+    Stock.rebuild(data_set)
+    session.flush()
+    bump_on_commit(session, data_set.id)
+
+
+def menu_for(data_set):
+    """
+    The (station, title) menu of an existing data set, for generating orders into it.
+    """
+    return DBSession().query(Station.title, Food.title) \
+        .join(Station, Station.id == Food.station_id) \
+        .filter(Food.data_set_id == data_set.id) \
+        .order_by(Station.title, Food.title) \
+        .all()
@@ -0,0 +1,136 @@
+"""
+Bulk loading of till transactions into a data set's Order table.
+
+Rows are streamed from JSONL or CSV, validated, and written in fixed-size chunks with executemany Core inserts, so
+memory use depends on the chunk size rather than the file size and no ORM objects are built. OrderRollup,
+OrderDemographics and Stock are updated once at the end from deltas accumulated per bucket.
+"""
+import csv, datetime, json, time
+from tropofy.database import DBSession
+from .events import DimensionMap, Order, OrderAggregateDeltas
+
+TIMESTAMP_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%f',
+                     '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M']
+MAX_REPORTED_ERRORS = 20
+
+
+class ImportStats(object):
+    def __init__(self):
+        self.rows = 0
+        self.rejected = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def reject(self, line_number, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append("line %d: %s" % (line_number, reason))
+
+
+def parse_timestamp(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    for timestamp_format in TIMESTAMP_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, timestamp_format)
+        except ValueError:
+            pass
+    raise ValueError("unrecognised timestamp %r" % (value,))
+
+
+def _optional_int(value):
+    return None if value in (None, '') else int(value)
+
+
+def read_records(f, file_format, reject):
+    """
+    Yields (line number, record dict) from an open JSONL or CSV file. CSV files need a header row naming the
+    `Order.serialise` keys. JSONL lines that aren't a JSON object are passed to `reject` with the line number and
+    error, and skipped.
+    """
+    if file_format == 'jsonl':
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                reject(line_number, e)
+                continue
+            if not isinstance(record, dict):
+                reject(line_number, "not a JSON object")
+                continue
+            yield line_number, record
+    elif file_format == 'csv':
+        for line_number, record in enumerate(csv.DictReader(f), 2):
+            yield line_number, record
+    else:
+        raise ValueError("Unknown order file format %r, expected 'jsonl' or 'csv'" % (file_format,))
+
+
+def to_row(data_set_id, record, food_ids):
+    """
+    Validates one record in the `Order.serialise` shape and returns it as a row for `Order.__table__`, with the food
+    title looked up in `food_ids` ({title: id}).
+    """
+    food = record.get('food')
+    if food not in food_ids:
+        raise ValueError("unknown food %r" % (food,))
+    quantity = int(record['quantity'])
+    if quantity < 0:
+        raise ValueError("negative quantity %d" % quantity)
+    return {
+        'data_set_id': data_set_id,
+        'food_id': food_ids[food],
+        'timestamp': parse_timestamp(record['timestamp']),
+        'quantity': quantity,
+        'age': _optional_int(record.get('age')),
+        'postcode': _optional_int(record.get('postcode')),
+    }
+
+
+def import_orders(data_set, path, file_format=None, chunk_size=10000, progress=None):
+    """
+    Streams orders from `path` into the data set and returns ImportStats. The format is taken from the file extension
+    unless given. Invalid rows, and lines that can't be parsed, are skipped and counted. `progress`, if given, is
+    called with the stats after every chunk. Nothing is committed; the caller owns the transaction.
+    """
+    if file_format is None:
+        file_format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+    session = DBSession()
+    food_ids = DimensionMap.get(data_set.id, refresh=True).food_ids
+    insert = Order.__table__.insert()
+    deltas = OrderAggregateDeltas()
+    stats = ImportStats()
+    started = time.time()
+    chunk = []
+
+    def flush():
+        session.execute(insert, chunk)
+        stats.rows += len(chunk)
+        stats.seconds = time.time() - started
+        del chunk[:]
+        if progress is not None:
+            progress(stats)
+
+    with open(path) as f:
+        for line_number, record in read_records(f, file_format, stats.reject):
+            try:
+                row = to_row(data_set.id, record, food_ids)
+            except (KeyError, TypeError, ValueError) as e:
+                stats.reject(line_number, e)
+                continue
+            chunk.append(row)
+            deltas.add(row)
+            if len(chunk) >= chunk_size:
+                flush()
+    if chunk:
+        flush()
+
+    deltas.apply(session.connection())
+    stats.seconds = time.time() - started
+    return stats
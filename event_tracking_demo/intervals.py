@@ -0,0 +1,37 @@
+"""
+Static index over half-open [start, end) intervals for window queries.
+
+Intervals are kept sorted by start alongside the longest interval length. Anything overlapping [window_start,
+window_end) must start in (window_start - longest, window_end), so a query bisects that range and checks ends only
+there. Cost is O(log n + intervals starting in that range), which for shift-length-bounded rosters is the overlapping
+shifts plus at most one shift length's worth of starts.
+"""
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex(object):
+    def __init__(self, intervals):
+        """
+        `intervals` is an iterable of (start, end, value).
+        """
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [interval[0] for interval in ordered]
+        self._ends = [interval[1] for interval in ordered]
+        self._values = [interval[2] for interval in ordered]
+        self._longest = max(end - start for start, end in zip(self._starts, self._ends)) if ordered else None
+
+    def __len__(self):
+        return len(self._values)
+
+    def overlapping(self, window_start=None, window_end=None):
+        """
+        Returns the values whose intervals overlap [window_start, window_end), in start order. Either bound may be None
+        for an open-ended window.
+        """
+        if not self._values:
+            return []
+        lo = 0 if window_start is None else bisect_right(self._starts, window_start - self._longest)
+        hi = len(self._starts) if window_end is None else bisect_left(self._starts, window_end)
+        if window_start is None:
+            return self._values[lo:hi]
+        return [self._values[i] for i in range(lo, hi) if self._ends[i] > window_start]
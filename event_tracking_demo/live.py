@@ -0,0 +1,304 @@
+"""
+Live order ingestion from tills.
+
+OrderIngestMiddleware wraps the Tropofy WSGI app and accepts POSTs of single or batched orders (in the
+`Order.serialise` shape) at /ingest/<data set id>/orders. Accepted orders are appended to a local spool file and
+buffered in memory. A background thread then commits them in grouped transactions once `batch_size` orders are waiting
+or the oldest has waited `max_wait` seconds. When more than `max_pending` orders are waiting, new requests get a 503
+with Retry-After so tills back off. Requests must send an 'ingest' access token for the data set (see access.py) in an
+X-Ingest-Token header.
+
+Orders in the spool survive a restart and are replayed by `OrderIngestor.start`. Delivery is at-least-once: a crash
+between a batch committing and its spool file being removed replays that batch. `on_commit`, if given, is called with
+each committed batch's rows (e.g. to push chart updates, see push.py).
+
+A batch that fails to commit with an error that may pass (the database is unreachable or locked) is retried, backing
+off, up to `max_attempts` times. Otherwise, or once they run out, its orders are written one at a time and those that
+still fail are appended to `<spool path>.dead` and dropped, so one bad order (e.g. of a food deleted since) doesn't
+hold up the rest. Orders in the dead letter file are in the spool's format and can be appended to a spool to retry.
+
+Every worker process needs an ingestor with its own spool file. `adopt_spools` hands orders left in the spools of
+workers that no longer exist to one that does.
+"""
+import json, logging, os, re, threading, time
+from sqlalchemy import exc
+from tropofy.database import DBSession
+from .cache import data_set_versions
+from .events import DimensionMap, Order, OrderAggregateDeltas
+from .ingest import to_row
+
+log = logging.getLogger(__name__)
+
+
+class IngestBackpressure(Exception):
+    pass
+
+
+class OrderSpool(object):
+    """
+    Append-only JSONL file holding every accepted order that hasn't been committed yet. While a batch is being
+    written it's moved aside to `<path>.flushing`, and it's removed once the batch has committed.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.flushing_path = path + '.flushing'
+        self.dead_letter_path = path + '.dead'
+
+    def recover(self):
+        """
+        Returns the entries left behind by a previous process and folds them back into a single spool file.
+        """
+        entries = []
+        for path in (self.flushing_path, self.path):
+            if os.path.exists(path):
+                with open(path) as f:
+                    entries.extend(json.loads(line) for line in f if line.strip())
+        self._write(self.path + '.tmp', entries)
+        os.rename(self.path + '.tmp', self.path)
+        if os.path.exists(self.flushing_path):
+            os.remove(self.flushing_path)
+        return entries
+
+    def append(self, entries):
+        self._write(self.path, entries, 'a')
+
+    def rotate(self):
+        if os.path.exists(self.path):
+            os.rename(self.path, self.flushing_path)
+
+    def committed(self):
+        if os.path.exists(self.flushing_path):
+            os.remove(self.flushing_path)
+
+    def dead_letter(self, entries):
+        self._write(self.dead_letter_path, entries, 'a')
+
+    @staticmethod
+    def _write(path, entries, mode='w'):
+        with open(path, mode) as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def adopt_spools(base_path, paths):
+    """
+    Moves orders left in `base_path` or `base_path.<n>` spools other than `paths` into the spool at `paths[0]`, e.g.
+    after the number of worker processes is reduced. Call it before any of the ingestors start.
+    """
+    directory = os.path.dirname(base_path)
+    name = re.compile(r'^%s(\.\d+)?(\.flushing)?$' % re.escape(os.path.basename(base_path)))
+    left = set()
+    for filename in os.listdir(directory or '.'):
+        match = name.match(filename)
+        if match is not None:
+            left.add(os.path.join(directory, filename[:len(filename) - len(match.group(2) or '')]))
+    for path in sorted(left - set(paths)):
+        entries = OrderSpool(path).recover()
+        if entries:
+            OrderSpool(paths[0]).append(entries)
+            log.info("Moved %d spooled orders from %s to %s", len(entries), path, paths[0])
+        os.remove(path)
+
+
+class OrderIngestor(object):
+    MAX_BACKOFF = 60  # seconds
+
+    def __init__(self, spool_path, batch_size=500, max_wait=1.0, max_pending=50000, max_attempts=10, on_commit=None):
+        self.spool = OrderSpool(spool_path)
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.on_commit = on_commit
+        self._pending = []
+        self._pending_since = None
+        self._in_flight = []
+        self._food_ids = {}
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        self._pending = self.spool.recover()
+        self._pending_since = time.time() if self._pending else None
+        self._thread = threading.Thread(target=self._run, name='order-ingestor')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Flushes whatever is buffered and stops the background thread.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+
+    def submit(self, data_set_id, records):
+        """
+        Validates and durably buffers a batch of order records. Raises ValueError if any record is invalid (nothing is
+        accepted) and IngestBackpressure if the buffer is full.
+        """
+        food_ids = self._get_food_ids(data_set_id)
+        for record in records:
+            if record.get('food') not in food_ids:
+                food_ids = self._get_food_ids(data_set_id, refresh=True)
+                break
+        for record in records:
+            to_row(data_set_id, record, food_ids)
+
+        entries = [{'data_set_id': data_set_id, 'order': record} for record in records]
+        with self._condition:
+            if len(self._pending) + len(self._in_flight) + len(entries) > self.max_pending:
+                raise IngestBackpressure()
+            self.spool.append(entries)
+            if not self._pending:
+                self._pending_since = time.time()
+            self._pending.extend(entries)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        return len(entries)
+
+    def _get_food_ids(self, data_set_id, refresh=False):
+        if refresh or data_set_id not in self._food_ids:
+            try:
+                self._food_ids[data_set_id] = DimensionMap.get(data_set_id, refresh=refresh).food_ids
+            finally:
+                DBSession.remove()
+        return self._food_ids[data_set_id]
+
+    def _run(self):
+        attempts = 0
+        while True:
+            with self._condition:
+                while not self._in_flight and not self._batch_due():
+                    if self._stopping and not self._pending:
+                        return
+                    self._condition.wait(self.max_wait)
+                if not self._in_flight:
+                    self.spool.rotate()
+                    self._in_flight, self._pending, self._pending_since = self._pending, [], None
+            try:
+                self._write(self._in_flight)
+            except Exception as e:
+                attempts += 1
+                if _is_transient(e) and attempts < self.max_attempts:
+                    log.warning("Writing %d orders failed (attempt %d of %d), retrying: %s", len(self._in_flight),
+                                attempts, self.max_attempts, e)
+                    if self._stopping:
+                        return  # they're left in the spool for the next start
+                    time.sleep(min(self.max_wait * 2 ** (attempts - 1), self.MAX_BACKOFF))
+                    continue
+                log.exception("Writing %d orders failed, writing them one at a time", len(self._in_flight))
+                self._write_each(self._in_flight)
+            attempts = 0
+            self.spool.committed()
+            with self._condition:
+                self._in_flight = []
+
+    def _batch_due(self):
+        if not self._pending:
+            return False
+        return (self._stopping or len(self._pending) >= self.batch_size or
+                time.time() - self._pending_since >= self.max_wait)
+
+    def _write_each(self, entries):
+        """
+        Writes the orders of a batch that failed one at a time, moving any that fail again to the dead letter file.
+        """
+        failed = []
+        for entry in entries:
+            try:
+                self._write([entry])
+            except Exception as e:
+                log.warning("Writing spooled order %r failed: %s", entry, e)
+                failed.append(entry)
+        if failed:
+            self.spool.dead_letter(failed)
+            log.error("Moved %d orders that couldn't be written to %s", len(failed), self.spool.dead_letter_path)
+
+    def _write(self, entries):
+        session = DBSession()
+        try:
+            rows = []
+            deltas = OrderAggregateDeltas()
+            for entry in entries:
+                data_set_id = entry['data_set_id']
+                try:
+                    row = to_row(data_set_id, entry['order'], self._get_food_ids(data_set_id))
+                except (KeyError, TypeError, ValueError) as e:
+                    log.warning("Dropping spooled order %r: %s", entry, e)
+                    continue
+                rows.append(row)
+                deltas.add(row)
+            if rows:
+                session.execute(Order.__table__.insert(), rows)
+                deltas.apply(session.connection())
+            session.commit()
+            data_set_versions.bump(*deltas.data_set_ids())
+        except Exception:
+            session.rollback()
+            raise
+        else:
+            if self.on_commit is not None and rows:
+                try:
+                    self.on_commit(rows)
+                except Exception:  # The batch is committed, so it mustn't be retried
+                    log.exception("on_commit failed for %d orders", len(rows))
+        finally:
+            DBSession.remove()
+
+
+def _is_transient(error):
+    """
+    Whether a failed write might succeed if it's tried again: the database was unreachable, locked or out of
+    connections, rather than refusing the orders.
+    """
+    return (isinstance(error, (exc.OperationalError, exc.TimeoutError)) or
+            getattr(error, 'connection_invalidated', False))
+
+
+class OrderIngestMiddleware(object):
+    """
+    WSGI middleware serving the ingestion endpoint in front of `app`. Requests must send an 'ingest' token for the data
+    set, signed by `signer` (an access.TokenSigner), in an X-Ingest-Token header.
+    """
+    PATH = re.compile(r'^/ingest/(\d+)/orders/?$')
+
+    def __init__(self, app, ingestor, signer):
+        if signer is None:
+            raise ValueError("The ingest endpoint needs a TokenSigner to check access tokens with")
+        self.app = app
+        self.ingestor = ingestor
+        self.signer = signer
+
+    def __call__(self, environ, start_response):
+        match = self.PATH.match(environ.get('PATH_INFO', ''))
+        if match is None:
+            return self.app(environ, start_response)
+        if environ['REQUEST_METHOD'] != 'POST':
+            return self._respond(start_response, '405 Method Not Allowed', {'error': 'POST orders here'})
+        data_set_id = int(match.group(1))
+        if not self.signer.check('ingest', data_set_id, environ.get('HTTP_X_INGEST_TOKEN')):
+            return self._respond(start_response, '403 Forbidden', {'error': 'bad ingest token'})
+
+        try:
+            body = json.loads(environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0)).decode('utf-8'))
+            if isinstance(body, dict):
+                body = body['orders'] if 'orders' in body else [body]
+            accepted = self.ingestor.submit(data_set_id, body)
+        except IngestBackpressure:
+            return self._respond(start_response, '503 Service Unavailable', {'error': 'ingest buffer full'},
+                                 [('Retry-After', str(int(self.ingestor.max_wait) + 1))])
+        except (KeyError, TypeError, ValueError) as e:
+            return self._respond(start_response, '400 Bad Request', {'error': str(e)})
+        return self._respond(start_response, '202 Accepted', {'accepted': accepted})
+
+    @staticmethod
+    def _respond(start_response, status, body, headers=()):
+        payload = json.dumps(body).encode('utf-8')
+        start_response(status, [('Content-Type', 'application/json'),
+                                ('Content-Length', str(len(payload)))] + list(headers))
+        return [payload]
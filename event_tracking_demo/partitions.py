@@ -0,0 +1,189 @@
+"""
+Partitioning of the order tables by event day.
+
+Every order carries its `event_day`, the date of its timestamp. On PostgreSQL, Order and ArchivedOrder are range
+partitioned on it (`partition_table` runs as they're created, and migrations/partition_orders.py converts existing
+tables), with a partition per event day, e.g. order_p20170102, and a default partition for every other day. Queries
+that compare event_day with constants are pruned to the matching partitions when they're planned, which is why days
+are rendered inline with `day_literal` rather than bound. SQLite has no partitions, so instead each live event's days
+get a partial index, which queries filtering on exactly those days can use.
+
+`sync_event_days` adds the partitions or partial indexes the events need, and drops the partial indexes of archived
+and deleted events. It's run on its own connection after a commit that changed an Event, not during the flush: the
+statements are DDL, which pysqlite commits whatever transaction is open before running.
+
+Archiving an event moves its orders from Order to ArchivedOrder (see `Event.archive`). On PostgreSQL, a day whose
+partition holds only that data set's orders is moved by detaching the partition from one table and attaching it to the
+other, without copying a row. Otherwise, and on SQLite, the rows are copied and deleted, and the day filter keeps that
+to the event's partitions or partial index.
+"""
+import datetime
+from sqlalchemy import inspect
+from sqlalchemy.schema import AddConstraint
+from sqlalchemy.sql import and_, literal_column, select
+
+DEFAULT_PARTITION = '%s_default'
+DAY_INDEX_PREFIX = 'ix_%s_days_'
+
+
+def day_literal(day):
+    return literal_column("'%s'" % day.isoformat())
+
+
+def day_range(column, first_day, last_day):
+    return and_(column >= day_literal(first_day), column <= day_literal(last_day))
+
+
+def partition_name(table_name, day):
+    return '%s_p%s' % (table_name, day.strftime('%Y%m%d'))
+
+
+def is_partitioned(connection, table_name):
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)",
+                              (_quote(connection, table_name),)).scalar() or False
+
+
+def day_index_name(table_name, first_day, last_day):
+    return DAY_INDEX_PREFIX % table_name + '%s_%s' % (first_day.strftime('%Y%m%d'), last_day.strftime('%Y%m%d'))
+
+
+def sync_event_days(connection, tables, events):
+    """
+    Gets `tables` (Order's and ArchivedOrder's) ready for the days of `events`, as (first day, last day, archived)
+    rows for every event in the database: on PostgreSQL, adds their missing day partitions, and on SQLite makes the
+    partial indexes on Order match the days of the events that aren't archived.
+    """
+    if connection.dialect.name == 'sqlite':
+        name = tables[0].name
+        wanted = dict((day_index_name(name, first_day, last_day), (first_day, last_day))
+                      for first_day, last_day, archived in events if not archived)
+        prefix = DAY_INDEX_PREFIX % name
+        existing = set(index for index, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (name,))
+            if index.startswith(prefix))
+        for index in sorted(existing - set(wanted)):
+            connection.execute('DROP INDEX %s' % _quote(connection, index))
+        for index in sorted(set(wanted) - existing):
+            first_day, last_day = wanted[index]
+            connection.execute("CREATE INDEX %s ON %s (data_set_id, timestamp, id) "
+                               "WHERE event_day >= '%s' AND event_day <= '%s'" % (
+                                   _quote(connection, index), _quote(connection, name), first_day.isoformat(),
+                                   last_day.isoformat()))
+        return
+    days = set()
+    for first_day, last_day, _ in events:
+        days.update(first_day + datetime.timedelta(days=offset) for offset in xrange((last_day - first_day).days + 1))
+    for table in tables:
+        if is_partitioned(connection, table.name):
+            for day in sorted(days):
+                add_day_partition(connection, table.name, day)
+
+
+def partition_table(connection, table):
+    """
+    Makes a PostgreSQL table again as one partitioned by range of event_day, with a default partition, keeping its
+    rows, ids and id sequence. The primary key becomes (id, event_day), as a partitioned table's must include the
+    partition key.
+    """
+    name, old = table.name, table.name + '_unpartitioned'
+    inspector = inspect(connection)
+    connection.execute('ALTER TABLE %s RENAME TO %s' % (_quote(connection, name), _quote(connection, old)))
+    for index in inspector.get_indexes(old):
+        connection.execute('DROP INDEX %s' % _quote(connection, index['name']))
+    primary_key = inspector.get_pk_constraint(old)['name']
+    if primary_key:
+        connection.execute('ALTER TABLE %s DROP CONSTRAINT %s' % (_quote(connection, old),
+                                                                  _quote(connection, primary_key)))
+    connection.execute('CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                       'PARTITION BY RANGE (event_day)' % (_quote(connection, name), _quote(connection, old)))
+    connection.execute('ALTER TABLE %s ADD PRIMARY KEY (id, event_day)' % _quote(connection, name))
+    connection.execute('CREATE TABLE %s PARTITION OF %s DEFAULT' % (_quote(connection, DEFAULT_PARTITION % name),
+                                                                    _quote(connection, name)))
+    connection.execute('INSERT INTO %s SELECT * FROM %s' % (_quote(connection, name), _quote(connection, old)))
+    sequence = connection.execute("SELECT pg_get_serial_sequence(%s, 'id')", (_quote(connection, old),)).scalar()
+    if sequence:
+        connection.execute('ALTER SEQUENCE %s OWNED BY %s.id' % (sequence, _quote(connection, name)))
+    connection.execute('DROP TABLE %s' % _quote(connection, old))
+    for index in table.indexes:
+        index.create(connection)
+    for constraint in table.foreign_key_constraints:
+        connection.execute(AddConstraint(constraint))
+
+
+def add_day_partition(connection, table_name, day):
+    """
+    Adds a partition for `day` to a partitioned table, moving any of its rows out of the default partition. Does
+    nothing if there already is one.
+    """
+    name = partition_name(table_name, day)
+    if _exists(connection, name):
+        return
+    default = _quote(connection, DEFAULT_PARTITION % table_name)
+    condition = "event_day = '%s'" % day.isoformat()
+    connection.execute('CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS INCLUDING CONSTRAINTS)' % (
+        name, _quote(connection, table_name)))
+    connection.execute('INSERT INTO %s SELECT * FROM %s WHERE %s' % (name, default, condition))
+    connection.execute('DELETE FROM %s WHERE %s' % (default, condition))
+    _attach(connection, table_name, name, day)
+
+
+def move_event_days(connection, source, target, data_set_id, first_day, last_day):
+    """
+    Moves a data set's rows from `first_day` to `last_day` out of the `source` table into `target` (Order and
+    ArchivedOrder, either way round). Returns how many rows were moved.
+    """
+    moved = 0
+    days = [first_day + datetime.timedelta(days=offset) for offset in xrange((last_day - first_day).days + 1)]
+    if is_partitioned(connection, source.name) and is_partitioned(connection, target.name):
+        copied = []
+        for day in days:
+            count = _swap_day_partition(connection, source.name, target.name, data_set_id, day)
+            if count is None:
+                copied.append(day)
+            else:
+                moved += count
+        days = copied
+    names = [column.name for column in source.columns]
+    for day in days:
+        condition = and_(source.c.data_set_id == data_set_id, day_range(source.c.event_day, day, day))
+        moved += connection.execute(target.insert().from_select(
+            names, select([source.c[name] for name in names]).where(condition))).rowcount
+        connection.execute(source.delete().where(condition))
+    return moved
+
+
+def _swap_day_partition(connection, source_name, target_name, data_set_id, day):
+    """
+    Moves the source table's partition for `day` to the target table, if only `data_set_id` has rows in it and the
+    target's is empty, and gives the source a new empty one. Returns how many rows it held, or None if it couldn't be
+    moved.
+    """
+    name, replaced = partition_name(source_name, day), partition_name(target_name, day)
+    if not _exists(connection, name) or connection.execute(
+            'SELECT EXISTS (SELECT 1 FROM %s WHERE data_set_id <> %d)' % (name, int(data_set_id))).scalar():
+        return None
+    if _exists(connection, replaced):
+        if connection.execute('SELECT EXISTS (SELECT 1 FROM %s)' % replaced).scalar():
+            return None
+        connection.execute('DROP TABLE %s' % replaced)
+    rows = connection.execute('SELECT count(*) FROM %s' % name).scalar()
+    connection.execute('ALTER TABLE %s DETACH PARTITION %s' % (_quote(connection, source_name), name))
+    connection.execute('ALTER TABLE %s RENAME TO %s' % (name, replaced))
+    _attach(connection, target_name, replaced, day)
+    add_day_partition(connection, source_name, day)
+    return rows
+
+
+def _attach(connection, table_name, name, day):
+    connection.execute("ALTER TABLE %s ATTACH PARTITION %s FOR VALUES FROM ('%s') TO ('%s')" % (
+        _quote(connection, table_name), name, day.isoformat(), (day + datetime.timedelta(days=1)).isoformat()))
+
+
+def _exists(connection, name):
+    return connection.execute("SELECT to_regclass(%s)", (name,)).scalar() is not None
+
+
+def _quote(connection, name):
+    return connection.dialect.identifier_preparer.quote(name)
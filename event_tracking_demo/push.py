@@ -0,0 +1,249 @@
+"""
+Live chart updates pushed to open dashboards with server-sent events.
+
+    GET /push/<data set id>/token    {"token": ..., "expires_in": seconds}, a 'push' access token for the stream,
+                                     for a request with an 'api' token in an X-Api-Token header (see access.py).
+    GET /push/<data set id>/charts?token=<push token>
+                                     a text/event-stream. The first event is a `snapshot` of the FoodPopularityChart
+                                     and FoodPopByHourChart rows, then each `delta` event adds to them, e.g.
+                                     {"FoodPopularityChart": {"Banh Mi": 3}, "FoodPopByHourChart": {"14:00": 1}}.
+                                     A `queues` event after each batch carries QueueTable's rows, and a
+                                     `stock_alert` event a food running low.
+
+Deltas are worked out once per committed batch of live orders (`ChartPushHub.publish_orders` is called from the
+OrderIngestor's `on_commit`), straight from the batch rather than with a query. Each event is encoded once and the
+same bytes are queued for every viewer, and snapshots come from the widget cache, so the database load doesn't grow
+with the number of open dashboards. A viewer that falls `max_queued` events behind is sent a `reset` event and a fresh
+snapshot instead. Deltas from commits the snapshot already includes (by data set version) are skipped. Orders written
+any other way show up at the next snapshot, i.e. when the dashboard reconnects.
+
+Browsers can't set headers on an EventSource, so the stream's token is passed as a query parameter, where it ends up
+in access logs. That's why it's a separate token that only lets its holder follow that data set's charts, and only
+for a few minutes (it's checked when the stream is opened): a dashboard fetches a fresh one each time it connects.
+Every open stream holds a server thread, so at most `max_subscribers` are allowed at once.
+"""
+import collections, json, re, threading
+from tropofy.database import DBSession
+from .access import LIFETIMES
+from .cache import data_set_versions
+from .events import DimensionMap, FoodPopByHourChart, FoodPopularityChart, QueueTable
+
+try:
+    from urllib.parse import parse_qs
+except ImportError:
+    from urlparse import parse_qs
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class _Subscriber(object):
+    def __init__(self):
+        self.events = collections.deque()  # (data set version, encoded event)
+        self.overflowed = False
+
+
+class ChartPushHub(object):
+    def __init__(self, max_queued=100, max_subscribers=200, heartbeat=15):
+        self.max_queued = max_queued
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self._subscribers = {}  # data set id -> set of _Subscriber
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def subscriber_count(self):
+        with self._condition:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def close(self):
+        """
+        Ends every open stream and turns new viewers away, e.g. before the server shuts down.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def publish(self, data_set_id, event, payload):
+        message = (data_set_versions.get(data_set_id), _encode(event, payload))
+        with self._condition:
+            for subscriber in self._subscribers.get(data_set_id, ()):
+                if len(subscriber.events) >= self.max_queued:
+                    subscriber.events.clear()
+                    subscriber.overflowed = True
+                elif not subscriber.overflowed:
+                    subscriber.events.append(message)
+            self._condition.notify_all()
+
+    def publish_orders(self, rows):
+        """
+        Publishes chart deltas for committed `Order.__table__` rows, one event per data set that has viewers. Call it
+        after the data set versions have been bumped for the commit.
+        """
+        with self._condition:
+            watched = set(self._subscribers)
+        shown = dict((data_set_id, FoodPopByHourChart().get_range(_PushDataSet(data_set_id)))
+                     for data_set_id in watched.intersection(row['data_set_id'] for row in rows))
+        deltas = {}
+        for row in rows:
+            if row['data_set_id'] not in shown:
+                continue
+            start_date, end_date, first_hour, last_hour = shown[row['data_set_id']]
+            day = row['timestamp'].date()
+            if (start_date is not None and day < start_date) or (end_date is not None and day > end_date):
+                continue  # not on the days the charts show
+            foods, hours = deltas.setdefault(row['data_set_id'], ({}, {}))
+            foods[row['food_id']] = foods.get(row['food_id'], 0) + row['quantity']
+            hour = row['timestamp'].hour
+            if first_hour <= hour <= last_hour:
+                label = '%02d:00' % hour
+                hours[label] = hours.get(label, 0) + 1
+        for data_set_id, (foods, hours) in deltas.items():
+            titles = DimensionMap.covering(data_set_id, food_ids=foods).food_titles
+            self.publish(data_set_id, 'delta', {
+                FoodPopularityChart.__name__: dict((titles[food_id], quantity) for food_id, quantity in foods.items()),
+                FoodPopByHourChart.__name__: hours,
+            })
+
+    def publish_queues(self, rows):
+        """
+        Publishes the current queue estimates of each data set with viewers that committed `Order.__table__` rows are
+        for. Call it after the queue monitor has recorded them.
+        """
+        with self._condition:
+            watched = set(self._subscribers)
+        for data_set_id in watched.intersection(row['data_set_id'] for row in rows):
+            self.publish(data_set_id, 'queues', QueueTable.rows(_PushDataSet(data_set_id)))
+
+    def stream(self, data_set_id, snapshot):
+        """
+        Yields the event stream for one viewer: `snapshot()`'s payload, then deltas as they're published, with a
+        comment line every `heartbeat` seconds so a closed connection is noticed.
+        """
+        subscriber = _Subscriber()
+        with self._condition:
+            if self._closed or \
+                    sum(len(subscribers) for subscribers in self._subscribers.values()) >= self.max_subscribers:
+                raise TooManySubscribers()
+            self._subscribers.setdefault(data_set_id, set()).add(subscriber)
+        try:
+            message, version = self._snapshot(data_set_id, snapshot)
+            yield message
+            while True:
+                with self._condition:
+                    if not subscriber.events and not subscriber.overflowed and not self._closed:
+                        self._condition.wait(self.heartbeat)
+                    if self._closed:
+                        return
+                    events, overflowed = list(subscriber.events), subscriber.overflowed
+                    subscriber.events.clear()
+                    subscriber.overflowed = False
+                events = [message for event_version, message in events if event_version > version]
+                if overflowed:
+                    message, version = self._snapshot(data_set_id, snapshot)
+                    yield _encode('reset', None) + message
+                elif events:
+                    yield b''.join(events)
+                else:
+                    yield b': keepalive\n\n'
+        finally:
+            with self._condition:
+                subscribers = self._subscribers.get(data_set_id, set())
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    self._subscribers.pop(data_set_id, None)
+
+
+    @staticmethod
+    def _snapshot(data_set_id, snapshot):
+        message = _encode('snapshot', snapshot())
+        return message, data_set_versions.get(data_set_id)
+
+
+def _encode(event, payload):
+    return ('event: %s\ndata: %s\n\n' % (event, json.dumps(payload))).encode('utf-8')
+
+
+class _PushDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class _PushAppSession(object):
+    def __init__(self, data_set):
+        self.data_set = data_set
+
+
+def chart_snapshot(data_set_id):
+    """
+    The rows of the pushed charts, as the widgets render them (and from the same cache).
+    """
+    app_session = _PushAppSession(_PushDataSet(data_set_id))
+    try:
+        return {
+            FoodPopularityChart.__name__: dict((row['food_name'], row['quantity']) for row in
+                                               FoodPopularityChart().get_table_data(app_session)),
+            FoodPopByHourChart.__name__: dict((row['hour'], row['orders']) for row in
+                                              FoodPopByHourChart().get_table_data(app_session)),
+        }
+    finally:
+        DBSession.remove()
+
+
+class ChartPushMiddleware(object):
+    """
+    WSGI middleware serving the event stream, and the tokens for it, in front of `app`, checking tokens with `signer`
+    (an access.TokenSigner).
+    """
+    PATH = re.compile(r'^/push/(\d+)/(charts|token)/?$')
+
+    def __init__(self, app, hub, signer):
+        if signer is None:
+            raise ValueError("Chart push needs a TokenSigner to check access tokens with")
+        self.app = app
+        self.hub = hub
+        self.signer = signer
+
+    def __call__(self, environ, start_response):
+        match = self.PATH.match(environ.get('PATH_INFO', ''))
+        if match is None:
+            return self.app(environ, start_response)
+        if environ['REQUEST_METHOD'] != 'GET':
+            return self._respond(start_response, '405 Method Not Allowed', {'error': 'use GET'})
+        data_set_id = int(match.group(1))
+        if match.group(2) == 'token':
+            if not self.signer.check('api', data_set_id, environ.get('HTTP_X_API_TOKEN')):
+                return self._respond(start_response, '403 Forbidden', {'error': 'bad API token'})
+            return self._respond(start_response, '200 OK', {'token': self.signer.issue('push', data_set_id),
+                                                            'expires_in': LIFETIMES['push']},
+                                 [('Cache-Control', 'no-store')])
+        params = parse_qs(environ.get('QUERY_STRING', ''))
+        if not self.signer.check('push', data_set_id, params.get('token', [None])[-1]):
+            return self._respond(start_response, '403 Forbidden', {'error': 'bad push token'})
+
+        body = self.hub.stream(data_set_id, lambda: chart_snapshot(data_set_id))
+        try:
+            first = next(body)  # subscribes, so a full hub is reported before the response starts
+        except TooManySubscribers:
+            return self._respond(start_response, '503 Service Unavailable', {'error': 'too many viewers'},
+                                 [('Retry-After', str(self.hub.heartbeat))])
+        start_response('200 OK', [('Content-Type', 'text/event-stream'), ('Cache-Control', 'no-cache'),
+                                  ('X-Accel-Buffering', 'no')])
+        return _chain(first, body)
+
+    @staticmethod
+    def _respond(start_response, status, body, headers=()):
+        payload = json.dumps(body).encode('utf-8')
+        start_response(status, [('Content-Type', 'application/json'),
+                                ('Content-Length', str(len(payload)))] + list(headers))
+        return [payload]
+
+
+def _chain(first, rest):
+    try:
+        yield first
+        for data in rest:
+            yield data
+    finally:
+        rest.close()
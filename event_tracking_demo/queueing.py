@@ -0,0 +1,54 @@
+"""
+Queue length and wait time at a station from its order arrival rate and the staff serving it.
+
+A station is modelled as an M/M/c queue: orders arrive at random at `arrivals` per minute and each of `staff` servers
+handles `service_rate` orders per minute. The chance an order has to wait is Erlang's C formula, worked out from the
+Erlang B recurrence in O(staff) steps, and the expected queue length and wait follow from it (the wait by Little's
+law). A station with no staff or more arrivals than it can serve has no steady state, and the queue just grows.
+"""
+
+
+def erlang_c(arrivals, service_rate, staff):
+    """
+    The probability an arriving order waits, for an M/M/c queue that isn't overloaded.
+    """
+    load = float(arrivals) / service_rate
+    blocking = 1.0
+    for servers in xrange(1, staff + 1):
+        blocking = load * blocking / (servers + load * blocking)
+    utilisation = load / staff
+    return blocking / (1 - utilisation * (1 - blocking))
+
+
+class QueueEstimate(object):
+    """
+    `queue_length` (orders waiting, not being served) and `wait_minutes` are None when the queue has no steady state.
+    """
+    def __init__(self, arrivals, staff, utilisation, queue_length, wait_minutes):
+        self.arrivals = arrivals
+        self.staff = staff
+        self.utilisation = utilisation
+        self.queue_length = queue_length
+        self.wait_minutes = wait_minutes
+
+    @property
+    def overloaded(self):
+        return self.queue_length is None
+
+
+def estimate_queue(arrivals, service_rate, staff):
+    """
+    Returns a QueueEstimate for `arrivals` orders per minute at a station with `staff` each serving `service_rate`
+    orders per minute.
+    """
+    if not arrivals:
+        return QueueEstimate(0.0, staff, 0.0, 0.0, 0.0)
+    if not staff:
+        return QueueEstimate(arrivals, staff, None, None, None)
+    capacity = float(service_rate) * staff
+    utilisation = arrivals / capacity
+    if utilisation >= 1:
+        return QueueEstimate(arrivals, staff, utilisation, None, None)
+    waiting = erlang_c(arrivals, service_rate, staff)
+    wait_minutes = waiting / (capacity - arrivals)
+    return QueueEstimate(arrivals, staff, utilisation, arrivals * wait_minutes, wait_minutes)
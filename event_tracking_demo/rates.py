@@ -0,0 +1,104 @@
+"""
+Event counts over a sliding window of recent minutes, kept in fixed-size circular arrays.
+
+A RateWindow holds one bucket per minute of its window and a running total of them. As time moves forward, the
+buckets that fall out of the window are cleared and subtracted from the total, each at most once, so adding events
+and reading the rate are O(1) amortised however many events there are. Time is the events' own (order timestamps),
+not the wall clock, so replayed or historical orders give the rates they had at the time.
+"""
+import datetime, threading
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def minute_of(timestamp):
+    """
+    Whole minutes since EPOCH.
+    """
+    delta = timestamp - EPOCH
+    return delta.days * 1440 + delta.seconds // 60
+
+
+def minute_start(minute):
+    return EPOCH + datetime.timedelta(minutes=minute)
+
+
+class RateWindow(object):
+    def __init__(self, minutes):
+        self.minutes = minutes
+        self.first = None  # the earliest and latest minutes seen
+        self.latest = None
+        self._counts = [0] * minutes
+        self._total = 0
+
+    def add(self, minute, count=1):
+        """
+        Adds `count` events at `minute`. Events from before the window are ignored.
+        """
+        self.advance(minute)
+        if minute <= self.latest - self.minutes:
+            return
+        self._counts[minute % self.minutes] += count
+        self._total += count
+        if self.first is None or minute < self.first:
+            self.first = minute
+
+    def advance(self, minute):
+        """
+        Moves the window forward to end at `minute`, if it's later than the latest minute seen.
+        """
+        if self.latest is None:
+            self.latest = minute
+            return
+        if minute <= self.latest:
+            return
+        for expired in xrange(max(self.latest + 1, minute - self.minutes + 1), minute + 1):
+            bucket = expired % self.minutes
+            self._total -= self._counts[bucket]
+            self._counts[bucket] = 0
+        self.latest = minute
+
+    def total(self):
+        return self._total
+
+    def rate(self):
+        """
+        Events per minute over the window, or over the minutes since the first event if that's shorter.
+        """
+        if self.first is None:
+            return 0.0
+        return self._total / float(min(self.minutes, self.latest - self.first + 1))
+
+
+class RateWindows(object):
+    """
+    A thread safe RateWindow per key, created on first use.
+    """
+    def __init__(self, minutes):
+        self.minutes = minutes
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, minute, count=1):
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = RateWindow(self.minutes)
+            window.add(minute, count)
+
+    def rate(self, key, minute=None):
+        """
+        Events per minute for `key` over the window ending at `minute` (the latest minute seen by default), and the
+        minute the window ends at (None if nothing was seen).
+        """
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                return 0.0, None
+            if minute is not None:
+                window.advance(minute)
+            return window.rate(), window.latest
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
@@ -0,0 +1,122 @@
+"""
+Concurrent computation of the widget payloads in a step.
+
+Tropofy asks a step's widgets for their data one after another. When one of the step's cached widgets (see
+`cached_widget_data`) misses the cache, StepRenderer starts computing every other cached widget in the step that
+isn't cached yet, on a thread pool, while it computes the requested one. The results land in the widget cache, and a
+widget that's still being computed when Tropofy gets to it is waited for rather than computed again. Step latency
+becomes roughly the slowest widget's rather than the sum of them all.
+
+Steps opt in with `concurrent_step(widgets)` in `get_gui`. Workers render against a stand-in app session that only
+carries the data set id, so widgets rendered this way must only use `app_session.data_set.id`. Workers use
+their own scoped DBSession, removed after every widget.
+"""
+import logging, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from tropofy.database import DBSession
+from . import cache
+
+log = logging.getLogger(__name__)
+
+DATA_METHODS = ('get_table_data', 'get_data')
+
+
+def concurrent_step(widgets):
+    """
+    Marks `widgets` as one step whose cached widgets are computed together. Returns the list for Step(widgets=...).
+    """
+    for widget in widgets:
+        widget._step_widgets = widgets
+    return widgets
+
+
+class _WorkerDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class _WorkerAppSession(object):
+    def __init__(self, data_set_id):
+        self.data_set = _WorkerDataSet(data_set_id)
+
+
+def _render(widget, method_name, data_set_id):
+    """
+    Computes one payload without the cache. Returns (payload, seconds).
+    """
+    started = time.time()
+    try:
+        return getattr(type(widget), method_name).uncached(widget, _WorkerAppSession(data_set_id)), \
+            time.time() - started
+    finally:
+        DBSession.remove()
+
+
+class StepRenderer(object):
+    def __init__(self, threads=4):
+        self.threads = ThreadPoolExecutor(threads)
+        self.timings = {}  # (widget class name, method name, widget configuration) -> seconds its last payload took
+        self._in_flight = {}  # widget cache key -> Future of (payload, seconds)
+        self._lock = threading.Lock()
+
+    def render(self, widget, method_name, app_session):
+        """
+        Returns `widget`'s payload, computing it in this thread and starting on its step's other uncached widgets.
+        """
+        data_set_id = app_session.data_set.id
+        own = None
+        started_others = []
+        with self._lock:
+            for other in getattr(widget, '_step_widgets', [widget]):
+                other_method = method_name if other is widget else _data_method(other)
+                if other_method is None:
+                    continue
+                key = cache.widget_cache_key(other, other_method, data_set_id)
+                if key in self._in_flight or (other is not widget and cache.widget_cache.get(key) is not None):
+                    continue
+                if other is widget:
+                    own = self._in_flight[key] = Future()
+                else:
+                    future = self._in_flight[key] = self.threads.submit(_render, other, other_method, data_set_id)
+                    started_others.append((key, other, future))
+            key = cache.widget_cache_key(widget, method_name, data_set_id)
+            waiting = self._in_flight[key] if own is None else None
+        for other_key, other, future in started_others:
+            # outside the lock, as the callback runs straight away (and takes the lock) if the future is already done
+            future.add_done_callback(self._finisher(other_key, other))
+        if waiting is not None:
+            return waiting.result()[0]
+        try:
+            started = time.time()
+            result = getattr(type(widget), method_name).uncached(widget, app_session), time.time() - started
+        except Exception as e:
+            own.set_exception(e)
+            self._finish(key, widget, own)
+            raise
+        own.set_result(result)
+        self._finish(key, widget, own)
+        return result[0]
+
+    def _finisher(self, key, widget):
+        return lambda future: self._finish(key, widget, future)
+
+    def _finish(self, key, widget, future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if future.exception() is not None:
+            log.warning("Rendering %s failed: %s", type(widget).__name__, future.exception())
+            return
+        payload, seconds = future.result()
+        cache.widget_cache.put(key, payload)
+        self.timings[key[:3]] = seconds
+        log.debug("Rendered %s in %.3fs", type(widget).__name__, seconds)
+
+    def shutdown(self):
+        self.threads.shutdown()
+
+
+def _data_method(widget):
+    for name in DATA_METHODS:
+        if hasattr(getattr(type(widget), name, None), 'uncached'):
+            return name
+    return None
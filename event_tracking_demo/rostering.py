@@ -0,0 +1,70 @@
+"""
+Greedy staff rostering over interval coverage.
+
+Demand is an integer array of staff required per (station, day, slot). Each staff member works at most one contiguous
+shift per day, of between `min_slots` and `max_slots` slots. Each day, the solver repeatedly assigns the next free
+staff member to whichever (station, start, length) shift covers the most still-understaffed slots, preferring the
+shortest such shift, until staff run out or no shift helps. Shift gains for a station are evaluated for every
+start and length at once from a prefix sum, so a pick costs O(stations) and an update O(slots x lengths).
+"""
+import numpy as np
+
+
+def required_staff(orders_per_slot, orders_per_staff_slot):
+    """
+    Staff needed to serve an array of expected orders per slot.
+    """
+    return np.ceil(np.asarray(orders_per_slot, dtype=float) / orders_per_staff_slot).astype(np.int32)
+
+
+class ShiftSearch(object):
+    def __init__(self, slots, min_slots, max_slots):
+        if not 0 < min_slots <= max_slots:
+            raise ValueError("Shift length bounds must satisfy 0 < min_slots <= max_slots")
+        self.lengths = np.arange(min_slots, max_slots + 1)
+        self.starts = np.arange(slots)
+        ends = self.starts[:, None] + self.lengths[None, :]
+        self.invalid = ends > slots
+        self.ends = np.minimum(ends, slots)
+        self.tie_break = max_slots + 1
+
+    def best(self, shortage):
+        """
+        Returns (gain, start, length) of the shift covering the most slots with shortage > 0 in a 1-D array.
+        """
+        covered = np.concatenate(([0], np.cumsum(shortage > 0)))
+        gains = covered[self.ends] - covered[self.starts[:, None]]
+        scores = gains * self.tie_break - self.lengths[None, :]
+        scores[self.invalid] = -self.tie_break
+        start, length = np.unravel_index(np.argmax(scores), scores.shape)
+        return int(gains[start, length]), int(start), int(self.lengths[length])
+
+
+def solve_roster(required, staff_count, min_slots, max_slots):
+    """
+    Returns (shifts, shortage) for a (stations, days, slots) array of staff required. `shifts` is a list of
+    (staff index, station index, day, start slot, length in slots) and `shortage` is the staff still missing per slot
+    (negative where overstaffed).
+    """
+    shortage = np.array(required, dtype=np.int32)
+    stations, days, slots = shortage.shape
+    search = ShiftSearch(slots, min_slots, max_slots)
+    shifts = []
+    for day in range(days):
+        best = [search.best(shortage[station, day]) for station in range(stations)]
+        for staff in range(staff_count):
+            station = max(range(stations), key=lambda s: best[s][0]) if stations else None
+            if station is None or best[station][0] == 0:
+                break
+            _, start, length = best[station]
+            shortage[station, day, start:start + length] -= 1
+            shifts.append((staff, station, day, start, length))
+            best[station] = search.best(shortage[station, day])
+    return shifts, shortage
+
+
+def understaffed_slots(shortage):
+    """
+    Total staff-slots of unmet demand.
+    """
+    return int(np.clip(shortage, 0, None).sum())
@@ -0,0 +1,217 @@
+"""
+Production serving for run.py: several worker processes answering on one port, each with a fixed pool of request
+threads and its own database connection pool.
+
+The parent process binds the listening socket and forks `workers` children that all accept from it, restarting any
+that die. SIGTERM or SIGINT to the parent is passed on to the workers, which stop accepting, let in-flight requests
+finish for up to `shutdown_timeout` seconds, run their `stop` callback (e.g. flushing the order ingestor) and exit.
+Where fork isn't available (Windows) a single worker runs in the parent.
+
+`create_db_engine` configures the engine for many concurrent writers: a QueuePool of `pool_size` connections per
+worker on PostgreSQL, and WAL journalling with a busy timeout on SQLite so that readers don't block the writer and
+writers wait for each other rather than failing with "database is locked".
+"""
+import logging, os, signal, socket, sys, threading, time
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+from sqlalchemy import create_engine, event
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+log = logging.getLogger(__name__)
+
+
+def create_db_engine(url, pool_size=10, max_overflow=5, pool_timeout=30, busy_timeout=30):
+    if url.startswith('sqlite'):
+        engine = create_engine(url, connect_args={'timeout': busy_timeout})
+
+        @event.listens_for(engine, 'connect')
+        def use_wal(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')  # durable at each checkpoint, which is safe with WAL
+            cursor.close()
+        return engine
+    return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout,
+                         pool_pre_ping=True, pool_recycle=3600)
+
+
+def transactional_ddl(engine):
+    """
+    Makes schema changes on SQLite part of the transaction they're made in, as they are on PostgreSQL, so that a
+    migration that fails part way leaves nothing changed. pysqlite otherwise commits the open transaction before DDL.
+    Returns the engine, which mustn't have connected yet.
+    """
+    if engine.dialect.name != 'sqlite':
+        return engine
+
+    @event.listens_for(engine, 'connect')
+    def no_implicit_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def begin(connection):
+        connection.execute('BEGIN')
+    return engine
+
+
+class _RequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        log.debug("%s %s", self.address_string(), format % args)
+
+
+class PooledWSGIServer(WSGIServer):
+    """
+    wsgiref's server on an already listening socket, handing each connection to one of `threads` request threads.
+    Connections wait in the listen backlog while every thread is busy.
+    """
+    def __init__(self, listener, app, threads):
+        WSGIServer.__init__(self, listener.getsockname()[:2], _RequestHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listener
+        host, self.server_port = listener.getsockname()[:2]
+        self.server_name = socket.getfqdn(host)
+        self.setup_environ()
+        self.set_app(app)
+        self._requests = queue.Queue(threads)
+        self._active = 0
+        self._idle = threading.Condition()
+        for number in range(threads):
+            thread = threading.Thread(target=self._handle, name='request-%d' % number)
+            thread.daemon = True
+            thread.start()
+
+    def process_request(self, request, client_address):
+        with self._idle:
+            self._active += 1
+        self._requests.put((request, client_address))
+
+    def _handle(self):
+        while True:
+            request, client_address = self._requests.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._idle:
+                    self._active -= 1
+                    self._idle.notify_all()
+
+    def drain(self, timeout):
+        """
+        Waits up to `timeout` seconds for the requests being handled to finish. Returns how many are still running.
+        """
+        deadline = time.time() + timeout
+        with self._idle:
+            while self._active and time.time() < deadline:
+                self._idle.wait(deadline - time.time())
+            return self._active
+
+    def server_close(self):
+        pass  # the listening socket is shared with the other workers
+
+
+def serve(make_worker, host='0.0.0.0', port=8080, workers=1, threads=16, shutdown_timeout=30, backlog=128):
+    """
+    Serves until SIGTERM/SIGINT. `make_worker(number)` is called in each worker process (numbered from 0) before it
+    starts accepting and returns `(app, closing, stop)`: the WSGI app, a callable run when the worker stops accepting
+    (to end long-lived responses such as event streams) and one run once its requests have finished.
+    """
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    listener.setblocking(False)  # workers race to accept, and the losers mustn't block in accept()
+    log.info("Serving on %s:%d with %d workers of %d threads", host, port, workers, threads)
+    if workers <= 1 or not hasattr(os, 'fork'):
+        _run_worker(listener, make_worker, 0, threads, shutdown_timeout, (signal.SIGTERM, signal.SIGINT))
+        listener.close()
+        return
+
+    children = {}  # pid -> worker number
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in children:
+            _kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for number in range(workers):
+        children[_fork_worker(listener, make_worker, number, threads, shutdown_timeout)] = number
+
+    deadline = None
+    while children:
+        if stopping and deadline is None:
+            deadline = time.time() + shutdown_timeout + 5
+        if deadline is not None and time.time() > deadline:
+            log.warning("Killing %d workers that didn't stop in time", len(children))
+            for pid in children:
+                _kill(pid, signal.SIGKILL)
+            deadline = float('inf')
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG if stopping else 0)
+        except OSError:  # interrupted by a signal
+            continue
+        if pid == 0:
+            time.sleep(0.1)
+            continue
+        number = children.pop(pid, None)
+        if number is not None and not stopping:
+            log.warning("Worker %d exited with status %d, restarting it", number, status)
+            time.sleep(1)
+            children[_fork_worker(listener, make_worker, number, threads, shutdown_timeout)] = number
+    listener.close()
+
+
+def _fork_worker(listener, make_worker, number, threads, shutdown_timeout):
+    pid = os.fork()
+    if pid:
+        return pid
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # a terminal's Ctrl-C reaches the parent, which passes on SIGTERM
+    status = 1
+    try:
+        _run_worker(listener, make_worker, number, threads, shutdown_timeout, (signal.SIGTERM,))
+        status = 0
+    except Exception:
+        log.exception("Worker %d failed", number)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+
+def _run_worker(listener, make_worker, number, threads, shutdown_timeout, signums):
+    app, closing, stop = make_worker(number)
+    server = PooledWSGIServer(listener, app, threads)
+
+    def shut_down():
+        closing()
+        server.shutdown()
+
+    def on_signal(signum, frame):
+        # serve_forever runs in this (the main) thread, so it has to be stopped from another one
+        threading.Thread(target=shut_down, name='shutdown').start()
+
+    for signum in signums:
+        signal.signal(signum, on_signal)
+    try:
+        server.serve_forever()
+    finally:
+        unfinished = server.drain(shutdown_timeout)
+        if unfinished:
+            log.warning("Worker %d stopping with %d requests unfinished", number, unfinished)
+        stop()
+
+
+def _kill(pid, signum):
+    try:
+        os.kill(pid, signum)
+    except OSError:
+        pass
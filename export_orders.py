@@ -0,0 +1,19 @@
+"""
+Exports a data set's orders to CSV, JSONL, Arrow or Parquet, picked by the output file's extension.
+
+    $ python export_orders.py sqlite:///events.db 1 orders.parquet
+    $ python export_orders.py sqlite:///events.db 1 orders.csv "2017-01-02 12:00:00" "2017-01-02 14:00:00"
+"""
+import sys, time
+from sqlalchemy import create_engine
+from tropofy.database import DBSession
+from event_tracking_demo.export import export_orders
+from event_tracking_demo.ingest import parse_timestamp
+
+if __name__ == "__main__":
+    DBSession.configure(bind=create_engine(sys.argv[1]))
+    start = parse_timestamp(sys.argv[4]) if len(sys.argv) > 4 else None
+    end = parse_timestamp(sys.argv[5]) if len(sys.argv) > 5 else None
+    started = time.time()
+    export_orders(int(sys.argv[2]), sys.argv[3], start=start, end=end)
+    print("Exported to %s in %.1fs" % (sys.argv[3], time.time() - started))
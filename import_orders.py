@@ -0,0 +1,27 @@
+"""
+Bulk loads orders from a JSONL or CSV file (one order per line/row, in the `Order.serialise` shape) into a data set.
+
+    $ python import_orders.py sqlite:///events.db 1 tills.jsonl
+"""
+import sys
+from sqlalchemy import create_engine
+from tropofy.database import DBSession
+from event_tracking_demo.ingest import import_orders
+
+
+class ImportDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+def report(stats):
+    print("%d rows, %d rejected, %.0f rows/sec" % (stats.rows, stats.rejected, stats.rows_per_second))
+
+
+if __name__ == "__main__":
+    DBSession.configure(bind=create_engine(sys.argv[1]))
+    stats = import_orders(ImportDataSet(int(sys.argv[2])), sys.argv[3], progress=report)
+    DBSession().commit()
+    report(stats)
+    for error in stats.errors:
+        print("  rejected " + error)
@@ -0,0 +1,54 @@
+"""
+Makes station titles and staff names unique within each data set instead of across the whole database, so that data
+sets can share them (e.g. two copies of the example, or a clone made with clone_data_set.py).
+
+    $ python migrations/data_set_unique_names.py sqlite:///events.db
+
+SQLite can't drop a constraint, so there each table is created again from the model under a temporary name, refilled
+with INSERT ... SELECT and swapped in (keeping its ids, which Food and Roster refer to). Elsewhere the old constraint is
+dropped and the new one added. Safe to re-run: does nothing once the constraints are per data set.
+"""
+import sys
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.schema import AddConstraint, UniqueConstraint
+from event_tracking_demo import Staff, Station
+
+MODELS = [(Station, 'title'), (Staff, 'staff_name')]
+
+
+def global_constraints(inspector, model, column):
+    """
+    The names of the unique constraints on `column` alone. SQLite reports its column constraints without a name.
+    """
+    return [constraint['name'] for constraint in inspector.get_unique_constraints(model.__tablename__)
+            if constraint['column_names'] == [column]]
+
+
+if __name__ == "__main__":
+    engine = create_engine(sys.argv[1])
+    inspector = inspect(engine)
+    todo = [(model, column) for model, column in MODELS if global_constraints(inspector, model, column)]
+    if not todo:
+        print("Station titles and staff names are already unique per data set")
+        exit(0)
+
+    with engine.begin() as connection:
+        quote = connection.dialect.identifier_preparer.quote
+        for model, column in todo:
+            name = model.__tablename__
+            if engine.dialect.name == 'sqlite':
+                rebuilt = model.__table__.tometadata(model.metadata, name=name + '_new')
+                rebuilt.create(connection)
+                columns = ', '.join(quote(c.name) for c in model.__table__.columns)
+                connection.execute('INSERT INTO %s (%s) SELECT %s FROM %s' % (
+                    quote(rebuilt.name), columns, columns, quote(name)))
+                connection.execute('DROP TABLE %s' % quote(name))
+                connection.execute('ALTER TABLE %s RENAME TO %s' % (quote(rebuilt.name), quote(name)))
+            else:
+                for constraint in global_constraints(inspector, model, column):
+                    connection.execute('ALTER TABLE %s DROP CONSTRAINT %s' % (quote(name), quote(constraint)))
+                for constraint in model.__table__.constraints:
+                    if isinstance(constraint, UniqueConstraint):
+                        connection.execute(AddConstraint(constraint))
+    print("Made %s unique per data set" % ' and '.join('%s.%s' % (model.__tablename__, column)
+                                                        for model, column in todo))
@@ -0,0 +1,49 @@
+"""
+Adds events and archived orders, and the `event_day` column orders are partitioned on (see
+event_tracking_demo/partitions.py).
+
+    $ python migrations/partition_orders.py postgresql://localhost/events
+
+Creates the Event and ArchivedOrder tables, and adds `order.event_day`, filled in from the timestamps, with its
+index. On PostgreSQL, Order's and ArchivedOrder's tables are then made again as tables partitioned by range of
+event_day (see `partitions.partition_table`). Finally each existing event's days get their partitions, or on SQLite
+their partial index. Everything runs in one transaction, on SQLite too. Safe to re-run: does nothing that has already
+been done.
+"""
+import sys
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.sql import select
+from event_tracking_demo import ArchivedOrder, Event, Order
+from event_tracking_demo.partitions import is_partitioned, partition_table, sync_event_days
+from event_tracking_demo.server import transactional_ddl
+
+if __name__ == "__main__":
+    engine = transactional_ddl(create_engine(sys.argv[1]))
+    done = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for model in (Event, ArchivedOrder):
+            if not inspector.has_table(model.__tablename__):
+                model.__table__.create(connection)  # partitioned as it's created on PostgreSQL
+                done.append("created %s" % model.__tablename__)
+        if 'event_day' not in [column['name'] for column in inspector.get_columns('order')]:
+            day = 'date(timestamp)' if engine.dialect.name == 'sqlite' else 'CAST(timestamp AS DATE)'
+            connection.execute('ALTER TABLE "order" ADD COLUMN event_day DATE')
+            connection.execute('UPDATE "order" SET event_day = %s' % day)
+            if engine.dialect.name != 'sqlite':  # SQLite can't add NOT NULL to an existing column
+                connection.execute('ALTER TABLE "order" ALTER COLUMN event_day SET NOT NULL')
+            done.append("added order.event_day")
+        if 'ix_order_data_set_event_day' not in [index['name'] for index in inspector.get_indexes('order')]:
+            next(index for index in Order.__table__.indexes if index.name == 'ix_order_data_set_event_day') \
+                .create(connection)
+        if engine.dialect.name == 'postgresql':
+            for table in (Order.__table__, ArchivedOrder.__table__):
+                if not is_partitioned(connection, table.name):
+                    partition_table(connection, table)
+                    done.append("partitioned %s" % table.name)
+        events = connection.execute(select([Event.first_day, Event.last_day, Event.archived])).fetchall()
+        sync_event_days(connection, [Order.__table__, ArchivedOrder.__table__], events)
+    if done:
+        print("Migrated orders: %s" % ', '.join(done))
+    else:
+        print("Orders are already partitioned by event day")
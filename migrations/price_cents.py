@@ -0,0 +1,25 @@
+"""
+Moves Food prices from the old `price` text column (dollars, e.g. "7.5") to the integer `price_cents` column.
+
+    $ python migrations/price_cents.py sqlite:///events.db
+
+Dropping a column needs SQLite 3.35 or later. Safe to re-run: does nothing once `price` is gone.
+"""
+import sys
+from sqlalchemy import create_engine, inspect
+
+if __name__ == "__main__":
+    engine = create_engine(sys.argv[1])
+    columns = [column['name'] for column in inspect(engine).get_columns('food')]
+    if 'price' not in columns:
+        print("food.price has already been migrated")
+        exit(0)
+    decimal = 'REAL' if engine.dialect.name == 'sqlite' else 'NUMERIC'
+    with engine.begin() as connection:
+        if 'price_cents' not in columns:
+            connection.execute('ALTER TABLE food ADD COLUMN price_cents INTEGER')
+        connection.execute('UPDATE food SET price_cents = CAST(ROUND(CAST(price AS %s) * 100) AS INTEGER)' % decimal)
+        connection.execute('ALTER TABLE food DROP COLUMN price')
+        if engine.dialect.name != 'sqlite':  # SQLite can't add NOT NULL to an existing column
+            connection.execute('ALTER TABLE food ALTER COLUMN price_cents SET NOT NULL')
+    print("Migrated food.price to food.price_cents")
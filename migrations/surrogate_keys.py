@@ -0,0 +1,156 @@
+"""
+Moves Food, Order and Roster from text foreign keys (station title, food title, staff name) to integer foreign keys on
+the referenced row's id, and rebuilds OrderRollup (which is now keyed by food id).
+
+    $ python migrations/surrogate_keys.py sqlite:///events.db
+
+Each table is renamed out of the way, created again as it was at this migration (not as the models are now, as later
+migrations expect to find it like that) and refilled with INSERT ... SELECT, looking each title up in the same data
+set. Everything runs in one transaction, on SQLite too (see server.transactional_ddl): a row whose title doesn't match
+anything fails the NOT NULL on its new id column and nothing is changed. Safe to re-run: does nothing once
+order.food_id exists.
+"""
+import sys
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.schema import Column, ForeignKey, Index, MetaData, Table, UniqueConstraint
+from sqlalchemy.types import DateTime, Integer, Text
+from event_tracking_demo import Food, Order, OrderRollup, Roster, Staff, Station
+from event_tracking_demo.server import transactional_ddl
+
+metadata = MetaData()
+
+
+def stand_in(target):
+    """
+    A foreign key to `target` ("table.column"), declaring its table, which this migration doesn't touch, just enough
+    for the key to be created.
+    """
+    table_name, column_name = target.rsplit('.', 1)
+    if table_name not in metadata.tables:
+        Table(table_name, metadata, Column(column_name, Integer, primary_key=True))
+    return ForeignKey(target)
+
+
+def frozen_table(model, *columns):
+    """
+    `model`'s table as this migration makes it: Tropofy's id and data_set_id columns, then `columns`.
+    """
+    data_set_id = model.__table__.c.data_set_id
+    for key in data_set_id.foreign_keys:
+        stand_in(key.target_fullname)
+    return Table(model.__tablename__, metadata, model.__table__.c.id.copy(), data_set_id.copy(), *columns)
+
+
+FOOD = frozen_table(
+    Food,
+    Column('station_id', Integer, stand_in(Station.__tablename__ + '.id'), nullable=False),
+    Column('title', Text, nullable=False),
+    Column('description', Text, nullable=True),
+    Column('price_cents', Integer, nullable=False),
+    Index('ix_food_data_set_title', 'data_set_id', 'title'),
+    Index('ix_food_data_set_station', 'data_set_id', 'station_id'))
+ORDER = frozen_table(
+    Order,
+    Column('food_id', Integer, ForeignKey(Food.__tablename__ + '.id'), nullable=False),
+    Column('timestamp', DateTime, nullable=False),
+    Column('quantity', Integer, nullable=False),
+    Column('age', Integer, nullable=True),
+    Column('postcode', Integer, nullable=True),
+    Index('ix_order_data_set_food_timestamp', 'data_set_id', 'food_id', 'timestamp', 'id'),
+    Index('ix_order_data_set_timestamp', 'data_set_id', 'timestamp', 'id'),
+    Index('ix_order_data_set_age', 'data_set_id', 'age', 'id'),
+    Index('ix_order_data_set_postcode', 'data_set_id', 'postcode', 'id'))
+ROSTER = frozen_table(
+    Roster,
+    Column('station_id', Integer, stand_in(Station.__tablename__ + '.id'), nullable=False),
+    Column('staff_id', Integer, stand_in(Staff.__tablename__ + '.id'), nullable=False),
+    Column('start', DateTime, nullable=False),
+    Column('end', DateTime, nullable=False),
+    Column('content', Text, nullable=True),
+    Index('ix_roster_data_set_station_start_end', 'data_set_id', 'station_id', 'start', 'end'),
+    Index('ix_roster_data_set_staff', 'data_set_id', 'staff_id'))
+ROLLUP = frozen_table(
+    OrderRollup,
+    Column('food_id', Integer, nullable=False),
+    Column('station_id', Integer, nullable=False),
+    Column('hour', DateTime, nullable=False),
+    Column('quantity', Integer, nullable=False),
+    Column('orders', Integer, nullable=False),
+    Column('revenue_cents', Integer, nullable=False),
+    UniqueConstraint('data_set_id', 'food_id', 'hour'))
+
+# table -> {new id column: (old text column, referenced table, referenced title column)}, in creation order
+LOOKUPS = [
+    (FOOD, {'station_id': ('station', Station.__tablename__, 'title')}),
+    (ORDER, {'food_id': ('food', Food.__tablename__, 'title')}),
+    (ROSTER, {'station_id': ('station', Station.__tablename__, 'title'),
+              'staff_id': ('staff', Staff.__tablename__, 'staff_name')}),
+    (ROLLUP, {}),
+]
+
+
+def copy_rows(connection, table, old_columns, lookups):
+    quote = connection.dialect.identifier_preparer.quote
+    names, values = [], []
+    for column in table.columns:
+        if column.name in lookups:
+            old_column, referenced, title = lookups[column.name]
+            values.append('(SELECT r.id FROM %s r WHERE r.data_set_id = o.data_set_id AND r.%s = o.%s)' % (
+                quote(referenced), quote(title), quote(old_column)))
+        elif column.name in old_columns:
+            values.append('o.%s' % quote(column.name))
+        else:
+            continue
+        names.append(quote(column.name))
+    connection.execute('INSERT INTO %s (%s) SELECT %s FROM %s o' % (
+        quote(table.name), ', '.join(names), ', '.join(values), quote(table.name + '_old')))
+
+
+def rebuild_rollup(connection):
+    """
+    Fills the new rollup from the migrated orders, in SQL, as OrderRollup.rebuild would have at this migration.
+    """
+    quote = connection.dialect.identifier_preparer.quote
+    if connection.dialect.name == 'sqlite':
+        hour = "strftime('%Y-%m-%d %H:00:00.000000', o.timestamp)"  # how SQLAlchemy stores a DateTime on SQLite
+    else:
+        hour = "date_trunc('hour', o.timestamp)"
+    connection.execute(
+        'INSERT INTO %s (data_set_id, food_id, station_id, hour, quantity, orders, revenue_cents) '
+        'SELECT o.data_set_id, o.food_id, f.station_id, %s, SUM(o.quantity), COUNT(*), SUM(o.quantity) * f.price_cents '
+        'FROM %s o JOIN %s f ON f.id = o.food_id '
+        'GROUP BY o.data_set_id, o.food_id, f.station_id, f.price_cents, %s' % (
+            quote(ROLLUP.name), hour, quote(ORDER.name), quote(FOOD.name), hour))
+
+
+if __name__ == "__main__":
+    engine = transactional_ddl(create_engine(sys.argv[1]))
+    inspector = inspect(engine)
+    if 'food_id' in [column['name'] for column in inspector.get_columns(ORDER.name)]:
+        print("Foreign keys have already been migrated")
+        exit(0)
+    old_columns = dict((table.name, [column['name'] for column in inspector.get_columns(table.name)])
+                       for table, _ in LOOKUPS)
+    old_indexes = dict((table.name, [index['name'] for index in inspector.get_indexes(table.name)
+                                     if not index.get('duplicates_constraint')])
+                       for table, _ in LOOKUPS)
+
+    with engine.begin() as connection:
+        quote = connection.dialect.identifier_preparer.quote
+        for table, _ in LOOKUPS:
+            for index in old_indexes[table.name]:  # Index names are per schema, the new tables reuse them
+                connection.execute('DROP INDEX %s' % quote(index))
+            connection.execute('ALTER TABLE %s RENAME TO %s' % (quote(table.name), quote(table.name + '_old')))
+        for table, lookups in LOOKUPS:
+            table.create(connection)
+            if table is not ROLLUP:
+                copy_rows(connection, table, old_columns[table.name], lookups)
+        for table, _ in reversed(LOOKUPS):
+            connection.execute('DROP TABLE %s' % quote(table.name + '_old'))
+        if engine.dialect.name == 'postgresql':  # The new tables have fresh sequences that start at 1
+            for table, _ in LOOKUPS:
+                name = quote(table.name)
+                connection.execute("SELECT setval(pg_get_serial_sequence('%s', 'id'), COALESCE(MAX(id), 0) + 1, false) "
+                                   "FROM %s" % (name, name))
+        rebuild_rollup(connection)
+    print("Migrated food, order and roster to integer foreign keys and rebuilt the order rollup")
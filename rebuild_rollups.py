@@ -0,0 +1,36 @@
+"""
+Recomputes the OrderRollup and OrderDemographics tables and Stock sold totals from Order for one or more data sets
+and checks the result against the raw orders.
+
+    $ python rebuild_rollups.py sqlite:///events.db 1 2 3
+"""
+import sys
+from sqlalchemy import create_engine
+from tropofy.database import DBSession
+from event_tracking_demo import OrderDemographics, OrderRollup, Stock
+
+
+class RebuildDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+if __name__ == "__main__":
+    DBSession.configure(bind=create_engine(sys.argv[1]))
+    session = DBSession()
+    failed = False
+    for data_set_id in sys.argv[2:]:
+        data_set = RebuildDataSet(int(data_set_id))
+        for model in (OrderRollup, OrderDemographics, Stock):
+            model.rebuild(data_set)
+            mismatches = model.verify(data_set)
+            if mismatches:
+                failed = True
+                print("Data set %d: %d %s rows don't match Order, first: %s" % (
+                    data_set.id, len(mismatches), model.__name__, mismatches[0]))
+            else:
+                print("Data set %d: %s rebuilt and verified" % (data_set.id, model.__name__))
+    if failed:
+        session.rollback()
+        exit(1)
+    session.commit()
@@ -1,5 +1,16 @@
 import pkg_resources
-import json
+import json, os, sys
+
+
+def setting(name, default=None):
+    """
+    `name` from the environment, else from settings.json, else `default`. Environment values are converted to the
+    type of `default`.
+    """
+    if name in os.environ:
+        return type(default)(os.environ[name]) if default is not None else os.environ[name]
+    return data.get(name, default)
+
 
 try:
     with open('settings.json') as f:
@@ -11,7 +22,7 @@ try:
                 'auth_url': 'https://auth.tropofy.com',
             },
             'database': {
-                'url': 'sqlite:///events.db',
+                'url': setting('DATABASE_URL', 'sqlite:///events.db'),
             },
             'apps': [
                 {
@@ -29,8 +40,84 @@ except Exception as e:
     exit(0)
 
 from tropofy import main as tropofy_main, serve_app_cascade
+from tropofy.database import DBSession
+from event_tracking_demo import access, cache
+from event_tracking_demo.api import ApiMiddleware
+from event_tracking_demo.events import order_columns, queue_monitor, stock_monitor
+from event_tracking_demo.live import OrderIngestor, OrderIngestMiddleware, adopt_spools
+from event_tracking_demo.push import ChartPushHub, ChartPushMiddleware
+from event_tracking_demo.render import StepRenderer
+from event_tracking_demo.server import create_db_engine, serve
+
+production = '--production' in sys.argv[1:]
+workers = setting('SERVER_WORKERS', 4) if production else 1
+threads = setting('SERVER_THREADS', 32)
+render_threads = setting('RENDER_THREADS', 4)
+spool_path = setting('INGEST_SPOOL', 'orders.spool')
+access_secret = setting('ACCESS_SECRET')
 
 tropofy_app = tropofy_main(apps_config)
+engine = create_db_engine(apps_config['database']['url'],
+                          # a connection for every request and render thread, the ingestor and the order columns
+                          pool_size=setting('DB_POOL_SIZE', threads + render_threads + 2),
+                          max_overflow=setting('DB_MAX_OVERFLOW', 5),
+                          busy_timeout=setting('DB_BUSY_TIMEOUT', 30))
+DBSession.remove()
+DBSession.configure(bind=engine)
+order_columns.max_rows = setting('ORDER_COLUMNS_MAX_ROWS', 0)
+stock_monitor.rates.minutes = setting('STOCK_RATE_MINUTES', 30)
+queue_monitor.arrivals.minutes = setting('QUEUE_RATE_MINUTES', 15)
+queue_monitor.orders_per_staff_hour = setting('ORDERS_PER_STAFF_HOUR', 30)
+if access_secret:
+    access.token_signer = access.TokenSigner(access_secret)
+else:
+    print("ACCESS_SECRET isn't set, so order ingestion, the order API and chart push are not served.")
+
+
+def make_worker(number):
+    """
+    The app of one server process, with its own ingestor (spooling to its own file in production), push hub and
+    widget renderer.
+    """
+    engine.dispose()  # pooled connections can't be shared with the parent process
+    max_viewers = setting('PUSH_MAX_VIEWERS', 200)
+    chart_push = ChartPushHub(max_subscribers=min(max_viewers, threads // 2) if production else max_viewers)
+    stock_monitor.alert_listeners.append(
+        lambda data_set_id, alert: chart_push.publish(data_set_id, 'stock_alert', alert))
+
+    def on_commit(rows):
+        chart_push.publish_orders(rows)
+        stock_monitor.record(rows)
+        queue_monitor.record(rows)
+        chart_push.publish_queues(rows)
+    ingestor = OrderIngestor('%s.%d' % (spool_path, number) if production else spool_path, on_commit=on_commit)
+    if render_threads:
+        cache.widget_renderer = StepRenderer(render_threads)
+    ingestor.start()
+    app = tropofy_app
+    if access.token_signer is not None:
+        app = ApiMiddleware(app, access.token_signer)
+        app = OrderIngestMiddleware(app, ingestor, access.token_signer)
+        app = ChartPushMiddleware(app, chart_push, access.token_signer)
+
+    def stop():
+        ingestor.stop()
+        if cache.widget_renderer is not None:
+            cache.widget_renderer.shutdown()
+        engine.dispose()
+    return app, chart_push.close, stop
+
 
 if __name__ == "__main__":
-    serve_app_cascade(tropofy_app, '0.0.0.0', 8080)
+    if production:
+        adopt_spools(spool_path, ['%s.%d' % (spool_path, number) for number in range(workers)])
+        serve(make_worker, setting('SERVER_HOST', '0.0.0.0'), setting('SERVER_PORT', 8080), workers, threads,
+              setting('SHUTDOWN_TIMEOUT', 30))
+    else:
+        adopt_spools(spool_path, [spool_path])
+        app, closing, stop = make_worker(0)
+        try:
+            serve_app_cascade(app, '0.0.0.0', 8080)
+        finally:
+            closing()
+            stop()
@@ -2,6 +2,8 @@ from setuptools import setup, find_packages
 
 requires = [
     'tropofy',
+    'numpy',
+    'futures; python_version < "3"',  # concurrent.futures, for computing a step's widgets concurrently
 ]
 
 setup(
@@ -13,4 +15,8 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=requires,
+    extras_require={
+        'export': ['pyarrow'],  # Arrow and Parquet order exports
+        'test': ['pytest'],
+    },
 )
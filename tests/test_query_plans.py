@@ -0,0 +1,165 @@
+"""
+Checks that the chart, grid and paging queries are served by the indexes declared on the models, by running EXPLAIN
+over the exact SQL they issue. Works on SQLite (EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN).
+
+    $ EXPLAIN_DATABASE_URLS="sqlite:///events.db postgresql://localhost/events" pytest tests
+
+Planners fall back to table scans on tiny tables, or where every row matches, so point it at databases seeded with a
+realistic number of orders in more than one data set (see create.py), with every migration run and statistics
+gathered (ANALYZE). `EXPLAIN_DATA_SET_ID` picks the data set to query (default 1). Skipped unless
+`EXPLAIN_DATABASE_URLS` is set.
+"""
+import datetime, os, re
+import pytest
+from sqlalchemy import create_engine, event
+from tropofy.database import DBSession
+from event_tracking_demo import DimensionMap, Event, Food, Order, OrderRollup, Roster
+from event_tracking_demo.cache import data_set_versions
+from event_tracking_demo.partitions import day_index_name, is_partitioned, partition_name
+
+URLS = os.environ.get('EXPLAIN_DATABASE_URLS', '').split()
+DATA_SET_ID = int(os.environ.get('EXPLAIN_DATA_SET_ID', 1))
+DAY = datetime.date(2017, 1, 2)
+
+pytestmark = pytest.mark.skipif(not URLS, reason="EXPLAIN_DATABASE_URLS isn't set")
+
+
+class ExplainDataSet(object):
+    def __init__(self, id):
+        self.id = id
+
+
+def index(model, name, day=None):
+    """
+    Returns a function of the connection giving the pattern `model`'s index `name` shows up as in a plan: its name,
+    or where the table is partitioned (Order on PostgreSQL), the matching index of one of its partitions (`day`'s or
+    the default one, if `day` is given).
+    """
+    def pattern(connection):
+        table = model.__table__
+        if not is_partitioned(connection, table.name):
+            return re.escape(name)
+        columns = next(index for index in table.indexes if index.name == name).columns
+        partitions = [partition_name(table.name, day) if day else r'%s_p\d{8}' % re.escape(table.name),
+                      re.escape(table.name + '_default')]
+        return r'(%s)_%s_idx' % ('|'.join(partitions), '_'.join(column.name for column in columns))
+    return pattern
+
+
+def day_index(connection):
+    """
+    The index that DAY's orders are counted by hour with: on SQLite, the partial index of the live event it's in, if
+    any.
+    """
+    if connection.dialect.name == 'sqlite':
+        event = DBSession().query(Event) \
+            .filter(Event.data_set_id == DATA_SET_ID, Event.first_day <= DAY, Event.last_day >= DAY) \
+            .filter(Event.archived.is_(False)) \
+            .first()
+        if event is not None:
+            return re.escape(day_index_name(Order.__tablename__, event.first_day, event.last_day))
+    return index(Order, 'ix_order_data_set_timestamp', DAY)(connection)
+
+
+def grid_page(model):
+    def fetch(data_set):
+        return DBSession().query(model).filter(model.data_set_id == data_set.id).limit(50).all()
+    return fetch
+
+
+def roster_window(data_set):
+    start = datetime.datetime.combine(DAY, datetime.time(12))
+    station_id = DimensionMap.get(data_set.id).station_ids['Chinese Stall']
+    return DBSession().query(Roster) \
+        .filter(Roster.data_set_id == data_set.id, Roster.station_id == station_id) \
+        .filter(Roster.start < start + datetime.timedelta(hours=1), Roster.end > start) \
+        .all()
+
+
+# (description, callable taking the data set, functions of the connection giving the patterns of the indexes that
+# must each appear in at least one statement's plan)
+CHECKS = [
+    ("Order.get_total_by_food", Order.get_total_by_food,
+     [index(Order, 'ix_order_data_set_food_timestamp')]),
+    ("Order.get_count_by_time_of_day for one day",
+     lambda data_set: Order.get_count_by_time_of_day(data_set, 15, 6, 18, DAY, DAY),
+     [day_index]),
+    ("OrderRollup.compute", OrderRollup.compute, [index(Order, 'ix_order_data_set_food_timestamp')]),
+    ("SimpleGrid(Food) page", grid_page(Food), [index(Food, 'ix_food_data_set_station')]),
+    ("Order.get_page deep page, newest first",
+     lambda data_set: Order.get_page(data_set, Order.get_page(data_set, limit=200, descending=True)[1],
+                                     descending=True),
+     [index(Order, 'ix_order_data_set_timestamp')]),
+    ("Order.get_page by station and food order",
+     lambda data_set: Order.get_page(data_set, sort='food', station='Chinese Stall'),
+     [index(Order, 'ix_order_data_set_food_timestamp')]),
+    ("Roster by station and time window", roster_window, [index(Roster, 'ix_roster_data_set_station_start_end')]),
+]
+
+# Order.PAGE_SORTS -> the index each sort seeks on
+PAGE_INDEXES = {
+    'timestamp': 'ix_order_data_set_timestamp',
+    'food': 'ix_order_data_set_food_timestamp',
+    'age': 'ix_order_data_set_age',
+    'postcode': 'ix_order_data_set_postcode',
+}
+
+
+def explain(connection, statement, parameters):
+    if connection.dialect.name == 'sqlite':
+        rows = connection.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return '\n'.join(str(row[-1]) for row in rows)
+    rows = connection.execute('EXPLAIN ' + statement, parameters)
+    return '\n'.join(row[0] for row in rows)
+
+
+@pytest.fixture(scope='module', params=URLS)
+def statements(request):
+    """
+    Binds DBSession to each database in turn, and collects the statements issued through it.
+    """
+    engine = create_engine(request.param)
+    captured = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    DBSession.remove()
+    DBSession.configure(bind=engine)
+    yield captured
+    DBSession.rollback()
+    DBSession.remove()
+    engine.dispose()
+
+
+def assert_uses(statements, description, fn, expected):
+    data_set_versions.bump(DATA_SET_ID)  # so nothing comes from a cache, or from another database
+    connection = DBSession().connection()
+    patterns = [pattern(connection) for pattern in expected]
+    del statements[:]
+    fn(ExplainDataSet(DATA_SET_ID))
+    plans = '\n'.join(explain(connection, statement, parameters) for statement, parameters in list(statements))
+    for pattern in patterns:
+        assert re.search(r'\b%s\b' % pattern, plans), "%s doesn't use %s:\n%s" % (description, pattern, plans)
+
+
+@pytest.mark.parametrize('description, fn, expected', CHECKS, ids=[check[0] for check in CHECKS])
+def test_uses_index(statements, description, fn, expected):
+    assert_uses(statements, description, fn, expected)
+
+
+def test_every_page_sort_has_an_index():
+    assert sorted(PAGE_INDEXES) == sorted(Order.PAGE_SORTS)
+
+
+@pytest.mark.parametrize('sort', sorted(PAGE_INDEXES))
+@pytest.mark.parametrize('deep', [False, True], ids=['first page', 'cursor page'])
+def test_order_page_uses_index(statements, sort, deep):
+    after = None
+    if deep:
+        after = Order.get_page(ExplainDataSet(DATA_SET_ID), limit=200, sort=sort)[1]
+        assert after is not None, "data set %d has too few orders to page through" % DATA_SET_ID
+    assert_uses(statements, "Order.get_page by %s" % sort,
+                lambda data_set: Order.get_page(data_set, after, sort=sort),
+                [index(Order, PAGE_INDEXES[sort])])